@@ -0,0 +1,332 @@
+"""
+Capa asyncio para auth y operaciones sobre user_data2, para que la UI no espere round-trips en serie.
+
+Los clientes de supabase-py que usamos son síncronos (comparten el pool httpx de supabase_pool), así que cada
+request corre en un hilo con asyncio.to_thread; las consultas se arman con las funciones de price_store y el
+cache de precios es el mismo. Esta capa agrega el event loop del proceso (en un hilo propio: desde Streamlit
+se usa correr(...) y las tareas lanzadas con en_segundo_plano(...), p. ej. la limpieza de user_data2_tmp,
+siguen corriendo después del rerun que las lanzó), el registro de latencias por operación y:
+    - las operaciones idempotentes (páginas del select, upserts sobre (user_id, ean), deletes por EAN) pasan
+      por ejecutar: timeout por intento y reintentos con backoff y jitter, hasta MAX_CONCURRENCIA a la vez
+      con asyncio.gather;
+    - el reemplazo completo (inserts en user_data2_tmp, que no se pueden repetir) es price_store.reemplazar_precios
+      en un hilo, sin timeout del lado del cliente: el hilo abandonado seguiría escribiendo mientras corre el
+      reintento; lo corta el timeout de httpx del pool.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+import price_store as ps
+
+TIMEOUT_OPERACION = 15  # segundos por intento
+MAX_CONCURRENCIA = 4  # requests en vuelo por operación (páginas o tandas)
+
+_logger = logging.getLogger(__name__)
+
+
+class LatenciasPorOperacion:
+    """Latencia (incluyendo reintentos), errores y timeouts por nombre de operación."""
+
+    def __init__(self, ventana: int = 1000):
+        self._lock = threading.Lock()
+        self._ventana = ventana
+        self._operaciones = {}
+
+    def registrar(self, nombre: str, segundos: float, resultado: str = "ok", reintentos: int = 0):
+        with self._lock:
+            actual = self._operaciones.get(nombre)
+            if actual is None:
+                actual = self._operaciones[nombre] = {"llamadas": 0, "errores": 0, "timeouts": 0, "reintentos": 0,
+                                                      "latencias": deque(maxlen=self._ventana)}
+            actual["llamadas"] += 1
+            actual["reintentos"] += reintentos
+            if resultado == "error":
+                actual["errores"] += 1
+            elif resultado == "timeout":
+                actual["timeouts"] += 1
+            actual["latencias"].append(segundos)
+
+    def resetear(self):
+        with self._lock:
+            self._operaciones = {}
+
+    def resumen(self) -> dict:
+        """{operación: {llamadas, errores, timeouts, reintentos, p50_ms, p95_ms, p99_ms}}"""
+        with self._lock:
+            copia = {nombre: (dict(datos), sorted(datos["latencias"])) for nombre, datos in self._operaciones.items()}
+        resumen = {}
+        for nombre, (datos, latencias) in copia.items():
+            datos.pop("latencias")
+            for percentil in (50, 95, 99):
+                datos[f"p{percentil}_ms"] = 1000 * latencias[min(len(latencias) * percentil // 100, len(latencias) - 1)]
+            resumen[nombre] = datos
+        return resumen
+
+
+latencias = LatenciasPorOperacion()
+
+# --- Event loop del proceso ---
+
+_loop = None
+_loop_lock = threading.Lock()
+_tareas = set()  # referencias a las tareas en segundo plano (si no, el GC puede cancelarlas)
+_locks_tmp = {}  # user_id -> asyncio.Lock: un reemplazo y una limpieza de user_data2_tmp no se pisan
+
+
+def _bucle() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="async_store", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def correr(corrutina, timeout: float = None):
+    """Corre la corrutina en el loop del proceso y espera el resultado (para llamar desde código síncrono)."""
+    return asyncio.run_coroutine_threadsafe(corrutina, _bucle()).result(timeout)
+
+
+def correr_con_progreso(hacer_corrutina, on_progress, timeout: float = None):
+    """
+    Como correr(hacer_corrutina(avisar)), pero los avisar(hechas, total) que haga la corrutina (desde el loop o
+    desde un hilo) se entregan a on_progress en el hilo que llama. Streamlit sólo deja tocar widgets
+    (p. ej. st.progress) desde el hilo del script.
+    """
+    avisos = queue.SimpleQueue()
+    futuro = asyncio.run_coroutine_threadsafe(hacer_corrutina(lambda *aviso: avisos.put(aviso)), _bucle())
+    limite = None if timeout is None else time.monotonic() + timeout
+    while not futuro.done():
+        try:
+            on_progress(*avisos.get(timeout=0.05))
+        except queue.Empty:
+            if limite is not None and time.monotonic() > limite:
+                break
+    while not avisos.empty():
+        on_progress(*avisos.get())
+    return futuro.result(0 if limite is None else max(0.0, limite - time.monotonic()))
+
+
+def en_segundo_plano(corrutina):
+    """Lanza la corrutina sin esperarla; los errores se loguean. Se puede llamar desde el loop o desde afuera."""
+    try:
+        asyncio.get_running_loop()
+        futuro = asyncio.ensure_future(corrutina)
+    except RuntimeError:
+        futuro = asyncio.run_coroutine_threadsafe(corrutina, _bucle())
+    _tareas.add(futuro)
+    futuro.add_done_callback(_tarea_terminada)
+    return futuro
+
+
+def _tarea_terminada(futuro):
+    _tareas.discard(futuro)
+    if not futuro.cancelled() and futuro.exception() is not None:
+        _logger.warning("Falló una tarea en segundo plano: %s", futuro.exception())
+
+
+def tareas_pendientes() -> int:
+    return len(_tareas)
+
+
+def _lock_tmp(user_id) -> asyncio.Lock:
+    return _locks_tmp.setdefault(user_id, asyncio.Lock())
+
+
+# --- Operaciones ---
+
+async def ejecutar(nombre: str, operacion, timeout: float = TIMEOUT_OPERACION, max_attempts: int = 3,
+                   backoff: float = 0.5):
+    """
+    Corre operacion() (bloqueante, p. ej. lambda: query.execute()) en un hilo, con `timeout` por intento y
+    hasta max_attempts intentos separados por el backoff de price_store.pausa_reintento (asyncio.sleep, no bloquea).
+    Registra la latencia total en `latencias` bajo `nombre`. Levanta la última excepción si todos fallan.
+    Un intento que vence sigue corriendo en su hilo hasta que el timeout de httpx lo corta, así que con
+    timeout y max_attempts > 1 sólo se puede usar para operaciones que se pueden repetir y superponer sin efectos.
+    """
+    inicio = time.perf_counter()
+    intento = 0
+    while True:
+        try:
+            resp = await asyncio.wait_for(asyncio.to_thread(operacion), timeout)
+            if getattr(resp, "error", None):
+                raise Exception(resp.error)
+            latencias.registrar(nombre, time.perf_counter() - inicio, reintentos=intento)
+            return resp
+        except Exception as e:
+            intento += 1
+            if intento >= max_attempts:
+                latencias.registrar(nombre, time.perf_counter() - inicio,
+                                    resultado="timeout" if isinstance(e, TimeoutError) else "error",
+                                    reintentos=intento - 1)
+                raise
+            await asyncio.sleep(ps.pausa_reintento(backoff, intento))
+
+
+async def _en_paralelo(hacer, argumentos, limite: int = MAX_CONCURRENCIA) -> list:
+    """
+    await hacer(a) para cada a de argumentos, hasta `limite` a la vez. Espera a que terminen todas aunque alguna
+    falle (ninguna queda escribiendo después de que el llamador ve el error) y levanta la primera excepción.
+    """
+    semaforo = asyncio.Semaphore(limite)
+
+    async def uno(argumento):
+        async with semaforo:
+            return await hacer(argumento)
+
+    resultados = await asyncio.gather(*(uno(a) for a in argumentos), return_exceptions=True)
+    for resultado in resultados:
+        if isinstance(resultado, BaseException):
+            raise resultado
+    return resultados
+
+
+async def _en_hilo(nombre: str, funcion, *args, **kwargs):
+    """Corre funcion(*args, **kwargs) de price_store en un hilo (con sus propios reintentos) y registra la latencia."""
+    inicio = time.perf_counter()
+    try:
+        resultado = await asyncio.to_thread(funcion, *args, **kwargs)
+    except Exception:
+        latencias.registrar(nombre, time.perf_counter() - inicio, resultado="error")
+        raise
+    latencias.registrar(nombre, time.perf_counter() - inicio)
+    return resultado
+
+
+async def iniciar_sesion(cliente, email: str, password: str, timeout: float = TIMEOUT_OPERACION):
+    # El login no se reintenta: credenciales inválidas fallarían igual y cuentan como intento fallido
+    return await ejecutar("auth.sign_in", lambda: cliente.auth.sign_in_with_password({"email": email, "password": password}),
+                          timeout=timeout, max_attempts=1)
+
+
+async def escribir_en_tandas(admin_client, tabla: str, records: list, on_progress=None, **kwargs):
+    """
+    price_store.escribir_en_tandas en un hilo (mismos kwargs, mismo resultado y mismo ErrorEscrituraEnTandas).
+    on_progress(filas_escritas, total) se llama desde ese hilo: con correr_con_progreso llega al del script.
+    """
+    operacion = kwargs.get("operacion", "insert")
+    return await _en_hilo(f"{tabla}.{operacion}", ps.escribir_en_tandas, admin_client, tabla, records,
+                          on_progress=on_progress, **kwargs)
+
+
+async def leer_precios(admin_client, user_id: str, desde=None, page_size: int = ps.FILAS_POR_PAGINA,
+                       max_concurrencia: int = MAX_CONCURRENCIA, timeout: float = TIMEOUT_OPERACION,
+                       max_attempts: int = 3, sleep_time: float = 0.5):
+    """
+    Como price_store.leer_precios_paginado (incluso en que las páginas por offset no son un snapshot): la primera
+    página pide el total y el resto se piden con gather.
+    Cada página es un select idempotente, así que pasa por ejecutar (timeout por intento y reintentos).
+    """
+    def pagina(inicio, contar=False):
+        return ejecutar(f"{ps.TABLA}.select",
+                        lambda: ps.pagina_precios(admin_client, user_id, inicio, inicio + page_size - 1,
+                                                  contar=contar, desde=desde),
+                        timeout=timeout, max_attempts=max_attempts, backoff=sleep_time)
+
+    primera = await pagina(0, contar=True)
+    data = list(primera.data or [])
+    total = getattr(primera, "count", None)
+    if total is None:
+        # Sin conteo: se sigue pidiendo secuencialmente hasta que una página venga incompleta
+        ultima = data
+        while len(ultima) == page_size:
+            ultima = (await pagina(len(data))).data or []
+            data.extend(ultima)
+    elif total > len(data):
+        async def resto(inicio):
+            return (await pagina(inicio)).data or []
+
+        for filas in await _en_paralelo(resto, range(page_size, total, page_size), max_concurrencia):
+            data.extend(filas)
+    return ps.dataframe_precios(data)
+
+
+async def cargar_precios(admin_client, user_id: str, ttl: float = ps.TTL_CACHE_PRECIOS, forzar: bool = False,
+                         **kwargs):
+    """price_store.cargar_precios (mismo cache) leyendo con leer_precios. kwargs: los de leer_precios."""
+    cacheado = None if forzar else ps.precios_en_cache(user_id, ttl)
+    if cacheado is not None:
+        return cacheado
+    ahora = time.monotonic()
+    return ps.guardar_en_cache(user_id, await leer_precios(admin_client, user_id, **kwargs), ahora)
+
+
+async def sincronizar_precios(admin_client, user_id: str, resincronizar_cada: float = ps.TTL_RESINCRONIZACION,
+                              **kwargs):
+    """price_store.sincronizar_precios (mismo cache) leyendo con leer_precios. kwargs: los de leer_precios."""
+    df, desde = ps.estado_sincronizacion(user_id, resincronizar_cada)
+    if df is None:
+        return await cargar_precios(admin_client, user_id, forzar=True, **kwargs)
+    return ps.mezclar_en_cache(user_id, df, await leer_precios(admin_client, user_id, desde=desde, **kwargs))
+
+
+async def guardar_diff(admin_client, user_id: str, original, editado, on_progress=None,
+                       chunk_size: int = ps.FILAS_POR_TANDA, max_concurrencia: int = MAX_CONCURRENCIA,
+                       timeout: float = TIMEOUT_OPERACION, max_attempts: int = 3, sleep_time: float = 0.5):
+    """
+    Como price_store.guardar_diff_con_retry, pero las tandas del upsert y las del delete por EAN van a la vez
+    (cada fase con hasta max_concurrencia requests en vuelo). Las dos fases tocan EANs distintos y cada tanda es
+    idempotente, así que pasan por ejecutar con timeout y reintentos.
+    on_progress(filas_upserteadas, total) se llama desde el loop: con correr_con_progreso llega al hilo del script.
+    Devuelve (cantidad_upserts, cantidad_borrados). Si algo falla invalida el cache del usuario y levanta el error.
+    """
+    filas, eans_a_borrar = await asyncio.to_thread(ps.diff_precios, original, editado)
+    records = ps.registros_para_guardar(filas, user_id, sellar=True) if len(filas) else []
+    reintentos = dict(timeout=timeout, max_attempts=max_attempts, backoff=sleep_time)
+    escritas = 0
+
+    async def upsert(tanda):
+        nonlocal escritas
+        await ejecutar(f"{ps.TABLA}.upsert",
+                       lambda: admin_client.table(ps.TABLA).upsert(tanda, on_conflict="user_id,ean").execute(),
+                       **reintentos)
+        escritas += len(tanda)
+        if on_progress is not None:
+            on_progress(escritas, len(records))
+
+    async def borrar(tanda):
+        await ejecutar(f"{ps.TABLA}.delete", lambda: ps.borrar_eans(admin_client, user_id, tanda), **reintentos)
+
+    tandas = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+    fases = await asyncio.gather(_en_paralelo(upsert, tandas, max_concurrencia),
+                                 _en_paralelo(borrar, ps.tandas_de_eans(eans_a_borrar), max_concurrencia),
+                                 return_exceptions=True)
+    errores = [f for f in fases if isinstance(f, BaseException)]
+    if errores:
+        # Si falla a mitad de camino la tabla pudo cambiar, así que el cache ya no sirve
+        ps.invalidar_cache_precios(user_id)
+        raise errores[0]
+    ps.borrar_de_cache(user_id, eans_a_borrar)
+    return len(filas), len(eans_a_borrar)
+
+
+async def limpiar_tmp(admin_client, user_id: str, **kwargs):
+    """Borra las filas del usuario en user_data2_tmp (price_store.limpiar_tmp; kwargs: max_attempts, sleep_time)."""
+    async with _lock_tmp(user_id):
+        await _en_hilo(f"{ps.TABLA_TMP}.delete", ps.limpiar_tmp, admin_client, user_id, **kwargs)
+
+
+async def reemplazar_tabla(admin_client, user_id: str, records: list, limpiar_en_segundo_plano: bool = True,
+                           on_progress=None, **kwargs):
+    """
+    price_store.reemplazar_precios en un hilo: copia en user_data2_tmp y reemplazo de user_data2, cada paso
+    reintentado completo. La limpieza de user_data2_tmp corre en segundo plano (o se espera, con
+    limpiar_en_segundo_plano=False). kwargs: max_attempts, sleep_time, chunk_size, max_workers.
+    Levanta excepción si algún paso falla.
+    """
+    reintentos = {k: v for k, v in kwargs.items() if k in ("max_attempts", "sleep_time")}
+    async with _lock_tmp(user_id):
+        filas = await _en_hilo(f"{ps.TABLA}.reemplazar", ps.reemplazar_precios, admin_client, user_id, records,
+                               limpiar=False, on_progress=on_progress, **kwargs)
+
+    if limpiar_en_segundo_plano:
+        en_segundo_plano(limpiar_tmp(admin_client, user_id, **reintentos))
+    else:
+        await limpiar_tmp(admin_client, user_id, **reintentos)
+    return filas
@@ -0,0 +1,34 @@
+"""
+Throughput de breakeven_grid.grilla_breakeven según la cantidad de procesos.
+
+    python benchmarks/bench_breakeven_grid.py --guardar grilla.json
+"""
+import datetime as dt
+import os
+
+import numpy as np
+
+from harness import main, medir
+
+import breakeven_grid as bg
+
+FIJOS = dict(fechaVencimiento='31-10-2026', tf_precioVencimiento=132.82, indiceCER_Mercado=540.56,
+             cer_fechaEmision='31-10-2024', indiceCER_inicial=487.67)
+
+
+def correr(args):
+    fechas = [dt.date(2025, 1, 1) + dt.timedelta(days=i) for i in range(50)]
+    ejes = (fechas, np.linspace(95, 125, 100), np.linspace(100, 115, 100), np.linspace(0, 0.05, 40))
+    n_puntos = 50 * 100 * 100 * 40
+    workers = sorted({1, 2, 4, os.cpu_count() or 1})
+    r = {}
+    for w in workers:
+        nombre = f"grilla/workers={w}/n={n_puntos}"
+        if args.filtro in nombre:
+            r[nombre] = medir(lambda w=w: bg.grilla_breakeven(*ejes, max_workers=w, como='arrays', **FIJOS),
+                              repeticiones=args.repeticiones, items=n_puntos)
+    return r
+
+
+if __name__ == "__main__":
+    main(__doc__, correr)
@@ -0,0 +1,89 @@
+"""
+Benchmarks de los caminos calientes de financial_utils.
+
+    python benchmarks/bench_financial_utils.py --guardar base.json
+    python benchmarks/bench_financial_utils.py --comparar base.json --umbral 0.15
+"""
+import datetime as dt
+import logging
+
+import numpy as np
+
+from harness import main, medir
+
+import breakeven_cache
+import financial_utils as fu
+
+TAMANIOS_ESCALAR = (1, 100, 1000)
+TAMANIOS_BATCH = (100, 10_000, 100_000)
+SPANS_DIAS_HABILES = (10, 250, 2500)
+
+ARGS_BONO = dict(fechaVencimiento='31-10-2025',
+                 fechaMercado=dt.date(2025, 2, 27),
+                 tf_precioVencimiento=132.82,
+                 tf_precioMercado=110.6,
+                 cer_tasaReal=0,
+                 cer_precioMercado=109.7,
+                 indiceCER_Mercado=540.5638,
+                 cer_fechaEmision='31-10-2024',
+                 indiceCER_inicial=487.6705)
+
+
+def _fechas(n, desde=dt.date(2020, 1, 1)):
+    return [desde + dt.timedelta(days=i % 2000) for i in range(n)]
+
+
+def correr(args):
+    logging.disable(logging.CRITICAL)
+    r = {}
+
+    def agregar(nombre, funcion, items):
+        if args.filtro in nombre:
+            r[nombre] = medir(funcion, repeticiones=args.repeticiones, items=items)
+
+    # --- BreakevenInflationCalculator ---
+    for n in TAMANIOS_ESCALAR:
+        agregar(f"breakeven/constructor/escalar/n={n}",
+                lambda n=n: [fu.BreakevenInflationCalculator(**ARGS_BONO) for _ in range(n)], n)
+    cache = breakeven_cache.CacheBreakeven()
+    for n in TAMANIOS_ESCALAR:
+        agregar(f"breakeven/cache_memoria/hits/n={n}", lambda n=n: [cache.calcular(**ARGS_BONO) for _ in range(n)], n)
+    for n in TAMANIOS_BATCH:
+        precios = np.linspace(90, 130, n)
+        agregar(f"breakeven/batch/n={n}",
+                lambda precios=precios: fu.calcular_breakeven_batch(**{**ARGS_BONO, "tf_precioMercado": precios}), n)
+
+    # --- calc_aniosSegunConvencion ---
+    for convencion in ("ACT_365F", "THIRTY_360_BOND"):
+        for n in TAMANIOS_ESCALAR + (10_000,):
+            inicios = _fechas(n)
+            agregar(f"anios/{convencion}/escalar/n={n}",
+                    lambda inicios=inicios, c=convencion: [fu.calc_aniosSegunConvencion(f, dt.date(2030, 6, 30), c) for f in inicios], n)
+        for n in TAMANIOS_BATCH:
+            inicios = np.array(_fechas(n), dtype='datetime64[D]')
+            agregar(f"anios/{convencion}/batch/n={n}",
+                    lambda inicios=inicios, c=convencion: fu.day_count.year_frac(inicios, np.datetime64('2030-06-30'), c), n)
+
+    # --- sumar / restar días hábiles ---
+    for span in SPANS_DIAS_HABILES:
+        fechas = _fechas(100)
+        agregar(f"dias_habiles/sumar/span={span}/n=100",
+                lambda fechas=fechas, span=span: [fu.sumarXDiasHabiles(f, span) for f in fechas], 100)
+        agregar(f"dias_habiles/restar/span={span}/n=100",
+                lambda fechas=fechas, span=span: [fu.restar10DiasHabiles(f, span) for f in fechas], 100)
+
+    # --- IPC_publication_months ---
+    for n in TAMANIOS_ESCALAR:
+        inicios = _fechas(n)
+        # sin cache: cada repetición arranca con el LRU vacío
+        agregar(f"ipc/distintas_fechas/n={n}",
+                lambda inicios=inicios: (fu._IPC_publication_months.cache_clear(),
+                                         [fu.IPC_publication_months(f, f + dt.timedelta(days=700)) for f in inicios]), n)
+        agregar(f"ipc/misma_fecha/n={n}",
+                lambda n=n: [fu.IPC_publication_months(dt.date(2025, 2, 27), dt.date(2026, 10, 31)) for _ in range(n)], n)
+
+    return r
+
+
+if __name__ == "__main__":
+    main(__doc__, correr)
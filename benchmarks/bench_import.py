@@ -0,0 +1,41 @@
+"""
+Tiempo de arranque en frío: cada medición es un proceso de Python nuevo.
+
+Compara importar financial_utils (con financepy/pandas/holidays diferidos) contra importar
+las dependencias que el módulo cargaba antes al importarse, y el costo de la primera llamada.
+
+    python benchmarks/bench_import.py --guardar import.json
+"""
+import subprocess
+import sys
+
+from harness import RAIZ_REPO, main, medir
+
+CASOS = {
+    "import/financial_utils": "import financial_utils",
+    "import/dependencias_eager_anteriores": "import financepy.utils, pandas, holidays, dateutil.relativedelta, logging; "
+                                            "logging.basicConfig()",
+    "primer_uso/sumarXDiasHabiles": "import financial_utils as fu; fu.sumarXDiasHabiles('16-09-2025', 10)",
+    "primer_uso/calc_aniosSegunConvencion": "import financial_utils as fu; fu.calc_aniosSegunConvencion('27-02-2025', '31-10-2025')",
+    "primer_uso/BreakevenInflationCalculator": (
+        "import financial_utils as fu; fu.BreakevenInflationCalculator(fechaVencimiento='31-10-2025', "
+        "fechaMercado='27-02-2025', tf_precioVencimiento=132.82, tf_precioMercado=110.6, cer_tasaReal=0, "
+        "cer_precioMercado=109.7, indiceCER_Mercado=540.5638, cer_fechaEmision='31-10-2024', indiceCER_inicial=487.6705)"
+    ),
+}
+
+
+def _proceso(codigo):
+    def correr():
+        subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ_REPO, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return correr
+
+
+def correr(args):
+    return {nombre: medir(_proceso(codigo), repeticiones=args.repeticiones)
+            for nombre, codigo in CASOS.items() if args.filtro in nombre}
+
+
+if __name__ == "__main__":
+    main(__doc__, correr)
@@ -0,0 +1,208 @@
+"""
+Memoria y latencia de las distintas formas de guardar resultados breakeven:
+objetos BreakevenInflationCalculator, ResultadosBreakeven (columnas NumPy) y el DataFrame de calcular_breakeven_batch.
+La línea de base es CalculadorConDict, una copia de la clase como era antes de __slots__ y de los textos perezosos.
+
+    python benchmarks/bench_resultados.py --guardar base.json
+    python benchmarks/bench_resultados.py --comparar base.json
+"""
+import datetime as dt
+import logging
+from functools import cached_property
+
+import numpy as np
+
+from harness import main, medir, medir_memoria
+
+import financial_utils as fu
+
+TAMANIOS = (1000, 100_000)
+
+ARGS_BONO = dict(fechaVencimiento='31-10-2025',
+                 fechaMercado=dt.date(2025, 2, 27),
+                 tf_precioVencimiento=132.82,
+                 tf_precioMercado=110.6,
+                 cer_tasaReal=0,
+                 cer_precioMercado=109.7,
+                 indiceCER_Mercado=540.5638,
+                 cer_fechaEmision='31-10-2024',
+                 indiceCER_inicial=487.6705)
+
+
+class CalculadorConDict:
+    """
+    Copia de BreakevenInflationCalculator antes de usar __slots__: atributos en __dict__, textos armados en el
+    constructor o con cached_property. Sólo para comparar memoria y latencia contra la clase actual.
+    """
+
+    def __init__(self,
+                 fechaVencimiento=None,
+                 fechaMercado=None,
+
+                 tf_precioVencimiento=None,
+                 tf_precioMercado=None,
+
+                 dayCountConvention='ACT_365F',
+
+                 cer_tasaReal=None,
+                 cer_precioMercado=None,
+                 indiceCER_Mercado=None,
+                 cer_fechaEmision=None,
+                 indiceCER_inicial=None,
+
+                 serieCER=None,
+                 ):
+        self.fechaVencimiento = fechaVencimiento
+        self.fechaMercado = fechaMercado
+
+        self.tf_precioVencimiento = tf_precioVencimiento
+        self.tf_precioMercado = tf_precioMercado
+
+        self.dayCountConvention = dayCountConvention
+
+        self.cer_tasaReal = cer_tasaReal
+        self.cer_precioMercado = cer_precioMercado
+        self.indiceCER_Mercado = indiceCER_Mercado
+        self.cer_fechaEmision = cer_fechaEmision
+        self.indiceCER_inicial = indiceCER_inicial
+
+        # Si se pasa una serie de CER (cer_store.SerieIndice), los CER que falten se buscan por fecha
+        if serieCER is not None:
+            if self.indiceCER_Mercado is None:
+                self.indiceCER_Mercado = serieCER.valor_cer(self.fechaMercado)
+            if self.indiceCER_inicial is None:
+                self.indiceCER_inicial = serieCER.valor_cer(self.cer_fechaEmision)
+
+        # Cálculos NO iniciales
+
+        # self.i es el interés simple del bono_tf entre las fechas de liquidación y de vencimiento
+        self.i = self.tf_precioVencimiento / self.tf_precioMercado
+
+        # maturity es la duration de ambos bonos medido en años
+        
+        
+        self.maturity_tf, self.dias_tf = fu.calc_aniosYDiasSegunConvencion(fechaInicial=self.fechaMercado,
+                                                                           fechaFinal=self.fechaVencimiento,
+                                                                           convencion=self.dayCountConvention)
+
+        self.maturity_cer = fu.calc_aniosSegunConvencion(fechaInicial=self.cer_fechaEmision,
+                                                        fechaFinal=self.fechaVencimiento,
+                                                        convencion=self.dayCountConvention)
+        
+        # r_fija es la TEA del bono_tf calculado a precio de mercado calculado el día "Fecha de Liquidación" (fechaMercado)
+        self.r_fija = self.i ** (1 / self.maturity_tf) - 1
+
+        # 100 * (CER_FINAL/self.indiceCER_inicial) * (1 + self.cer_tasaReal) = i
+        #     (CER_FINAL/self.indiceCER_inicial) =  i / (100*(1 + self.cer_tasaReal))
+        #     CER_FINAL =  i * self.indiceCER_inicial / (100*(1 + self.cer_tasaReal))
+
+        # CER a la fecha de vencimiento para que el bono_tf sea breakeven al bono_cer
+        self.indiceCER_final = self.i * self.indiceCER_inicial * self.cer_precioMercado / 100 /  ((1 + self.cer_tasaReal) ** self.maturity_cer)
+        self.cer_precioVencimiento = 100 * self.indiceCER_final / self.indiceCER_inicial * ( (1+self.cer_tasaReal) ** self.maturity_cer)
+                     
+        # (1+TEA)**maturity_tf =  indiceCER_final/indiceCER_Mercado
+        self.breakevenInflationTEA = (self.indiceCER_final / self.indiceCER_Mercado) ** (1 / self.maturity_tf) - 1
+        self.breakevenInflationTEM = (1+self.breakevenInflationTEA) ** (1/12) - 1       
+
+        # Derivadas parciales analíticas de breakevenInflationTEA (para cobertura, sin bumpear instancias)
+        sensibilidades = fu._sensibilidades(self.breakevenInflationTEA, self.maturity_tf, self.maturity_cer,
+                                            self.tf_precioMercado, self.cer_precioMercado, self.indiceCER_Mercado,
+                                            self.cer_tasaReal)
+        self.dBEI_dtf_precioMercado = sensibilidades['dBEI_dtf_precioMercado']
+        self.dBEI_dcer_precioMercado = sensibilidades['dBEI_dcer_precioMercado']
+        self.dBEI_dindiceCER_Mercado = sensibilidades['dBEI_dindiceCER_Mercado']
+        self.dBEI_dcer_tasaReal = sensibilidades['dBEI_dcer_tasaReal']
+
+        self.interpretacionResultado = f"""
+Se calculó una inflación breakeven de {round(100 * self.breakevenInflationTEA, 2)}% TEA.
+Este valor de inflación implícito anualizado es el esperado por el Mercado entre las fechas {self.fechaMercado} y {self.fechaVencimiento}.                    
+            """
+
+    @cached_property
+    def IPCs(self):
+        return fu.IPC_publication_months(self.fechaMercado, self.fechaVencimiento)
+
+    @cached_property
+    def imprimirCalculos(self):
+        return f"""
+
+        BONO TASA FIJA:
+        FECHA DE MERCADO : {self.fechaMercado}
+        FECHA DE VENCIMIENTO : {self.fechaVencimiento}
+        PRECIO DE MERCADO {self.tf_precioMercado}
+        PAGO AL VENCIMIENTO : {self.tf_precioVencimiento}
+        
+
+        BONO CER:
+        FECHA DE MERCADO : {self.fechaMercado}
+        FECHA DE VENCIMIENTO : {self.fechaVencimiento}
+        FECHA DE EMISIÓN : {self.cer_fechaEmision}
+        PRECIO DE MERCADO: {self.cer_precioMercado}
+        INTERÉS REAL AL VENCIMIENTO: {self.cer_tasaReal}
+        CER DE EMISIÓN : {self.indiceCER_inicial}
+        CER DE MERCADO : {self.indiceCER_Mercado}
+
+        -----------------  -----------------
+        CONVENCIÓN DE DÍAS : {self.dayCountConvention}
+
+        MATURITY DE AMBOS BONOS [AÑOS]: {round(self.maturity_tf, 2)}
+        MATURITY DE AMBOS BONOS [DÍAS]: {self.dias_tf}
+        MATURITY DESDE EMISIÓN, HASTA VENCIMIENTO DEL BONO CER [AÑOS] : {round(self.maturity_cer, 2)} 
+
+        -----------------  -----------------
+        
+        CÁCULOS:
+
+        Interés simple que paga el bono tasa fija en el mercado : {round((self.i-1)*100, 2)} %
+        TEA bono tasa fija en el mercado: {round(self.r_fija*100, 2)} %
+        CER AL VENCIMIENTO : {round(self.indiceCER_final, 4)}
+        PAGO AL VENCIMIENTO BONO CER (SUPONIENDO BREAK-EVEN INFLATION) : ${round(self.cer_precioVencimiento, 2)}
+        BREAK-EVEN INFLATION (TEA): {round(self.breakevenInflationTEA*100, 2)} %
+        BREAK-EVEN INFLATION (TEM): {round(self.breakevenInflationTEM*100, 2)} %
+
+        IPCS INVOLUCRADOS EN EL CÁLCULO DEL CER DEL BONO TASA FIJA : {self.IPCs}
+        
+        """
+
+
+
+def correr(args):
+    logging.disable(logging.CRITICAL)
+    r = {}
+
+    def agregar(nombre, funcion, items, memoria=True):
+        if args.filtro in nombre:
+            r[nombre] = medir(funcion, repeticiones=args.repeticiones, items=items)
+            if memoria:
+                r[nombre].update(medir_memoria(funcion, items))
+
+    for n in TAMANIOS:
+        precios = np.linspace(90, 130, n)
+        agregar(f"resultados/objetos_dict/n={n}",
+                lambda precios=precios: [CalculadorConDict(**{**ARGS_BONO, "tf_precioMercado": p})
+                                         for p in precios.tolist()], n)
+        agregar(f"resultados/objetos/n={n}",
+                lambda precios=precios: [fu.BreakevenInflationCalculator(**{**ARGS_BONO, "tf_precioMercado": p})
+                                         for p in precios.tolist()], n)
+        agregar(f"resultados/columnas/n={n}",
+                lambda precios=precios: fu.calcular_breakeven_batch(como='resultados',
+                                                                    **{**ARGS_BONO, "tf_precioMercado": precios}), n)
+        agregar(f"resultados/dataframe/n={n}",
+                lambda precios=precios: fu.calcular_breakeven_batch(**{**ARGS_BONO, "tf_precioMercado": precios}), n)
+
+    # Leer un resultado y armar los textos (antes se formateaban siempre en el constructor)
+    calculador = fu.BreakevenInflationCalculator(**ARGS_BONO)
+    calculador_dict = CalculadorConDict(**ARGS_BONO)
+    fila = fu.calcular_breakeven_batch(como='resultados', **ARGS_BONO)[0]
+    agregar("lectura/objeto_dict/breakevenInflationTEA", lambda: calculador_dict.breakevenInflationTEA, 1, memoria=False)
+    agregar("lectura/objeto/breakevenInflationTEA", lambda: calculador.breakevenInflationTEA, 1, memoria=False)
+    agregar("lectura/fila/breakevenInflationTEA", lambda: fila.breakevenInflationTEA, 1, memoria=False)
+    agregar("textos/objeto/interpretacionResultado", lambda: calculador.interpretacionResultado, 1, memoria=False)
+    agregar("textos/objeto/imprimirCalculos", lambda: calculador.imprimirCalculos, 1, memoria=False)
+    agregar("textos/fila/imprimirCalculos", lambda: fila.imprimirCalculos, 1, memoria=False)
+
+    return r
+
+
+if __name__ == "__main__":
+    main(__doc__, correr)
@@ -0,0 +1,158 @@
+"""
+Prueba de carga del visor de precios contra un Supabase falso en memoria (sin red).
+
+Cada usuario simulado es un hilo que repite el ciclo de la UI, todo vía async_store como en la app: carga
+completa (cargar_precios), edición de una fracción de filas, guardado por diferencias (guardar_diff, como el
+botón de guardar), sincronización incremental (sincronizar_precios) y, con --reemplazar, el guardado completo vía user_data2_tmp
+(async_store.reemplazar_tabla, lo que usa replace_table_with_retry). Reporta p50/p95/p99 y operaciones/s por
+operación y escenario. --fallas-tardias aplica el cambio y falla igual (commit y después timeout).
+
+    python benchmarks/carga_precios.py --usuarios 1 10 --filas 1000 50000 --latencia-ms 20
+    python benchmarks/carga_precios.py --usuarios 10 --filas 10000 --fallas 0.02 --guardar carga.json
+    python benchmarks/carga_precios.py --usuarios 5 --filas 5000 --fallas-tardias 0.05 --reemplazar
+"""
+import logging
+import random
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from harness import main, percentiles
+from supabase_falso import ClienteFalso
+
+import async_store
+import price_store as ps
+
+OPERACIONES = ("cargar", "guardar_diff", "sincronizar", "reemplazar")
+
+
+def _filas_iniciales(user_id, n):
+    ahora = str(pd.Timestamp.now() - pd.Timedelta(days=1))
+    return [{"user_id": user_id, "ean": f"779{i:010d}", "price": round(100 + i * 0.01, 2), "last_modification": ahora}
+            for i in range(n)]
+
+
+def _editar(df, fraccion, azar):
+    """Cambia el precio de una fracción de filas, borra unas pocas y agrega otras tantas (como en el editor)."""
+    editado = df.copy()
+    n = len(editado)
+    cambios = azar.sample(range(n), max(1, int(n * fraccion))) if n else []
+    editado.loc[cambios, "price"] = editado.loc[cambios, "price"] * 1.05
+    borrados = max(0, int(n * fraccion / 10))
+    editado = editado.iloc[borrados:]
+    nuevos = pd.DataFrame({"ean": [f"999{azar.randrange(10 ** 10):010d}" for _ in range(borrados)],
+                           "price": [1.0] * borrados, "last_modification": [pd.NaT] * borrados})
+    return pd.concat([editado, nuevos], ignore_index=True)
+
+
+def _usuario(cliente, user_id, args, tiempos, errores, barrera):
+    azar = random.Random(user_id)
+    kwargs = dict(max_attempts=args.intentos, sleep_time=args.backoff)
+    barrera.wait()
+    for _ in range(args.iteraciones):
+        for operacion in OPERACIONES:
+            if operacion == "reemplazar" and not args.reemplazar:
+                continue
+            inicio = time.perf_counter()
+            try:
+                if operacion == "cargar":
+                    df = async_store.correr(async_store.cargar_precios(cliente, user_id, forzar=True, **kwargs))
+                elif operacion == "guardar_diff":
+                    async_store.correr(async_store.guardar_diff(cliente, user_id, df, _editar(df, args.fraccion_editada, azar),
+                                                                **kwargs))
+                elif operacion == "sincronizar":
+                    df = async_store.correr(async_store.sincronizar_precios(cliente, user_id, **kwargs))
+                else:
+                    records = ps.registros_para_guardar(df, user_id)
+                    async_store.correr(async_store.reemplazar_tabla(cliente, user_id, records, limpiar_en_segundo_plano=False,
+                                                                    **kwargs))
+            except Exception:
+                errores[operacion] += 1
+                if operacion == "cargar":
+                    break  # sin datos cargados no tiene sentido seguir el ciclo
+                continue
+            finally:
+                tiempos[operacion].append(time.perf_counter() - inicio)
+
+
+def escenario(usuarios, filas, args):
+    cliente = ClienteFalso(latencia=args.latencia_ms / 1000, latencia_por_fila=args.latencia_por_fila_us / 1e6,
+                           jitter=args.jitter_ms / 1000, tasa_fallas=args.fallas,
+                           tasa_fallas_tardias=args.fallas_tardias, semilla=0)
+    user_ids = [f"usuario-{n}" for n in range(usuarios)]
+    for user_id in user_ids:
+        cliente.cargar(ps.TABLA, _filas_iniciales(user_id, filas))
+    ps.invalidar_cache_precios()
+
+    tiempos = {operacion: [] for operacion in OPERACIONES}
+    errores = {operacion: 0 for operacion in OPERACIONES}
+    barrera = threading.Barrier(usuarios + 1)
+    hilos = [threading.Thread(target=_usuario, args=(cliente, user_id, args, tiempos, errores, barrera))
+             for user_id in user_ids]
+    for hilo in hilos:
+        hilo.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    resultados = {}
+    for operacion, lista in tiempos.items():
+        if not lista:
+            continue
+        resultados[f"carga/{operacion}/usuarios={usuarios}/filas={filas}"] = {
+            "items": filas,
+            "repeticiones": len(lista),
+            "mejor_s": min(lista),
+            "mediana_s": float(np.median(lista)),
+            "por_item_us": 1e6 * float(np.median(lista)) / max(filas, 1),
+            **percentiles(lista),
+            "ops_por_s": len(lista) / duracion,
+            "filas_por_s": len(lista) * filas / duracion,
+            "errores": errores[operacion],
+        }
+    resultados[f"carga/total/usuarios={usuarios}/filas={filas}"] = {
+        "items": filas,
+        "repeticiones": sum(map(len, tiempos.values())),
+        "mejor_s": duracion,
+        "mediana_s": duracion,
+        "por_item_us": 1e6 * duracion / max(filas * usuarios, 1),
+        "ops_por_s": sum(map(len, tiempos.values())) / duracion,
+        "requests": cliente.requests,
+        "fallas_inyectadas": cliente.fallas,
+        "errores": sum(errores.values()),
+    }
+    return resultados
+
+
+def argumentos(p):
+    p.add_argument("--usuarios", type=int, nargs="+", default=[1, 5])
+    p.add_argument("--filas", type=int, nargs="+", default=[1000, 10_000])
+    p.add_argument("--iteraciones", type=int, default=3, help="ciclos cargar/guardar/sincronizar por usuario")
+    p.add_argument("--latencia-ms", type=float, default=20.0, help="latencia fija por request")
+    p.add_argument("--latencia-por-fila-us", type=float, default=2.0, help="latencia extra por fila transferida")
+    p.add_argument("--jitter-ms", type=float, default=10.0)
+    p.add_argument("--fallas", type=float, default=0.0, help="probabilidad de falla por request")
+    p.add_argument("--fallas-tardias", type=float, default=0.0,
+                   help="probabilidad de que un request aplique el cambio y falle igual")
+    p.add_argument("--fraccion-editada", type=float, default=0.01)
+    p.add_argument("--intentos", type=int, default=3)
+    p.add_argument("--backoff", type=float, default=0.05)
+    p.add_argument("--reemplazar", action="store_true", help="incluir el guardado completo vía user_data2_tmp")
+
+
+def correr(args):
+    logging.disable(logging.CRITICAL)
+    r = {}
+    for usuarios in args.usuarios:
+        for filas in args.filas:
+            if args.filtro in f"usuarios={usuarios}/filas={filas}":
+                r.update(escenario(usuarios, filas, args))
+    return r
+
+
+if __name__ == "__main__":
+    main(__doc__, correr, argumentos)
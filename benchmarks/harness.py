@@ -0,0 +1,129 @@
+"""
+Utilidades mínimas para benchmarks: medir, guardar resultados en JSON y comparar contra una corrida anterior.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_REPO not in sys.path:
+    sys.path.insert(0, RAIZ_REPO)
+
+
+def medir(funcion, repeticiones: int = 5, items: int = 1, warmup: int = 1) -> dict:
+    """Corre funcion() `repeticiones` veces (después de `warmup` corridas) y devuelve tiempos en segundos."""
+    for _ in range(warmup):
+        funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    mediana = statistics.median(tiempos)
+    return {
+        "items": items,
+        "repeticiones": repeticiones,
+        "mejor_s": min(tiempos),
+        "mediana_s": mediana,
+        "por_item_us": 1e6 * mediana / items,
+    }
+
+
+def medir_memoria(funcion, items: int = 1) -> dict:
+    """Memoria que queda retenida por lo que devuelve funcion() (medida con tracemalloc)."""
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        resultado = funcion()
+        retenido = tracemalloc.get_traced_memory()[0] - antes
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return {"bytes": retenido, "bytes_por_item": retenido / items}
+
+
+def metadata() -> dict:
+    return {
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "procesador": platform.processor(),
+    }
+
+
+def guardar(resultados: dict, ruta: str):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"metadata": metadata(), "resultados": resultados}, f, indent=2, ensure_ascii=False)
+
+
+def comparar(resultados: dict, ruta_base: str, umbral: float = 0.10, metrica: str = "mediana_s") -> list:
+    """
+    Compara contra un JSON guardado con guardar(). Devuelve la lista de (nombre, base, actual, ratio)
+    cuyo tiempo empeoró más que `umbral` (0.10 = 10%).
+    """
+    with open(ruta_base, encoding="utf-8") as f:
+        base = json.load(f)["resultados"]
+    regresiones = []
+    for nombre, actual in resultados.items():
+        if nombre not in base:
+            continue
+        ratio = actual[metrica] / base[nombre][metrica] if base[nombre][metrica] else float("inf")
+        print(f"{nombre:<60} {base[nombre][metrica]:>12.6f} -> {actual[metrica]:>12.6f}  x{ratio:.2f}")
+        if ratio > 1 + umbral:
+            regresiones.append((nombre, base[nombre][metrica], actual[metrica], ratio))
+    return regresiones
+
+
+def percentiles(tiempos, cuantiles=(50, 95, 99)) -> dict:
+    """{"p50_s": ..., "p95_s": ..., "p99_s": ...} de una lista de tiempos en segundos."""
+    ordenados = sorted(tiempos)
+    if not ordenados:
+        return {}
+    return {f"p{q}_s": ordenados[min(len(ordenados) * q // 100, len(ordenados) - 1)] for q in cuantiles}
+
+
+def imprimir(resultados: dict):
+    for nombre, r in resultados.items():
+        memoria = f"  {r['bytes_por_item']:>10.1f} B/item" if "bytes_por_item" in r else ""
+        colas = "".join(f"  p{q} {r[f'p{q}_s']:>9.4f}s" for q in (95, 99) if f"p{q}_s" in r)
+        caudal = f"  {r['ops_por_s']:>9.1f} ops/s" if "ops_por_s" in r else ""
+        print(f"{nombre:<60} mediana {r['mediana_s']:>10.6f}s  {r['por_item_us']:>12.3f} us/item{memoria}{colas}{caudal}"
+              f"  (n={r['items']})")
+
+
+def parser(descripcion: str) -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description=descripcion)
+    p.add_argument("--guardar", metavar="JSON", help="guardar resultados en este archivo")
+    p.add_argument("--comparar", metavar="JSON", help="comparar contra resultados guardados y fallar si hay regresiones")
+    p.add_argument("--umbral", type=float, default=0.10, help="empeoramiento tolerado al comparar (default 0.10 = 10%%)")
+    p.add_argument("--repeticiones", type=int, default=5)
+    p.add_argument("--filtro", default="", help="sólo correr benchmarks cuyo nombre contenga este texto")
+    return p
+
+
+def main(descripcion: str, correr, argumentos=None):
+    """
+    correr(args) debe devolver {nombre: medir(...)}.
+    argumentos(parser), si se pasa, agrega opciones propias del benchmark.
+    """
+    p = parser(descripcion)
+    if argumentos is not None:
+        argumentos(p)
+    args = p.parse_args()
+    resultados = correr(args)
+    imprimir(resultados)
+    if args.guardar:
+        guardar(resultados, args.guardar)
+    if args.comparar:
+        regresiones = comparar(resultados, args.comparar, args.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresión(es) de más de {args.umbral:.0%}:")
+            for nombre, base, actual, ratio in regresiones:
+                print(f"  {nombre}: {base:.6f}s -> {actual:.6f}s (x{ratio:.2f})")
+            sys.exit(1)
+    return resultados
@@ -0,0 +1,280 @@
+"""
+Cliente falso de Supabase/PostgREST en memoria, para pruebas de carga sin red.
+
+Implementa la parte de la API que usan price_store y async_store:
+    cliente.table(nombre).select(columnas, count=None) / insert(filas) / upsert(filas, on_conflict=None) / delete()
+        .eq(col, valor) / .in_(col, valores) / .gt(col, valor) / .order(col, desc=False) / .range(desde, hasta)
+        .limit(n) / .execute()
+con las mismas reglas que importan para medir: max_rows corta los select (1000 por defecto, como Supabase),
+las restricciones únicas rechazan duplicados y un upsert no puede tocar dos veces la misma fila.
+Se le puede inyectar latencia (fija + por fila + jitter) y fallas, antes o después de aplicar el cambio.
+"""
+import datetime as dt
+import itertools
+import random
+import threading
+import time
+
+
+class ErrorFalso(ConnectionError):
+    """Falla inyectada (o violación de restricción) del servidor falso."""
+
+
+class RespuestaFalsa:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+        self.error = None
+
+
+def _comparable(valor):
+    # Las fechas viajan como texto (str(pd.Timestamp) o isoformat): se comparan como datetime sin zona
+    if isinstance(valor, str):
+        try:
+            return dt.datetime.fromisoformat(valor).replace(tzinfo=None)
+        except ValueError:
+            return valor
+    return valor
+
+
+class ClienteFalso:
+    """
+    latencia: segundos fijos por request; latencia_por_fila: segundos extra por fila enviada o devuelta;
+    jitter: segundos extra uniformes en [0, jitter]. tasa_fallas: probabilidad de fallar sin aplicar el cambio;
+    tasa_fallas_tardias: probabilidad de aplicar el cambio y fallar igual (como un timeout después del commit).
+    unicos: {tabla: (columnas...)} restricciones únicas, que deben incluir user_id
+    (por defecto (user_id, ean) en user_data2).
+
+    Las filas se guardan particionadas por user_id (como un índice) y el orden de cada partición se cachea
+    hasta la próxima escritura, así el servidor falso no es el cuello de botella de la prueba de carga.
+    """
+
+    def __init__(self, latencia: float = 0.0, latencia_por_fila: float = 0.0, jitter: float = 0.0,
+                 tasa_fallas: float = 0.0, tasa_fallas_tardias: float = 0.0, max_rows: int = 1000,
+                 unicos: dict = None, semilla: int = None):
+        self.latencia = latencia
+        self.latencia_por_fila = latencia_por_fila
+        self.jitter = jitter
+        self.tasa_fallas = tasa_fallas
+        self.tasa_fallas_tardias = tasa_fallas_tardias
+        self.max_rows = max_rows
+        self.unicos = {"user_data2": ("user_id", "ean")} if unicos is None else unicos
+        self._random = random.Random(semilla)
+        self._lock = threading.Lock()
+        self._tablas = {}  # tabla -> {user_id: {clave: fila}}
+        self._versiones = {}  # (tabla, user_id) -> cantidad de escrituras
+        self._ordenes = {}  # (tabla, user_id, orden) -> (versión, filas ordenadas)
+        self._ids = itertools.count()
+        self.requests = 0
+        self.fallas = 0
+        self.filas_transferidas = 0
+
+    def table(self, nombre: str):
+        return ConsultaFalsa(self, nombre)
+
+    def filas(self, tabla: str) -> list:
+        """Copia del contenido de una tabla (sin latencia ni fallas)."""
+        with self._lock:
+            return [dict(fila) for particion in self._tablas.get(tabla, {}).values() for fila in particion.values()]
+
+    def cargar(self, tabla: str, filas: list):
+        """Agrega o reemplaza filas directamente, sin latencia ni fallas (para preparar escenarios)."""
+        with self._lock:
+            self._guardar(tabla, [dict(fila) for fila in filas], self.unicos.get(tabla))
+
+    def _sortear(self, tasa):
+        with self._lock:
+            return tasa > 0 and self._random.random() < tasa
+
+    def _esperar(self, filas):
+        with self._lock:
+            extra = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+        demora = self.latencia + self.latencia_por_fila * filas + extra
+        if demora > 0:
+            time.sleep(demora)
+
+    def _ejecutar(self, consulta):
+        filas_enviadas = len(consulta.filas_nuevas or ())
+        with self._lock:
+            self.requests += 1
+        if self._sortear(self.tasa_fallas):
+            self._esperar(filas_enviadas)
+            with self._lock:
+                self.fallas += 1
+            raise ErrorFalso(f"Falla inyectada en {consulta.operacion} sobre {consulta.tabla}")
+
+        with self._lock:
+            respuesta = self._aplicar(consulta)
+            self.filas_transferidas += filas_enviadas + len(respuesta.data)
+        self._esperar(filas_enviadas + len(respuesta.data))
+
+        if self._sortear(self.tasa_fallas_tardias):
+            with self._lock:
+                self.fallas += 1
+            raise ErrorFalso(f"Falla inyectada después de aplicar {consulta.operacion} sobre {consulta.tabla}")
+        return respuesta
+
+    # --- Lo que sigue se llama con el lock tomado ---
+
+    def _particiones(self, consulta):
+        tabla = self._tablas.setdefault(consulta.tabla, {})
+        if consulta.usuario is not _SIN_FILTRO:
+            return [(consulta.usuario, tabla.get(consulta.usuario, {}))]
+        return list(tabla.items())
+
+    def _tocar(self, tabla, usuario):
+        self._versiones[(tabla, usuario)] = self._versiones.get((tabla, usuario), 0) + 1
+
+    def _ordenadas(self, tabla, usuario, particion, orden):
+        clave = (tabla, usuario, tuple(orden))
+        version = self._versiones.get((tabla, usuario), 0)
+        cacheado = self._ordenes.get(clave)
+        if cacheado is None or cacheado[0] != version:
+            cacheado = self._ordenes[clave] = (version, _ordenar(list(particion.values()), orden))
+        return cacheado[1]
+
+    def _aplicar(self, consulta):
+        if consulta.operacion in ("insert", "upsert"):
+            return RespuestaFalsa(self._escribir(consulta))
+
+        particiones = self._particiones(consulta)
+        if consulta.operacion == "delete":
+            borradas = []
+            for usuario, particion in particiones:
+                claves = [clave for clave, fila in particion.items() if consulta.coincide(fila)]
+                borradas.extend(particion.pop(clave) for clave in claves)
+                if claves:
+                    self._tocar(consulta.tabla, usuario)
+            return RespuestaFalsa(borradas)
+
+        if len(particiones) == 1 and consulta.orden:
+            usuario, particion = particiones[0]
+            seleccionadas = self._ordenadas(consulta.tabla, usuario, particion, consulta.orden)
+            if consulta.filtros:
+                seleccionadas = [fila for fila in seleccionadas if consulta.coincide(fila)]
+        else:
+            seleccionadas = [fila for _, particion in particiones for fila in particion.values() if consulta.coincide(fila)]
+            seleccionadas = _ordenar(seleccionadas, consulta.orden)
+
+        total = len(seleccionadas)
+        desde, hasta = consulta.rango if consulta.rango else (0, total - 1)
+        hasta = min(hasta, desde + self.max_rows - 1)
+        pagina = seleccionadas[desde:hasta + 1]
+        if consulta.columnas and consulta.columnas != "*":
+            columnas = [c.strip() for c in consulta.columnas.split(",")]
+            pagina = [{c: fila.get(c) for c in columnas} for fila in pagina]
+        else:
+            pagina = [dict(fila) for fila in pagina]
+        return RespuestaFalsa(pagina, total if consulta.contar else None)
+
+    def _escribir(self, consulta):
+        unico = self.unicos.get(consulta.tabla)
+        if consulta.operacion == "upsert":
+            unico = tuple(c.strip() for c in consulta.on_conflict.split(",")) if consulta.on_conflict else unico
+            if not unico:
+                raise ErrorFalso(f"upsert sin on_conflict ni restricción única en {consulta.tabla}")
+        filas = [dict(fila) for fila in consulta.filas_nuevas]
+        if unico:
+            claves = [tuple(fila.get(c) for c in unico) for fila in filas]
+            if len(set(claves)) != len(claves):
+                raise ErrorFalso("ON CONFLICT DO UPDATE command cannot affect row a second time")
+            if consulta.operacion == "insert":
+                tabla = self._tablas.get(consulta.tabla, {})
+                if any(clave in tabla.get(fila.get("user_id"), {}) for clave, fila in zip(claves, filas)):
+                    raise ErrorFalso(f"duplicate key value violates unique constraint on {consulta.tabla} {unico}")
+        self._guardar(consulta.tabla, filas, unico)
+        return [dict(fila) for fila in filas]
+
+    def _guardar(self, tabla, filas, unico):
+        tabla_actual = self._tablas.setdefault(tabla, {})
+        tocadas = set()
+        for fila in filas:
+            usuario = fila.get("user_id")
+            particion = tabla_actual.setdefault(usuario, {})
+            clave = tuple(fila.get(c) for c in unico) if unico else next(self._ids)
+            if clave in particion:
+                particion[clave].update(fila)
+            else:
+                particion[clave] = fila
+            tocadas.add(usuario)
+        for usuario in tocadas:
+            self._tocar(tabla, usuario)
+
+
+_SIN_FILTRO = object()
+
+
+def _ordenar(filas, orden):
+    for columna, desc in reversed(orden):
+        filas.sort(key=lambda fila: (fila.get(columna) is None, "" if fila.get(columna) is None else fila.get(columna)),
+                   reverse=desc)
+    return filas
+
+
+class ConsultaFalsa:
+    """Builder encadenable como el de postgrest-py; execute() la aplica sobre el ClienteFalso."""
+
+    def __init__(self, cliente, tabla):
+        self.cliente = cliente
+        self.tabla = tabla
+        self.operacion = "select"
+        self.columnas = "*"
+        self.contar = False
+        self.filas_nuevas = None
+        self.on_conflict = None
+        self.usuario = _SIN_FILTRO
+        self.filtros = []
+        self.orden = []
+        self.rango = None
+
+    def select(self, columnas="*", count=None):
+        self.operacion, self.columnas, self.contar = "select", columnas, count == "exact"
+        return self
+
+    def insert(self, filas):
+        self.operacion, self.filas_nuevas = "insert", [filas] if isinstance(filas, dict) else list(filas)
+        return self
+
+    def upsert(self, filas, on_conflict=None):
+        self.insert(filas)
+        self.operacion, self.on_conflict = "upsert", on_conflict
+        return self
+
+    def delete(self):
+        self.operacion = "delete"
+        return self
+
+    def eq(self, columna, valor):
+        if columna == "user_id" and self.usuario is _SIN_FILTRO:
+            self.usuario = valor  # se resuelve con la partición, sin recorrer la tabla
+        else:
+            self.filtros.append(lambda fila: fila.get(columna) == valor)
+        return self
+
+    def in_(self, columna, valores):
+        valores = set(valores)
+        self.filtros.append(lambda fila: fila.get(columna) in valores)
+        return self
+
+    def gt(self, columna, valor):
+        valor = _comparable(valor)
+        self.filtros.append(lambda fila: fila.get(columna) is not None and _comparable(fila.get(columna)) > valor)
+        return self
+
+    def order(self, columna, desc=False):
+        self.orden.append((columna, desc))
+        return self
+
+    def range(self, desde, hasta):
+        self.rango = (desde, hasta)
+        return self
+
+    def limit(self, n):
+        self.rango = (self.rango[0] if self.rango else 0, (self.rango[0] if self.rango else 0) + n - 1)
+        return self
+
+    def coincide(self, fila):
+        return all(filtro(fila) for filtro in self.filtros)
+
+    def execute(self):
+        return self.cliente._ejecutar(self)
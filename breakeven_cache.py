@@ -0,0 +1,303 @@
+"""
+Cache persistente de resultados de BreakevenInflationCalculator, direccionado por contenido.
+
+La clave es un hash de los datos de entrada normalizados (fechas ISO, números como float, convención por nombre)
+más la huella del calendario de feriados y, si los CER salen de una serie (serieCER), la versión de esa serie:
+si cambia el calendario o la serie, las claves cambian y los resultados viejos dejan de usarse solos.
+
+Dos niveles:
+    memoria  LRU por proceso (max_memoria entradas)
+    disco    SQLite en modo WAL (max_disco entradas, se revisa cada algunas escrituras), compartido por varios
+             procesos que usen la misma ruta; se desalojan las entradas usadas hace más tiempo.
+
+Es opt-in: sólo se usa a través de CacheBreakeven.calcular(...) (o calcular_cacheado con el cache del proceso).
+Los errores de SQLite (disco bloqueado, tabla corrupta) no rompen el cálculo: cuentan en errores_disco y
+se tratan como miss. Las conexiones (una por hilo) se cierran con cerrar() o usando el cache como context manager.
+Sólo conviene activarlo cuando los CER salen de una serie (serieCER) o para compartir el nivel en disco entre
+procesos: con las entradas ya resueltas, un acierto en memoria (armar la clave y el objeto, ~17-24 us) cuesta
+casi lo mismo que construir el calculador directamente (~27-32 us; ver bench_financial_utils).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+import financial_utils as fu
+from business_calendar import get_calendario_AR
+
+# Subir si cambian las fórmulas del calculador: invalida todo lo guardado
+VERSION_CALCULO = 1
+
+MAX_MEMORIA = 10_000
+MAX_DISCO = 1_000_000
+REVISAR_TAMANIO_CADA = 256  # escrituras a disco entre chequeos del tamaño de la tabla
+
+_ENTRADAS = ('fechaVencimiento', 'fechaMercado', 'tf_precioVencimiento', 'tf_precioMercado', 'dayCountConvention',
+             'cer_tasaReal', 'cer_precioMercado', 'indiceCER_Mercado', 'cer_fechaEmision', 'indiceCER_inicial')
+_FECHAS = ('fechaVencimiento', 'fechaMercado', 'cer_fechaEmision')
+_RESULTADOS = ('i', 'maturity_tf', 'dias_tf', 'maturity_cer', 'r_fija', 'indiceCER_final', 'cer_precioVencimiento',
+               'breakevenInflationTEA', 'breakevenInflationTEM') + fu.SENSIBILIDADES_BATCH + (
+               'indiceCER_Mercado', 'indiceCER_inicial')
+
+
+@lru_cache(maxsize=4096)
+def _fecha_texto_iso(fecha):
+    # strptime es lo más caro de armar la clave y las mismas fechas se repiten en todos los pedidos
+    return fu._parsear_fecha(fecha).isoformat()
+
+
+def _normalizar(nombre, valor):
+    if valor is None:
+        return None
+    if nombre == 'dayCountConvention':
+        return getattr(valor, 'name', valor)
+    if nombre in _FECHAS:
+        if isinstance(valor, str):
+            return _fecha_texto_iso(valor)
+        if isinstance(valor, np.datetime64):
+            return str(valor.astype('datetime64[D]'))
+        return fu._parsear_fecha(valor).isoformat()
+    return float(valor)
+
+
+def _a_json(valor):
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+class CacheBreakeven:
+    """
+    ruta=None deja sólo el nivel en memoria. calendario: el BusinessDayCalendar cuya huella entra en la clave
+    (por defecto el del proceso). `with CacheBreakeven(ruta) as cache:` cierra las conexiones al salir.
+    """
+
+    def __init__(self, ruta=None, max_memoria=MAX_MEMORIA, max_disco=MAX_DISCO, calendario=None):
+        self.ruta = ruta
+        self.max_memoria = max_memoria
+        self.max_disco = max_disco
+        self.calendario = calendario
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()  # una conexión SQLite por hilo
+        self._conexiones = []  # todas las abiertas, para cerrarlas desde cualquier hilo
+        self._generacion = 0  # sube en cerrar(): las conexiones de generaciones anteriores ya están cerradas
+        self._escrituras = 0
+        self._estadisticas = dict.fromkeys(('hits_memoria', 'hits_disco', 'misses', 'desalojos_memoria',
+                                            'desalojos_disco', 'errores_disco'), 0)
+        if ruta is not None:
+            self._conexion()
+
+    # --- Claves ---
+
+    def _huella_calendario(self):
+        return (self.calendario or get_calendario_AR()).huella
+
+    def clave(self, serieCER=None, **entradas):
+        """Hash de las entradas normalizadas + huella del calendario (+ versión de serieCER si se usa)."""
+        desconocidas = entradas.keys() - set(_ENTRADAS)
+        if desconocidas:
+            # Sin esto un acierto ignoraría en silencio lo que en un miss levanta TypeError en el constructor
+            raise TypeError(f"Argumentos desconocidos para BreakevenInflationCalculator: {sorted(desconocidas)}")
+        entradas = {'dayCountConvention': 'ACT_365F', **entradas}
+        normalizadas = tuple(_normalizar(nombre, entradas.get(nombre)) for nombre in _ENTRADAS)
+        serie = None
+        if serieCER is not None and (entradas.get('indiceCER_Mercado') is None or entradas.get('indiceCER_inicial') is None):
+            serie = (serieCER.nombre, serieCER.version)
+        # repr de tuplas de str/float/None es determinístico (los float se escriben exactos)
+        texto = repr((VERSION_CALCULO, self._huella_calendario(), serie, normalizadas))
+        return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+    # --- Uso ---
+
+    def calcular(self, serieCER=None, **entradas):
+        """
+        Igual que BreakevenInflationCalculator(**entradas, serieCER=serieCER), pero si las mismas entradas ya se
+        calcularon (en este proceso o en otro con la misma ruta) devuelve el resultado guardado sin recalcular.
+        """
+        clave = self.clave(serieCER=serieCER, **entradas)
+        resultados = self.obtener(clave)
+        if resultados is not None:
+            return fu.BreakevenInflationCalculator._desde_resultados(entradas, resultados)
+
+        calculador = fu.BreakevenInflationCalculator(serieCER=serieCER, **entradas)
+        self.guardar(clave, {nombre: _a_json(getattr(calculador, nombre)) for nombre in _RESULTADOS})
+        return calculador
+
+    def obtener(self, clave):
+        with self._lock:
+            resultados = self._memoria.get(clave)
+            if resultados is not None:
+                self._memoria.move_to_end(clave)
+                self._estadisticas['hits_memoria'] += 1
+                return resultados
+
+        resultados = self._leer_disco(clave)
+        with self._lock:
+            if resultados is None:
+                self._estadisticas['misses'] += 1
+                return None
+            self._estadisticas['hits_disco'] += 1
+        self._guardar_memoria(clave, resultados)
+        return resultados
+
+    def guardar(self, clave, resultados):
+        self._guardar_memoria(clave, resultados)
+        self._escribir_disco(clave, resultados)
+
+    def _guardar_memoria(self, clave, resultados):
+        with self._lock:
+            self._memoria[clave] = resultados
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.max_memoria:
+                self._memoria.popitem(last=False)
+                self._estadisticas['desalojos_memoria'] += 1
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            estadisticas = dict(self._estadisticas)
+            estadisticas['entradas_memoria'] = len(self._memoria)
+        pedidos = estadisticas['hits_memoria'] + estadisticas['hits_disco'] + estadisticas['misses']
+        estadisticas['tasa_aciertos'] = (estadisticas['hits_memoria'] + estadisticas['hits_disco']) / pedidos if pedidos else 0.0
+        if self.ruta is not None:
+            try:
+                estadisticas['entradas_disco'] = self._conexion().execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+            except sqlite3.Error:
+                estadisticas['entradas_disco'] = None
+                estadisticas['errores_disco'] += 1
+                with self._lock:
+                    self._estadisticas['errores_disco'] += 1
+        return estadisticas
+
+    def limpiar(self, disco=True):
+        """Vacía el nivel en memoria y, con disco=True, también la tabla de SQLite."""
+        with self._lock:
+            self._memoria.clear()
+        if disco and self.ruta is not None:
+            try:
+                with self._conexion() as conexion:
+                    conexion.execute("DELETE FROM resultados")
+            except sqlite3.Error:
+                self._error_disco()
+
+    def purgar_calendarios_viejos(self):
+        """Borra del disco las entradas calculadas con otra huella de calendario (igual no se volverían a usar)."""
+        if self.ruta is None:
+            return 0
+        try:
+            with self._conexion() as conexion:
+                return conexion.execute("DELETE FROM resultados WHERE calendario != ?",
+                                        (self._huella_calendario(),)).rowcount
+        except sqlite3.Error:
+            self._error_disco()
+            return 0
+
+    def cerrar(self):
+        """Cierra las conexiones SQLite de todos los hilos. Si el cache se vuelve a usar, abre conexiones nuevas."""
+        with self._lock:
+            conexiones, self._conexiones = self._conexiones, []
+            self._generacion += 1
+        for conexion in conexiones:
+            conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    # --- SQLite ---
+
+    def _error_disco(self):
+        with self._lock:
+            self._estadisticas['errores_disco'] += 1
+
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None or self._local.generacion != self._generacion:
+            directorio = os.path.dirname(os.path.abspath(self.ruta))
+            os.makedirs(directorio, exist_ok=True)
+            # check_same_thread=False sólo para que cerrar() pueda cerrarla desde otro hilo; cada hilo usa la suya
+            conexion = sqlite3.connect(self.ruta, timeout=30, check_same_thread=False)
+            # WAL: los lectores de otros procesos no bloquean al que escribe
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            with conexion:
+                conexion.execute("CREATE TABLE IF NOT EXISTS resultados ("
+                                 "clave TEXT PRIMARY KEY, resultados TEXT NOT NULL, calendario TEXT NOT NULL, "
+                                 "ultimo_uso REAL NOT NULL)")
+                conexion.execute("CREATE INDEX IF NOT EXISTS resultados_ultimo_uso ON resultados (ultimo_uso)")
+            with self._lock:
+                self._conexiones.append(conexion)
+                self._local.generacion = self._generacion
+            self._local.conexion = conexion
+        return conexion
+
+    def _leer_disco(self, clave):
+        if self.ruta is None:
+            return None
+        try:
+            conexion = self._conexion()
+            fila = conexion.execute("SELECT resultados FROM resultados WHERE clave = ?", (clave,)).fetchone()
+            if fila is None:
+                return None
+            with conexion:
+                conexion.execute("UPDATE resultados SET ultimo_uso = ? WHERE clave = ?", (time.time(), clave))
+            return json.loads(fila[0])
+        except sqlite3.Error:
+            # Un disco bloqueado o corrupto no debe romper el cálculo: se trata como miss
+            self._error_disco()
+            return None
+
+    def _escribir_disco(self, clave, resultados):
+        if self.ruta is None:
+            return
+        try:
+            conexion = self._conexion()
+            with conexion:
+                conexion.execute("INSERT OR REPLACE INTO resultados (clave, resultados, calendario, ultimo_uso) "
+                                 "VALUES (?, ?, ?, ?)",
+                                 (clave, json.dumps(resultados), self._huella_calendario(), time.time()))
+            with self._lock:
+                self._escrituras += 1
+                # Con max_disco chico se revisa más seguido, así el exceso nunca pasa de ~10%
+                revisar = self._escrituras % max(1, min(REVISAR_TAMANIO_CADA, self.max_disco // 10)) == 0
+            if revisar:
+                self._desalojar_disco(conexion)
+        except sqlite3.Error:
+            self._error_disco()
+
+    def _desalojar_disco(self, conexion):
+        total = conexion.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+        if total <= self.max_disco:
+            return
+        # Se baja al 90% para no desalojar en cada escritura una vez lleno
+        sobrantes = total - int(self.max_disco * 0.9)
+        with conexion:
+            borradas = conexion.execute("DELETE FROM resultados WHERE clave IN "
+                                        "(SELECT clave FROM resultados ORDER BY ultimo_uso LIMIT ?)", (sobrantes,)).rowcount
+        with self._lock:
+            self._estadisticas['desalojos_disco'] += borradas
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache_breakeven(ruta=None, **kwargs) -> CacheBreakeven:
+    """Cache del proceso (se crea en el primer uso con `ruta` y kwargs; después se ignoran)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CacheBreakeven(ruta, **kwargs)
+    return _cache
+
+
+def calcular_cacheado(serieCER=None, **entradas):
+    """BreakevenInflationCalculator(**entradas) a través del cache del proceso (ver get_cache_breakeven)."""
+    return get_cache_breakeven().calcular(serieCER=serieCER, **entradas)
@@ -0,0 +1,162 @@
+"""
+Curva de CER implícito (breakeven) armada con los resultados de varios pares tasa fija / CER.
+
+Cada bono aporta un nodo (fechaVencimiento, indiceCER_final) y la curva arranca en (fechaMercado, indiceCER_Mercado).
+Entre nodos se interpola log-linealmente, es decir, con inflación forward constante por tramo; después del último
+vencimiento se extrapola con la última inflación forward. Las pendientes de ln(CER) por día se guardan
+precalculadas, así consultar la curva es una búsqueda binaria y actualizar un bono sólo recalcula sus dos tramos.
+"""
+import datetime as dt
+
+import numpy as np
+
+import financial_utils as fu
+from business_calendar import ORDINAL_EPOCH
+
+# Mismas convenciones que BreakevenInflationCalculator: TEM = (1 + TEA) ** (1 / 12) - 1, con años de 365 días
+DIAS_POR_ANIO = 365
+
+
+def _ordinal(fecha):
+    return fu._parsear_fecha(fecha).toordinal()
+
+
+def _ordinales(fechas):
+    return np.asarray(fu._a_datetime64(fechas)).astype(np.int64) + ORDINAL_EPOCH
+
+
+class ImpliedCERCurve:
+
+    def __init__(self, fechaMercado, indiceCER_Mercado):
+        self.fechaMercado = fu._parsear_fecha(fechaMercado)
+        self.indiceCER_Mercado = float(indiceCER_Mercado)
+        self._bonos = {}  # nombre -> {"ordinal", "indiceCER_final", "datos"}
+        self._nombres = []  # nombres en el orden de los nodos (sin el ancla)
+        self._t = np.array([self.fechaMercado.toordinal()], dtype=np.float64)
+        self._logcer = np.array([np.log(self.indiceCER_Mercado)])
+        self._pendientes = np.zeros(1)
+
+    @classmethod
+    def desde_calculadores(cls, calculadores, nombres=None):
+        """
+        Arma la curva con BreakevenInflationCalculator que comparten fechaMercado e indiceCER_Mercado
+        (levanta ValueError si alguno tiene otro ancla).
+        """
+        calculadores = list(calculadores)
+        if not calculadores:
+            raise ValueError("Se necesita al menos un calculador")
+        nombres = nombres or [str(c.fechaVencimiento) for c in calculadores]
+        curva = cls(calculadores[0].fechaMercado, calculadores[0].indiceCER_Mercado)
+        for nombre, c in zip(nombres, calculadores):
+            # Todos los nodos tienen que colgar del mismo ancla; si no, la curva mezclaría mercados distintos
+            if (fu._parsear_fecha(c.fechaMercado) != curva.fechaMercado
+                    or not np.isclose(float(c.indiceCER_Mercado), curva.indiceCER_Mercado, rtol=1e-12, atol=0)):
+                raise ValueError(f"{nombre}: fechaMercado/indiceCER_Mercado ({c.fechaMercado}, {c.indiceCER_Mercado}) "
+                                 f"distintos de los del primer calculador ({curva.fechaMercado}, {curva.indiceCER_Mercado})")
+        for nombre, c in zip(nombres, calculadores):
+            datos = {argumento: getattr(c, argumento) for argumento in fu._COLUMNAS_BATCH}
+            datos['dayCountConvention'] = c.dayCountConvention
+            curva._agregar(nombre, c.fechaVencimiento, c.indiceCER_final, datos)
+        curva._recalcular()
+        return curva
+
+    @classmethod
+    def desde_batch(cls, df, fechaMercado, indiceCER_Mercado, columna_nombre=None, dayCountConvention='ACT_365F'):
+        """
+        Arma la curva con un DataFrame que tenga fechaVencimiento e indiceCER_final (p. ej. los datos de entrada
+        de calcular_breakeven_batch unidos con su resultado). Si además tiene las columnas de entrada,
+        los bonos se pueden actualizar por precio con actualizar().
+        """
+        nombres = df[columna_nombre] if columna_nombre else df['fechaVencimiento'].astype(str)
+        curva = cls(fechaMercado, indiceCER_Mercado)
+        tiene_datos = all(c in df.columns for c in fu._COLUMNAS_BATCH)
+        for nombre, (_, fila) in zip(nombres, df.iterrows()):
+            datos = None
+            if tiene_datos:
+                datos = {argumento: fila[argumento] for argumento in fu._COLUMNAS_BATCH}
+                datos['dayCountConvention'] = dayCountConvention
+            curva._agregar(nombre, fila['fechaVencimiento'], fila['indiceCER_final'], datos)
+        curva._recalcular()
+        return curva
+
+    def _agregar(self, nombre, fechaVencimiento, indiceCER_final, datos):
+        ordinal = _ordinal(fechaVencimiento)
+        if ordinal <= self._t[0]:
+            raise ValueError(f"{nombre}: el vencimiento debe ser posterior a la fecha de mercado")
+        for otro, bono in self._bonos.items():
+            if otro != nombre and bono["ordinal"] == ordinal:
+                raise ValueError(f"{nombre} y {otro} vencen el mismo día")
+        self._bonos[nombre] = {"ordinal": ordinal, "indiceCER_final": float(indiceCER_final), "datos": datos}
+
+    def _recalcular(self):
+        """Rearma nodos y pendientes desde cero (sólo al agregar o quitar bonos)."""
+        self._nombres = sorted(self._bonos, key=lambda n: self._bonos[n]["ordinal"])
+        self._t = np.array([self.fechaMercado.toordinal()] + [self._bonos[n]["ordinal"] for n in self._nombres],
+                           dtype=np.float64)
+        self._logcer = np.log([self.indiceCER_Mercado] + [self._bonos[n]["indiceCER_final"] for n in self._nombres])
+        self._pendientes = np.zeros(len(self._t))
+        if len(self._t) > 1:
+            self._pendientes[:-1] = np.diff(self._logcer) / np.diff(self._t)
+            self._pendientes[-1] = self._pendientes[-2]
+
+    def _actualizar_nodo(self, j):
+        # Nodo j (j >= 1) cambió: sólo cambian las pendientes de los tramos que tocan a j
+        for k in (j - 1, j):
+            if k + 1 < len(self._t):
+                self._pendientes[k] = (self._logcer[k + 1] - self._logcer[k]) / (self._t[k + 1] - self._t[k])
+        self._pendientes[-1] = self._pendientes[-2]
+
+    def agregar_bono(self, nombre, fechaVencimiento, indiceCER_final, datos=None):
+        self._agregar(nombre, fechaVencimiento, indiceCER_final, datos)
+        self._recalcular()
+
+    def quitar_bono(self, nombre):
+        del self._bonos[nombre]
+        self._recalcular()
+
+    def actualizar(self, nombre, indiceCER_final=None, **cambios):
+        """
+        Actualiza un bono sin rearmar la curva: con indiceCER_final directo, o con nuevos datos de entrada
+        (p. ej. tf_precioMercado=..., cer_precioMercado=...) que se recalculan con BreakevenInflationCalculator.
+        """
+        bono = self._bonos[nombre]
+        if indiceCER_final is None:
+            if bono["datos"] is None:
+                raise ValueError(f"{nombre} no tiene datos de entrada; pasar indiceCER_final")
+            bono["datos"].update(cambios)
+            indiceCER_final = fu.BreakevenInflationCalculator(**bono["datos"]).indiceCER_final
+        bono["indiceCER_final"] = float(indiceCER_final)
+        j = self._nombres.index(nombre) + 1
+        self._logcer[j] = np.log(indiceCER_final)
+        self._actualizar_nodo(j)
+
+    def cer(self, fechas):
+        """CER implícito en una o varias fechas (NaN antes de la fecha de mercado)."""
+        escalar = np.ndim(fechas) == 0 and not isinstance(fechas, np.ndarray)
+        t = np.atleast_1d(_ordinales(fechas)).astype(np.float64)
+        k = np.clip(np.searchsorted(self._t, t, side='right') - 1, 0, len(self._t) - 1)
+        resultado = np.exp(self._logcer[k] + self._pendientes[k] * (t - self._t[k]))
+        resultado[t < self._t[0]] = np.nan
+        return float(resultado[0]) if escalar else resultado
+
+    def inflacion_forward_TEA(self, fechaInicial, fechaFinal):
+        """
+        Inflación implícita anualizada entre dos fechas (ACT/365), escalares o arrays.
+        Levanta ValueError si alguna fechaInicial no es anterior a su fechaFinal.
+        """
+        dias = np.atleast_1d(_ordinales(fechaFinal) - _ordinales(fechaInicial)).astype(np.float64)
+        if (dias <= 0).any():
+            raise ValueError("fechaInicial debe ser anterior a fechaFinal")
+        cociente = np.atleast_1d(self.cer(np.atleast_1d(fu._a_datetime64(fechaFinal)))
+                                 / self.cer(np.atleast_1d(fu._a_datetime64(fechaInicial))))
+        resultado = cociente ** (DIAS_POR_ANIO / dias) - 1
+        return float(resultado[0]) if resultado.size == 1 and np.ndim(fechaFinal) == 0 else resultado
+
+    def inflacion_forward_TEM(self, fechaInicial, fechaFinal):
+        """Inflación implícita mensual entre dos fechas: (1 + TEA) ** (1 / 12) - 1."""
+        return (1 + self.inflacion_forward_TEA(fechaInicial, fechaFinal)) ** (1 / 12) - 1
+
+    def nodos(self):
+        """[(nombre, fechaVencimiento, indiceCER_final)] en orden de vencimiento."""
+        return [(n, dt.date.fromordinal(self._bonos[n]["ordinal"]), self._bonos[n]["indiceCER_final"])
+                for n in self._nombres]
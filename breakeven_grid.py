@@ -0,0 +1,121 @@
+"""
+Grillas de escenarios de inflación breakeven evaluadas en paralelo.
+
+El producto cartesiano fechaMercado x tf_precioMercado x cer_precioMercado x cer_tasaReal se parte en tramos
+de índices planos; cada proceso del pool calcula su tramo con financial_utils.breakeven_arrays y escribe
+directamente en un buffer de memoria compartida, así los resultados no se serializan de vuelta.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import financial_utils as fu
+
+EJES = ('fechaMercado', 'tf_precioMercado', 'cer_precioMercado', 'cer_tasaReal')
+PUNTOS_POR_TRAMO = 250_000
+
+
+def _columnas(fijos):
+    return fu.RESULTADOS_BATCH + (fu.SENSIBILIDADES_BATCH if fijos['sensibilidades'] else ())
+
+
+def _evaluar_tramo(nombre_shm, n_puntos, ejes, fijos, inicio, fin):
+    shm = shared_memory.SharedMemory(name=nombre_shm)
+    try:
+        salida = np.ndarray((len(_columnas(fijos)), n_puntos), dtype=np.float64, buffer=shm.buf)
+        _calcular(salida, ejes, fijos, inicio, fin)
+    finally:
+        shm.close()
+    return fin - inicio
+
+
+def _calcular(salida, ejes, fijos, inicio, fin):
+    forma = tuple(len(ejes[eje]) for eje in EJES)
+    idx_fecha, idx_tf, idx_cer, idx_real = np.unravel_index(np.arange(inicio, fin), forma)
+
+    indiceCER_Mercado = fijos['indiceCER_Mercado']
+    if np.ndim(indiceCER_Mercado) == 1:
+        # Un CER de mercado por fecha de liquidación
+        indiceCER_Mercado = indiceCER_Mercado[idx_fecha]
+
+    resultados = fu.breakeven_arrays(
+        fechaVencimiento=fijos['fechaVencimiento'],
+        fechaMercado=ejes['fechaMercado'][idx_fecha],
+        tf_precioVencimiento=fijos['tf_precioVencimiento'],
+        tf_precioMercado=ejes['tf_precioMercado'][idx_tf],
+        cer_tasaReal=ejes['cer_tasaReal'][idx_real],
+        cer_precioMercado=ejes['cer_precioMercado'][idx_cer],
+        indiceCER_Mercado=indiceCER_Mercado,
+        cer_fechaEmision=fijos['cer_fechaEmision'],
+        indiceCER_inicial=fijos['indiceCER_inicial'],
+        dayCountConvention=fijos['dayCountConvention'],
+        sensibilidades=fijos['sensibilidades'],
+    )
+    for n, nombre in enumerate(_columnas(fijos)):
+        salida[n, inicio:fin] = resultados[nombre]
+
+
+def grilla_breakeven(fechaMercado, tf_precioMercado, cer_precioMercado, cer_tasaReal,
+                     fechaVencimiento, tf_precioVencimiento, indiceCER_Mercado, cer_fechaEmision, indiceCER_inicial,
+                     dayCountConvention='ACT_365F', max_workers=None, puntos_por_tramo=PUNTOS_POR_TRAMO,
+                     como='dataframe', sensibilidades=False):
+    """
+    Evalúa BreakevenInflationCalculator sobre todo el producto cartesiano de los cuatro ejes (EJES).
+
+    fechaMercado, tf_precioMercado, cer_precioMercado y cer_tasaReal son vectores (o escalares); el resto de los
+    datos del par de bonos son fijos. indiceCER_Mercado puede ser un escalar o un vector con un valor por fechaMercado.
+    max_workers=None usa todos los núcleos; con max_workers=1 (o una grilla de un solo tramo) no se crea el pool.
+    Con sensibilidades=True también devuelve las derivadas de financial_utils.SENSIBILIDADES_BATCH.
+
+    como='dataframe' devuelve un DataFrame con MultiIndex (EJES) y una columna por resultado;
+    como='arrays' devuelve (dict {resultado: array N-dimensional}, dict {eje: valores}).
+    """
+    ejes = {
+        'fechaMercado': np.atleast_1d(fu._a_datetime64(fechaMercado)),
+        'tf_precioMercado': np.atleast_1d(np.asarray(tf_precioMercado, dtype=np.float64)),
+        'cer_precioMercado': np.atleast_1d(np.asarray(cer_precioMercado, dtype=np.float64)),
+        'cer_tasaReal': np.atleast_1d(np.asarray(cer_tasaReal, dtype=np.float64)),
+    }
+    fijos = {
+        'fechaVencimiento': fu._a_datetime64(fechaVencimiento),
+        'cer_fechaEmision': fu._a_datetime64(cer_fechaEmision),
+        'tf_precioVencimiento': float(tf_precioVencimiento),
+        'indiceCER_inicial': float(indiceCER_inicial),
+        'indiceCER_Mercado': np.asarray(indiceCER_Mercado, dtype=np.float64),
+        'dayCountConvention': getattr(dayCountConvention, 'name', dayCountConvention),
+        'sensibilidades': sensibilidades,
+    }
+    columnas = _columnas(fijos)
+    if np.ndim(fijos['indiceCER_Mercado']) == 1 and len(fijos['indiceCER_Mercado']) != len(ejes['fechaMercado']):
+        raise ValueError("indiceCER_Mercado debe ser un escalar o tener un valor por cada fechaMercado")
+
+    forma = tuple(len(ejes[eje]) for eje in EJES)
+    n_puntos = int(np.prod(forma))
+    tramos = [(inicio, min(inicio + puntos_por_tramo, n_puntos)) for inicio in range(0, n_puntos, puntos_por_tramo)]
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1 or len(tramos) <= 1:
+        salida = np.empty((len(columnas), n_puntos), dtype=np.float64)
+        for inicio, fin in tramos:
+            _calcular(salida, ejes, fijos, inicio, fin)
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=len(columnas) * n_puntos * 8)
+        try:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(tramos))) as pool:
+                futuros = [pool.submit(_evaluar_tramo, shm.name, n_puntos, ejes, fijos, inicio, fin) for inicio, fin in tramos]
+                for futuro in futuros:
+                    futuro.result()
+            salida = np.ndarray((len(columnas), n_puntos), dtype=np.float64, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    if como == 'arrays':
+        return {nombre: salida[n].reshape(forma) for n, nombre in enumerate(columnas)}, ejes
+
+    import pandas as pd
+
+    index = pd.MultiIndex.from_product([ejes[eje] for eje in EJES], names=EJES)
+    return pd.DataFrame({nombre: salida[n] for n, nombre in enumerate(columnas)}, index=index)
@@ -0,0 +1,205 @@
+import datetime as dt
+import hashlib
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+# Feriados que holidays.AR() no siempre trae como fijos (mes, día)
+FERIADOS_INAMOVIBLES = frozenset({
+    (1, 1),  # Año Nuevo
+    (3, 24),  # Día Nacional de la Memoria por la Verdad y la Justicia
+    (4, 2),  # Día del Veterano y de los Caídos en la Guerra de Malvinas
+    (5, 1),  # Día del Trabajador
+    (5, 25),  # Día de la Revolución de Mayo
+    (6, 20),  # Paso a la Inmortalidad del General Manuel Belgrano
+    (7, 9),  # Día de la Independencia
+    (12, 8),  # Día de la Inmaculada Concepción de María
+    (12, 25)  # Navidad
+})
+
+
+# Años sobre los que se calcula la huella del calendario: fija, para que no cambie cuando el calendario se extiende solo
+VENTANA_HUELLA = (2000, 2060)
+
+# date(1970, 1, 1).toordinal(): pasa de datetime64[D] (días desde 1970) a ordinales de datetime.date
+ORDINAL_EPOCH = 719163
+
+
+# Todo lo que depende del rango del calendario, de una misma construcción
+_EstadoCalendario = namedtuple("_EstadoCalendario", ["anio_inicial", "anio_final", "ordinal_inicial", "ordinal_final",
+                                                     "ordinales", "huella", "publicacion_IPC"])
+
+
+def _a_fecha(fecha):
+    if type(fecha) == str:
+        fecha = dt.datetime.strptime(fecha, "%d-%m-%Y").date()
+    return fecha
+
+
+class BusinessDayCalendar:
+    """
+    Calendario de días hábiles argentinos precalculado.
+
+    Guarda un array ordenado con los ordinales (date.toordinal()) de todos los días hábiles
+    entre anio_inicial y anio_final, de modo que sumar/restar N días hábiles o contar días
+    hábiles entre dos fechas sea una búsqueda binaria (O(log n)) en lugar de recorrer día por día.
+    Si se consulta una fecha fuera del rango, el calendario se extiende automáticamente.
+
+    Todo lo que depende del rango vive en una tupla inmutable (self._estado, un _EstadoCalendario) que se
+    reemplaza de una vez al extenderlo: las consultas no toman el lock y cada una trabaja con el estado que
+    leyó al empezar (rango, días hábiles y tabla del IPC siempre de la misma construcción).
+    """
+
+    def __init__(self, anio_inicial=2000, anio_final=2060, feriados_inamovibles=FERIADOS_INAMOVIBLES):
+        self.feriados_inamovibles = frozenset(feriados_inamovibles)
+        self._lock = threading.Lock()
+        self._estado = self._construir(anio_inicial, anio_final)
+
+    @property
+    def anio_inicial(self):
+        return self._estado.anio_inicial
+
+    @property
+    def anio_final(self):
+        return self._estado.anio_final
+
+    @property
+    def ordinales(self):
+        return self._estado.ordinales
+
+    @property
+    def huella(self):
+        return self._estado.huella
+
+    def _construir(self, anio_inicial, anio_final):
+        """Devuelve el _EstadoCalendario de ese rango sin tocar self: el llamador lo publica con una sola asignación."""
+        import holidays
+
+        AR_holidays = holidays.AR(years=range(anio_inicial, anio_final + 1))
+        ordinal_inicial = dt.date(anio_inicial, 1, 1).toordinal()
+        ordinal_final = dt.date(anio_final, 12, 31).toordinal()
+
+        ordinales = np.arange(ordinal_inicial, ordinal_final + 1, dtype=np.int64)
+        # 1/1/1 (ordinal 1) fue lunes -> weekday = (ordinal - 1) % 7
+        habil = (ordinales - 1) % 7 < 5
+        for feriado in AR_holidays:
+            if anio_inicial <= feriado.year <= anio_final:
+                habil[feriado.toordinal() - ordinal_inicial] = False
+        for anio in range(anio_inicial, anio_final + 1):
+            for mes, dia in self.feriados_inamovibles:
+                habil[dt.date(anio, mes, dia).toordinal() - ordinal_inicial] = False
+
+        habiles = ordinales[habil]
+        # Huella de los feriados (días de semana no hábiles): cambia si cambian holidays o feriados_inamovibles.
+        # Sirve para invalidar resultados cacheados que dependen del calendario.
+        en_ventana = ((ordinales >= dt.date(VENTANA_HUELLA[0], 1, 1).toordinal())
+                      & (ordinales <= dt.date(VENTANA_HUELLA[1], 12, 31).toordinal()))
+        feriados = ordinales[~habil & ((ordinales - 1) % 7 < 5) & en_ventana]
+        huella = hashlib.blake2b(feriados.tobytes(), digest_size=8).hexdigest()
+        # Publicación del IPC: último día hábil <= 15 de cada mes, indexado por (anio - anio_inicial) * 12 + mes - 1
+        quinces = np.array([dt.date(anio, mes, 15).toordinal()
+                            for anio in range(anio_inicial, anio_final + 1) for mes in range(1, 13)], dtype=np.int64)
+        publicacion_IPC = habiles[np.searchsorted(habiles, quinces, side='right') - 1]
+        return _EstadoCalendario(anio_inicial, anio_final, ordinal_inicial, ordinal_final, habiles, huella, publicacion_IPC)
+
+    def _asegurar_rango(self, ordinal_min, ordinal_max):
+        """Devuelve un estado que cubre [ordinal_min, ordinal_max] (más un año de margen), extendiéndolo si hace falta."""
+        # Margen de un año para que sumar/restar días cerca del borde no se quede sin días hábiles
+        estado = self._estado
+        if ordinal_min - 366 >= estado.ordinal_inicial and ordinal_max + 366 <= estado.ordinal_final:
+            return estado
+        with self._lock:
+            estado = self._estado
+            anio_inicial = min(estado.anio_inicial, dt.date.fromordinal(max(ordinal_min - 366, 1)).year)
+            anio_final = max(estado.anio_final, dt.date.fromordinal(ordinal_max + 366).year)
+            if anio_inicial != estado.anio_inicial or anio_final != estado.anio_final:
+                estado = self._estado = self._construir(anio_inicial, anio_final)
+            return estado
+
+    def esDiaHabil(self, fecha):
+        ordinal = _a_fecha(fecha).toordinal()
+        ordinales = self._asegurar_rango(ordinal, ordinal).ordinales
+        idx = np.searchsorted(ordinales, ordinal, side='left')
+        return bool(idx < len(ordinales) and ordinales[idx] == ordinal)
+
+    def sumarDiasHabiles(self, fecha, dias):
+        """
+        Devuelve el día hábil número `dias` posterior a `fecha` (sin contar `fecha`).
+        Con dias=0 devuelve `fecha` si es hábil, o el siguiente día hábil si no lo es.
+        """
+        fecha = _a_fecha(fecha)
+        ordinal = fecha.toordinal()
+        ordinales = self._asegurar_rango(ordinal, ordinal + 2 * max(dias, 0)).ordinales
+        if dias > 0:
+            idx = np.searchsorted(ordinales, ordinal, side='right') + dias - 1
+        else:
+            idx = np.searchsorted(ordinales, ordinal, side='left')
+        return fecha + dt.timedelta(days=int(ordinales[idx]) - ordinal)
+
+    def restarDiasHabiles(self, fecha, dias):
+        """
+        Retrocede `dias` días hábiles contando desde `fecha` inclusive y devuelve el día anterior
+        al último día hábil contado (mismo resultado que recorrer día por día en restar10DiasHabiles).
+        """
+        fecha = _a_fecha(fecha)
+        if dias <= 0:
+            return fecha
+        ordinal = fecha.toordinal()
+        ordinales = self._asegurar_rango(ordinal - 2 * dias, ordinal).ordinales
+        idx = np.searchsorted(ordinales, ordinal, side='right') - dias
+        return fecha + dt.timedelta(days=int(ordinales[idx]) - 1 - ordinal)
+
+    def restarDiasHabilesArray(self, fechas, dias):
+        """Versión vectorizada de restarDiasHabiles sobre un array datetime64[D]."""
+        fechas = np.asarray(fechas, dtype='datetime64[D]')
+        if dias <= 0 or fechas.size == 0:
+            return fechas
+        ordinales_fechas = fechas.astype(np.int64) + ORDINAL_EPOCH
+        ordinales = self._asegurar_rango(int(ordinales_fechas.min()) - 2 * dias, int(ordinales_fechas.max())).ordinales
+        idx = np.searchsorted(ordinales, ordinales_fechas, side='right') - dias
+        return (ordinales[idx] - 1 - ORDINAL_EPOCH).astype('datetime64[D]')
+
+    def diaPublicacionIPC(self, anio, mes):
+        """Día del mes en que se publica el IPC: el 15, o el día hábil anterior más cercano si el 15 no es hábil."""
+        estado = self._asegurar_rango(dt.date(anio, mes, 1).toordinal(), dt.date(anio, mes, 28).toordinal())
+        return dt.date.fromordinal(int(estado.publicacion_IPC[(anio - estado.anio_inicial) * 12 + mes - 1])).day
+
+    def diasHabilesEntre(self, fechaInicial, fechaFinal):
+        """
+        Cantidad de días hábiles d tales que fechaInicial < d <= fechaFinal.
+        Si fechaFinal es anterior a fechaInicial, el resultado es negativo.
+        """
+        ordinal_inicial = _a_fecha(fechaInicial).toordinal()
+        ordinal_final = _a_fecha(fechaFinal).toordinal()
+        ordinales = self._asegurar_rango(min(ordinal_inicial, ordinal_final), max(ordinal_inicial, ordinal_final)).ordinales
+        return int(np.searchsorted(ordinales, ordinal_final, side='right')
+                   - np.searchsorted(ordinales, ordinal_inicial, side='right'))
+
+    def feriadosEntre(self, fechaInicial, fechaFinal):
+        """
+        Cantidad de feriados de lunes a viernes (días de semana no hábiles) entre las dos fechas, en cualquier
+        orden, sin contar la anterior y contando la posterior. Los sábados y domingos no cuentan.
+        """
+        ordinal_inicial, ordinal_final = sorted((_a_fecha(fechaInicial).toordinal(), _a_fecha(fechaFinal).toordinal()))
+        habiles = self.diasHabilesEntre(dt.date.fromordinal(ordinal_inicial), dt.date.fromordinal(ordinal_final))
+        return _dias_de_semana_hasta(ordinal_final) - _dias_de_semana_hasta(ordinal_inicial) - habiles
+
+
+def _dias_de_semana_hasta(ordinal):
+    # Días de lunes a viernes con ordinal en [1, ordinal]; el ordinal 1 (1/1/1) fue lunes
+    return ordinal // 7 * 5 + min(ordinal % 7, 5)
+
+
+_calendario_AR = None
+_calendario_lock = threading.Lock()
+
+
+def get_calendario_AR():
+    """Calendario de días hábiles compartido por todo el proceso (se construye en el primer uso)."""
+    global _calendario_AR
+    if _calendario_AR is None:
+        with _calendario_lock:
+            if _calendario_AR is None:
+                _calendario_AR = BusinessDayCalendar()
+    return _calendario_AR
@@ -0,0 +1,238 @@
+"""
+Series diarias de índices (CER, IPC, ...) guardadas como arrays NumPy en disco y abiertas con mmap.
+
+Cada serie es un directorio con:
+    meta.json     {"nombre", "ordinal_inicial", "dias", "version", "datos"}: apunta a la versión vigente
+    v-<version>-*/  un subdirectorio por versión escrita, con
+        valores.npy   float64, un valor por día desde ordinal_inicial (NaN si ese día no tiene dato)
+        anterior.npy  int64, posición del último día con dato hasta ese día inclusive (-1 si no hay)
+Al reescribir una serie, la versión nueva se escribe en su subdirectorio y meta.json se reemplaza de una vez
+(os.replace): un lector ve siempre una versión completa, la anterior o la nueva.
+
+Los archivos se abren con np.load(mmap_mode='r'), así varios procesos comparten las mismas páginas del
+page cache en lugar de cargar cada uno su copia. Las búsquedas por fecha son O(1): fecha -> ordinal -> posición.
+"""
+import datetime as dt
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+from business_calendar import ORDINAL_EPOCH, get_calendario_AR
+
+# El CER que ajusta un bono es el de 10 días hábiles antes de la fecha (ver restar10DiasHabiles)
+REZAGO_CER_DIAS_HABILES = 10
+
+# Permisos de las versiones escritas y de meta.json: legibles por todos los procesos que comparten el store
+MODO_DIRECTORIO = 0o755
+MODO_ARCHIVO = 0o644
+
+
+def _ordinales(fechas):
+    """Ordinales (date.toordinal()) de una fecha o de un array de fechas."""
+    if isinstance(fechas, (dt.date, str)):
+        if type(fechas) == str:
+            fechas = dt.datetime.strptime(fechas, "%d-%m-%Y").date()
+        elif isinstance(fechas, dt.datetime):
+            fechas = fechas.date()
+        return fechas.toordinal()
+    return np.asarray(fechas, dtype='datetime64[D]').astype(np.int64) + ORDINAL_EPOCH
+
+
+class SerieIndice:
+    """Serie de un índice abierta con mmap (sólo lectura)."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        for intento in range(3):
+            try:
+                self.meta, self._valores, self._anterior = _leer_version_vigente(ruta)
+                break
+            except FileNotFoundError:
+                # Otro proceso reescribió la serie dos veces entre que leímos meta.json y abrimos los datos
+                if intento == 2:
+                    raise
+        self.nombre = self.meta["nombre"]
+        self.version = self.meta["version"]
+        self.ordinal_inicial = self.meta["ordinal_inicial"]
+
+    def __len__(self):
+        return len(self._valores)
+
+    @property
+    def fecha_inicial(self):
+        return dt.date.fromordinal(self.ordinal_inicial)
+
+    @property
+    def fecha_final(self):
+        return dt.date.fromordinal(self.ordinal_inicial + len(self._valores) - 1)
+
+    def valor(self, fecha, anterior=False):
+        """
+        Valor del índice en `fecha` (date, datetime o 'dd-mm-YYYY').
+        Con anterior=True, si ese día no tiene dato devuelve el último publicado antes.
+        Devuelve NaN fuera de rango o sin dato.
+        """
+        posicion = _ordinales(fecha) - self.ordinal_inicial
+        if posicion < 0:
+            return float("nan")
+        if posicion >= len(self._valores):
+            if not anterior:
+                return float("nan")
+            posicion = len(self._valores) - 1
+        if anterior:
+            posicion = int(self._anterior[posicion])
+            if posicion < 0:
+                return float("nan")
+        return float(self._valores[posicion])
+
+    def valores(self, fechas, anterior=False):
+        """Versión vectorizada de valor() para un array de fechas (datetime64 o convertible)."""
+        posiciones = np.atleast_1d(_ordinales(fechas) - self.ordinal_inicial)
+        fuera = posiciones < 0
+        if anterior:
+            posiciones = np.minimum(posiciones, len(self._valores) - 1)
+        else:
+            fuera |= posiciones >= len(self._valores)
+        posiciones = np.clip(posiciones, 0, len(self._valores) - 1)
+        if anterior:
+            posiciones = np.asarray(self._anterior[posiciones])
+            fuera |= posiciones < 0
+            posiciones = np.maximum(posiciones, 0)
+        resultado = np.asarray(self._valores[posiciones], dtype=np.float64)
+        resultado[fuera] = np.nan
+        return resultado
+
+    def valor_cer(self, fecha, rezago=REZAGO_CER_DIAS_HABILES):
+        """CER aplicable a un bono en `fecha`: el de `rezago` días hábiles antes (último publicado)."""
+        fecha_cer = get_calendario_AR().restarDiasHabiles(fecha, rezago)
+        return self.valor(fecha_cer, anterior=True)
+
+    def valores_cer(self, fechas, rezago=REZAGO_CER_DIAS_HABILES):
+        """Versión vectorizada de valor_cer()."""
+        fechas = np.atleast_1d(np.asarray(fechas, dtype='datetime64[D]'))
+        return self.valores(get_calendario_AR().restarDiasHabilesArray(fechas, rezago), anterior=True)
+
+
+def _leer_version_vigente(ruta):
+    with open(os.path.join(ruta, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    # Las series escritas antes de versionar tienen los .npy al lado de meta.json (sin "datos")
+    datos = os.path.join(ruta, meta.get("datos", ""))
+    return (meta, np.load(os.path.join(datos, "valores.npy"), mmap_mode="r"),
+            np.load(os.path.join(datos, "anterior.npy"), mmap_mode="r"))
+
+
+def _datos_vigentes(ruta):
+    try:
+        with open(os.path.join(ruta, "meta.json"), encoding="utf-8") as f:
+            return json.load(f).get("datos", "")
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _borrar_versiones_viejas(ruta, conservar):
+    # En Linux los mmaps abiertos siguen siendo válidos aunque se borren los archivos
+    for entrada in os.listdir(ruta):
+        if entrada.startswith("v-") and entrada not in conservar:
+            shutil.rmtree(os.path.join(ruta, entrada), ignore_errors=True)
+    if "" not in conservar:
+        for archivo in ("valores.npy", "anterior.npy"):
+            try:
+                os.remove(os.path.join(ruta, archivo))
+            except FileNotFoundError:
+                pass
+
+
+def guardar_serie(ruta, nombre, fechas, valores):
+    """
+    Escribe (o reemplaza) la serie en `ruta` a partir de fechas y valores (p. ej. las columnas de un Excel).
+    Los datos van a un subdirectorio nuevo y después se reemplaza meta.json de una vez, así `ruta` nunca queda
+    sin una serie completa: los procesos que ya la tienen abierta siguen leyendo la versión anterior hasta que
+    la vuelvan a abrir y los que la abren en ese momento ven la anterior o la nueva. Se conservan los datos
+    de la versión anterior (para quien leyó su meta.json y todavía no la abrió); las más viejas se borran.
+    """
+    ordinales = np.atleast_1d(_ordinales(fechas))
+    valores = np.asarray(valores, dtype=np.float64)
+    if ordinales.shape != valores.shape:
+        raise ValueError("fechas y valores deben tener el mismo largo")
+    if ordinales.size == 0:
+        raise ValueError("La serie está vacía")
+
+    ordinal_inicial = int(ordinales.min())
+    dias = int(ordinales.max()) - ordinal_inicial + 1
+    denso = np.full(dias, np.nan)
+    denso[ordinales - ordinal_inicial] = valores
+    con_dato = ~np.isnan(denso)
+    anterior = np.where(con_dato, np.arange(dias), -1)
+    np.maximum.accumulate(anterior, out=anterior)
+
+    # Hash del contenido: cambia cuando cambian los datos (sirve para invalidar resultados calculados con ella).
+    # Incluye el rango de fechas: los mismos valores corridos unos días son otra serie
+    version = hashlib.blake2b(digest_size=8)
+    version.update(np.array([ordinal_inicial, dias], dtype=np.int64).tobytes())
+    version.update(denso.tobytes())
+    meta = {
+        "nombre": nombre,
+        "ordinal_inicial": ordinal_inicial,
+        "dias": dias,
+        "version": version.hexdigest(),
+    }
+
+    os.makedirs(ruta, exist_ok=True)
+    datos = tempfile.mkdtemp(dir=ruta, prefix=f"v-{meta['version']}-")
+    # mkdtemp/mkstemp crean con 0700/0600: la serie la leen otros procesos y usuarios
+    os.chmod(datos, MODO_DIRECTORIO)
+    np.save(os.path.join(datos, "valores.npy"), denso)
+    np.save(os.path.join(datos, "anterior.npy"), anterior.astype(np.int64))
+    meta["datos"] = os.path.basename(datos)
+
+    previos = _datos_vigentes(ruta)
+    descriptor, tmp = tempfile.mkstemp(dir=ruta, prefix=".meta-", suffix=".json")
+    with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.chmod(tmp, MODO_ARCHIVO)
+    os.replace(tmp, os.path.join(ruta, "meta.json"))
+    _borrar_versiones_viejas(ruta, {meta["datos"], previos})
+    with _lock:
+        _series.pop(os.path.abspath(ruta), None)
+    return abrir_serie(ruta)
+
+
+def importar_excel(ruta_excel, ruta, nombre, columna_fecha, columna_valor, **kwargs_read_excel):
+    """Convierte una planilla (openpyxl) a una serie en disco. Hacerlo una vez; después usar abrir_serie."""
+    import pandas as pd
+
+    df = pd.read_excel(ruta_excel, **kwargs_read_excel)
+    df = df[[columna_fecha, columna_valor]].dropna()
+    fechas = pd.to_datetime(df[columna_fecha], dayfirst=True).values.astype('datetime64[D]')
+    return guardar_serie(ruta, nombre, fechas, pd.to_numeric(df[columna_valor]).to_numpy())
+
+
+_series = {}
+_lock = threading.Lock()
+
+
+def abrir_serie(ruta) -> SerieIndice:
+    """
+    Abre (una sola vez por proceso) la serie guardada en `ruta`.
+    Si otro proceso la reescribe con guardar_serie, este sigue viendo la versión abierta hasta recargar_series().
+    """
+    clave = os.path.abspath(ruta)
+    serie = _series.get(clave)
+    if serie is None:
+        with _lock:
+            serie = _series.get(clave)
+            if serie is None:
+                serie = _series[clave] = SerieIndice(clave)
+    return serie
+
+
+def recargar_series():
+    """Olvida las series abiertas; la próxima llamada a abrir_serie relee meta.json y vuelve a mapear."""
+    with _lock:
+        _series.clear()
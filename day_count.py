@@ -0,0 +1,105 @@
+import datetime as dt
+
+import numpy as np
+
+# Convenciones soportadas de forma nativa. Se identifican por el nombre del miembro de
+# financepy.utils.DayCountTypes para no tener que importar financepy acá.
+CONVENCIONES_SOPORTADAS = ('ACT_365F', 'ACT_360', 'ACT_ACT_ISDA', 'ZERO', 'THIRTY_360_BOND')
+
+
+def _nombre_convencion(convencion):
+    return getattr(convencion, 'name', convencion)
+
+
+def soporta_convencion(convencion):
+    return _nombre_convencion(convencion) in CONVENCIONES_SOPORTADAS
+
+
+def _es_bisiesto(anio):
+    return anio % 4 == 0 and (anio % 100 != 0 or anio % 400 == 0)
+
+
+def year_frac_escalar(fechaInicial, fechaFinal, convencion):
+    """
+    Fracción de año y cantidad de días entre dos datetime.date en una sola pasada.
+    Devuelve (anios, dias) con los mismos valores que DayCount(convencion).year_frac()[0] y [1] de financepy.
+    """
+    nombre = _nombre_convencion(convencion)
+
+    if nombre == 'THIRTY_360_BOND':
+        d1, d2 = fechaInicial.day, fechaFinal.day
+        if d1 == 31:
+            d1 = 30
+        if d2 == 31 and d1 == 30:
+            d2 = 30
+        dias = 360 * (fechaFinal.year - fechaInicial.year) + 30 * (fechaFinal.month - fechaInicial.month) + (d2 - d1)
+        return dias / 360, dias
+
+    dias = (fechaFinal - fechaInicial).days
+    if nombre == 'ACT_365F':
+        return dias / 365, dias
+    if nombre == 'ACT_360':
+        return dias / 360, dias
+    if nombre in ('ACT_ACT_ISDA', 'ZERO'):
+        y1, y2 = fechaInicial.year, fechaFinal.year
+        den1 = 366 if _es_bisiesto(y1) else 365
+        if y1 == y2:
+            return dias / den1, dias
+        den2 = 366 if _es_bisiesto(y2) else 365
+        dias1 = (dt.date(y1 + 1, 1, 1) - fechaInicial).days
+        dias2 = (fechaFinal - dt.date(y2, 1, 1)).days
+        return dias1 / den1 + dias2 / den2 + (y2 - y1 - 1), dias1 + dias2
+
+    raise ValueError(f"Convención de días no soportada: {nombre}")
+
+
+def _componentes(fechas):
+    anios = fechas.astype('datetime64[Y]')
+    meses = fechas.astype('datetime64[M]')
+    y = anios.astype(np.int64) + 1970
+    m = (meses - anios).astype(np.int64) + 1
+    d = (fechas - meses).astype(np.int64) + 1
+    return y, m, d
+
+
+def _bisiesto(y):
+    return (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+
+
+def year_frac(fechaInicial, fechaFinal, convencion):
+    """
+    Versión vectorizada de year_frac_escalar sobre arrays datetime64 (se broadcastean entre sí).
+    Devuelve (anios, dias) como arrays float64 e int64.
+    """
+    fechaInicial = np.asarray(fechaInicial, dtype='datetime64[D]')
+    fechaFinal = np.asarray(fechaFinal, dtype='datetime64[D]')
+    fechaInicial, fechaFinal = np.broadcast_arrays(fechaInicial, fechaFinal)
+    nombre = _nombre_convencion(convencion)
+
+    if nombre == 'THIRTY_360_BOND':
+        y1, m1, d1 = _componentes(fechaInicial)
+        y2, m2, d2 = _componentes(fechaFinal)
+        d1 = np.where(d1 == 31, 30, d1)
+        d2 = np.where((d2 == 31) & (d1 == 30), 30, d2)
+        dias = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+        return dias / 360, dias
+
+    dias = (fechaFinal - fechaInicial).astype(np.int64)
+    if nombre == 'ACT_365F':
+        return dias / 365, dias
+    if nombre == 'ACT_360':
+        return dias / 360, dias
+    if nombre in ('ACT_ACT_ISDA', 'ZERO'):
+        anio1 = fechaInicial.astype('datetime64[Y]')
+        anio2 = fechaFinal.astype('datetime64[Y]')
+        y1 = anio1.astype(np.int64) + 1970
+        y2 = anio2.astype(np.int64) + 1970
+        den1 = np.where(_bisiesto(y1), 366, 365)
+        den2 = np.where(_bisiesto(y2), 366, 365)
+        dias1 = ((anio1 + 1).astype('datetime64[D]') - fechaInicial).astype(np.int64)
+        dias2 = (fechaFinal - anio2.astype('datetime64[D]')).astype(np.int64)
+        mismo_anio = y1 == y2
+        anios = np.where(mismo_anio, dias / den1, dias1 / den1 + dias2 / den2 + (y2 - y1 - 1))
+        return anios, np.where(mismo_anio, dias, dias1 + dias2)
+
+    raise ValueError(f"Convención de días no soportada: {nombre}")
@@ -1,45 +1,124 @@
-from financepy.utils import DayCountTypes, Date as FinDate, DayCount
 import datetime as dt
-from datetime import timedelta
-import pandas as pd
-import holidays
+import numpy as np
+import json
+import locale
 import logging
-from dateutil.relativedelta import relativedelta
+import threading
+import time
+from functools import lru_cache
 
-logging.basicConfig(
-    level=logging.WARNING,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+import day_count
+from business_calendar import get_calendario_AR
 
+# financepy (compila con numba), pandas y holidays tardan en importarse: se cargan recién
+# cuando una función los necesita. Las convenciones por defecto se pasan por nombre
+# ('ACT_365F', 'THIRTY_360_BOND'), que day_count entiende sin importar financepy.
+_NOMBRES_FINANCEPY = ('DayCountTypes', 'FinDate', 'DayCount')
 
-def calc_aniosSegunConvencion(fechaInicial, fechaFinal, convencion=DayCountTypes.THIRTY_360_BOND):
-    if type(fechaInicial) == str:
-        fechaInicial = dt.datetime.strptime(fechaInicial, "%d-%m-%Y").date()
-    if type(fechaFinal) == str:
-        fechaFinal = dt.datetime.strptime(fechaFinal, "%d-%m-%Y").date()
 
-    fechaInicial = FinDate.from_date(fechaInicial)
-    fechaFinal = FinDate.from_date(fechaFinal)
-    aux_dayCount = DayCount(convencion).year_frac(fechaInicial, fechaFinal)
+def _financepy():
+    from financepy.utils import DayCountTypes, Date as FinDate, DayCount
+    return DayCountTypes, FinDate, DayCount
 
-    return aux_dayCount[0]
 
+def __getattr__(nombre):
+    # Permite seguir usando financial_utils.DayCountTypes sin importar financepy al importar el módulo
+    if nombre in _NOMBRES_FINANCEPY:
+        return _financepy()[_NOMBRES_FINANCEPY.index(nombre)]
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
-def calc_diasSegunConvencion(fechaInicial, fechaFinal, convencion=DayCountTypes.THIRTY_360_BOND):
-    if type(fechaInicial) == str:
-        fechaInicial = dt.datetime.strptime(fechaInicial, "%d-%m-%Y").date()
-    if type(fechaFinal) == str:
-        fechaFinal = dt.datetime.strptime(fechaFinal, "%d-%m-%Y").date()
 
-    fechaInicial = FinDate.from_date(fechaInicial)
-    fechaFinal = FinDate.from_date(fechaFinal)
-    aux_dayCount = DayCount(convencion).year_frac(fechaInicial, fechaFinal)
+_logger = logging.getLogger(__name__)
 
-    return aux_dayCount[1]
+
+class Instrumentacion:
+    """
+    Contadores y timers por función (llamadas, segundos, días recorridos, feriados de lunes a viernes salteados).
+    Apagada por defecto: las funciones sólo chequean `activa`, así que no cuesta nada si no se usa.
+    """
+
+    def __init__(self):
+        self.activa = False
+        self._lock = threading.Lock()
+        self._contadores = {}
+
+    def activar(self):
+        self.activa = True
+
+    def desactivar(self):
+        self.activa = False
+
+    def resetear(self):
+        with self._lock:
+            self._contadores = {}
+
+    def registrar(self, funcion, segundos, **contadores):
+        with self._lock:
+            actual = self._contadores.setdefault(funcion, {"llamadas": 0, "segundos": 0.0})
+            actual["llamadas"] += 1
+            actual["segundos"] += segundos
+            for nombre, valor in contadores.items():
+                actual[nombre] = actual.get(nombre, 0) + valor
+
+    def exportar(self, ruta=None):
+        """Devuelve los contadores como dict; con `ruta`, además los guarda en JSON."""
+        with self._lock:
+            datos = {funcion: dict(contadores) for funcion, contadores in self._contadores.items()}
+        if ruta is not None:
+            with open(ruta, "w", encoding="utf-8") as f:
+                json.dump(datos, f, indent=2)
+        return datos
+
+
+instrumentacion = Instrumentacion()
+
+
+def _registrar_dias_habiles(funcion, inicio, fecha, resultado):
+    fecha = _parsear_fecha(fecha)
+    instrumentacion.registrar(funcion, time.perf_counter() - inicio,
+                              dias_recorridos=abs(resultado.toordinal() - fecha.toordinal()),
+                              feriados=get_calendario_AR().feriadosEntre(fecha, resultado))
+
+
+def _parsear_fecha(fecha):
+    if type(fecha) == str:
+        fecha = dt.datetime.strptime(fecha, "%d-%m-%Y").date()
+    elif isinstance(fecha, dt.datetime):
+        fecha = fecha.date()
+    return fecha
+
+
+def calc_aniosYDiasSegunConvencion(fechaInicial, fechaFinal, convencion='THIRTY_360_BOND'):
+    """Devuelve (años, días) entre ambas fechas con una sola conversión de fechas."""
+    fechaInicial = _parsear_fecha(fechaInicial)
+    fechaFinal = _parsear_fecha(fechaFinal)
+
+    if day_count.soporta_convencion(convencion):
+        return day_count.year_frac_escalar(fechaInicial, fechaFinal, convencion)
+
+    DayCountTypes, FinDate, DayCount = _financepy()
+    if isinstance(convencion, str):
+        convencion = DayCountTypes[convencion]
+    aux_dayCount = DayCount(convencion).year_frac(FinDate.from_date(fechaInicial), FinDate.from_date(fechaFinal))
+    return aux_dayCount[0], aux_dayCount[1]
+
+
+def calc_aniosSegunConvencion(fechaInicial, fechaFinal, convencion='THIRTY_360_BOND'):
+    return calc_aniosYDiasSegunConvencion(fechaInicial, fechaFinal, convencion)[0]
+
+
+def calc_diasSegunConvencion(fechaInicial, fechaFinal, convencion='THIRTY_360_BOND'):
+    return calc_aniosYDiasSegunConvencion(fechaInicial, fechaFinal, convencion)[1]
 
 
 class BreakevenInflationCalculator:
+    # Sin __dict__: cada instancia ocupa menos y los textos (interpretacionResultado, imprimirCalculos)
+    # se arman recién cuando se leen
+    __slots__ = ('fechaVencimiento', 'fechaMercado', 'tf_precioVencimiento', 'tf_precioMercado', 'dayCountConvention',
+                 'cer_tasaReal', 'cer_precioMercado', 'indiceCER_Mercado', 'cer_fechaEmision', 'indiceCER_inicial',
+                 'i', 'maturity_tf', 'dias_tf', 'maturity_cer', 'r_fija', 'indiceCER_final', 'cer_precioVencimiento',
+                 'breakevenInflationTEA', 'breakevenInflationTEM', 'dBEI_dtf_precioMercado', 'dBEI_dcer_precioMercado',
+                 'dBEI_dindiceCER_Mercado', 'dBEI_dcer_tasaReal', '_IPCs')
 
     def __init__(self,
                  fechaVencimiento=None,
@@ -48,13 +127,15 @@ class BreakevenInflationCalculator:
                  tf_precioVencimiento=None,
                  tf_precioMercado=None,
 
-                 dayCountConvention=DayCountTypes.ACT_365F,
+                 dayCountConvention='ACT_365F',
 
                  cer_tasaReal=None,
                  cer_precioMercado=None,
                  indiceCER_Mercado=None,
                  cer_fechaEmision=None,
                  indiceCER_inicial=None,
+
+                 serieCER=None,
                  ):
         self.fechaVencimiento = fechaVencimiento
         self.fechaMercado = fechaMercado
@@ -70,6 +151,13 @@ class BreakevenInflationCalculator:
         self.cer_fechaEmision = cer_fechaEmision
         self.indiceCER_inicial = indiceCER_inicial
 
+        # Si se pasa una serie de CER (cer_store.SerieIndice), los CER que falten se buscan por fecha
+        if serieCER is not None:
+            if self.indiceCER_Mercado is None:
+                self.indiceCER_Mercado = serieCER.valor_cer(self.fechaMercado)
+            if self.indiceCER_inicial is None:
+                self.indiceCER_inicial = serieCER.valor_cer(self.cer_fechaEmision)
+
         # Cálculos NO iniciales
 
         # self.i es el interés simple del bono_tf entre las fechas de liquidación y de vencimiento
@@ -78,13 +166,9 @@ class BreakevenInflationCalculator:
         # maturity es la duration de ambos bonos medido en años
         
         
-        self.maturity_tf = calc_aniosSegunConvencion(fechaInicial=self.fechaMercado,
-                                                     fechaFinal=self.fechaVencimiento,
-                                                     convencion=self.dayCountConvention)
-
-        self.dias_tf = calc_diasSegunConvencion(fechaInicial=self.fechaMercado,
-                                             fechaFinal=self.fechaVencimiento,
-                                             convencion=self.dayCountConvention)
+        self.maturity_tf, self.dias_tf = calc_aniosYDiasSegunConvencion(fechaInicial=self.fechaMercado,
+                                                                        fechaFinal=self.fechaVencimiento,
+                                                                        convencion=self.dayCountConvention)
 
         self.maturity_cer = calc_aniosSegunConvencion(fechaInicial=self.cer_fechaEmision,
                                                      fechaFinal=self.fechaVencimiento,
@@ -105,180 +189,403 @@ class BreakevenInflationCalculator:
         self.breakevenInflationTEA = (self.indiceCER_final / self.indiceCER_Mercado) ** (1 / self.maturity_tf) - 1
         self.breakevenInflationTEM = (1+self.breakevenInflationTEA) ** (1/12) - 1       
 
-        self.interpretacionResultado = f"""
-Se calculó una inflación breakeven de {round(100 * self.breakevenInflationTEA, 2)}% TEA.
-Este valor de inflación implícito anualizado es el esperado por el Mercado entre las fechas {self.fechaMercado} y {self.fechaVencimiento}.                    
+        # Derivadas parciales analíticas de breakevenInflationTEA (para cobertura, sin bumpear instancias)
+        sensibilidades = _sensibilidades(self.breakevenInflationTEA, self.maturity_tf, self.maturity_cer,
+                                         self.tf_precioMercado, self.cer_precioMercado, self.indiceCER_Mercado,
+                                         self.cer_tasaReal)
+        self.dBEI_dtf_precioMercado = sensibilidades['dBEI_dtf_precioMercado']
+        self.dBEI_dcer_precioMercado = sensibilidades['dBEI_dcer_precioMercado']
+        self.dBEI_dindiceCER_Mercado = sensibilidades['dBEI_dindiceCER_Mercado']
+        self.dBEI_dcer_tasaReal = sensibilidades['dBEI_dcer_tasaReal']
+
+        self._IPCs = None
+
+    @classmethod
+    def _desde_resultados(cls, entradas, resultados):
+        """Arma un calculador con resultados ya calculados (p. ej. leídos de breakeven_cache), sin recalcular."""
+        calculador = cls.__new__(cls)
+        valores = {'dayCountConvention': 'ACT_365F', **entradas, **resultados}
+        for nombre in cls.__slots__:
+            setattr(calculador, nombre, valores.get(nombre))
+        return calculador
+
+    @property
+    def IPCs(self):
+        if self._IPCs is None:
+            self._IPCs = IPC_publication_months(self.fechaMercado, self.fechaVencimiento)
+        return self._IPCs
+
+    @property
+    def imprimirCalculos(self):
+        return _texto_calculos(self)
+
+    @property
+    def interpretacionResultado(self):
+        return _texto_interpretacion(self)
+
+
+def _texto_interpretacion(r):
+    return f"""
+Se calculó una inflación breakeven de {round(100 * r.breakevenInflationTEA, 2)}% TEA.
+Este valor de inflación implícito anualizado es el esperado por el Mercado entre las fechas {r.fechaMercado} y {r.fechaVencimiento}.                    
             """
-        self.IPCs = IPC_publication_months(self.fechaMercado, self.fechaVencimiento)
 
-        self.imprimirCalculos = f"""
+
+def _texto_calculos(r):
+    return f"""
 
         BONO TASA FIJA:
-        FECHA DE MERCADO : {self.fechaMercado}
-        FECHA DE VENCIMIENTO : {self.fechaVencimiento}
-        PRECIO DE MERCADO {self.tf_precioMercado}
-        PAGO AL VENCIMIENTO : {self.tf_precioVencimiento}
+        FECHA DE MERCADO : {r.fechaMercado}
+        FECHA DE VENCIMIENTO : {r.fechaVencimiento}
+        PRECIO DE MERCADO {r.tf_precioMercado}
+        PAGO AL VENCIMIENTO : {r.tf_precioVencimiento}
         
 
         BONO CER:
-        FECHA DE MERCADO : {self.fechaMercado}
-        FECHA DE VENCIMIENTO : {self.fechaVencimiento}
-        FECHA DE EMISIÓN : {self.cer_fechaEmision}
-        PRECIO DE MERCADO: {self.cer_precioMercado}
-        INTERÉS REAL AL VENCIMIENTO: {self.cer_tasaReal}
-        CER DE EMISIÓN : {self.indiceCER_inicial}
-        CER DE MERCADO : {self.indiceCER_Mercado}
+        FECHA DE MERCADO : {r.fechaMercado}
+        FECHA DE VENCIMIENTO : {r.fechaVencimiento}
+        FECHA DE EMISIÓN : {r.cer_fechaEmision}
+        PRECIO DE MERCADO: {r.cer_precioMercado}
+        INTERÉS REAL AL VENCIMIENTO: {r.cer_tasaReal}
+        CER DE EMISIÓN : {r.indiceCER_inicial}
+        CER DE MERCADO : {r.indiceCER_Mercado}
 
         -----------------  -----------------
-        CONVENCIÓN DE DÍAS : {self.dayCountConvention}
+        CONVENCIÓN DE DÍAS : {r.dayCountConvention}
 
-        MATURITY DE AMBOS BONOS [AÑOS]: {round(self.maturity_tf, 2)}
-        MATURITY DE AMBOS BONOS [DÍAS]: {self.dias_tf}
-        MATURITY DESDE EMISIÓN, HASTA VENCIMIENTO DEL BONO CER [AÑOS] : {round(self.maturity_cer, 2)} 
+        MATURITY DE AMBOS BONOS [AÑOS]: {round(r.maturity_tf, 2)}
+        MATURITY DE AMBOS BONOS [DÍAS]: {r.dias_tf}
+        MATURITY DESDE EMISIÓN, HASTA VENCIMIENTO DEL BONO CER [AÑOS] : {round(r.maturity_cer, 2)} 
 
         -----------------  -----------------
         
         CÁCULOS:
 
-        Interés simple que paga el bono tasa fija en el mercado : {round((self.i-1)*100, 2)} %
-        TEA bono tasa fija en el mercado: {round(self.r_fija*100, 2)} %
-        CER AL VENCIMIENTO : {round(self.indiceCER_final, 4)}
-        PAGO AL VENCIMIENTO BONO CER (SUPONIENDO BREAK-EVEN INFLATION) : ${round(self.cer_precioVencimiento, 2)}
-        BREAK-EVEN INFLATION (TEA): {round(self.breakevenInflationTEA*100, 2)} %
-        BREAK-EVEN INFLATION (TEM): {round(self.breakevenInflationTEM*100, 2)} %
+        Interés simple que paga el bono tasa fija en el mercado : {round((r.i-1)*100, 2)} %
+        TEA bono tasa fija en el mercado: {round(r.r_fija*100, 2)} %
+        CER AL VENCIMIENTO : {round(r.indiceCER_final, 4)}
+        PAGO AL VENCIMIENTO BONO CER (SUPONIENDO BREAK-EVEN INFLATION) : ${round(r.cer_precioVencimiento, 2)}
+        BREAK-EVEN INFLATION (TEA): {round(r.breakevenInflationTEA*100, 2)} %
+        BREAK-EVEN INFLATION (TEM): {round(r.breakevenInflationTEM*100, 2)} %
 
-        IPCS INVOLUCRADOS EN EL CÁLCULO DEL CER DEL BONO TASA FIJA : {self.IPCs}
+        IPCS INVOLUCRADOS EN EL CÁLCULO DEL CER DEL BONO TASA FIJA : {r.IPCs}
         
         """
 
-def restar10DiasHabiles(fecha, dias_a_restar=10, format='%Y-%m-%d'):
-    fecha_inicial = fecha
-    dias_a_restar_inicial = dias_a_restar
-    print(f'Restando {dias_a_restar} días hábiles: a la fecha: {fecha_inicial}')
-    logging.warning(f'Restando {dias_a_restar} días hábiles: a la fecha: {fecha_inicial}')
-    feriados_inamovibles = {
-        (1, 1),  # Año Nuevo
-        (3, 24),  # Día Nacional de la Memoria por la Verdad y la Justicia
-        (4, 2),  # Día del Veterano y de los Caídos en la Guerra de Malvinas
-        (5, 1),  # Día del Trabajador
-        (5, 25),  # Día de la Revolución de Mayo
-        (6, 20),  # Paso a la Inmortalidad del General Manuel Belgrano
-        (7, 9),  # Día de la Independencia
-        (12, 8),  # Día de la Inmaculada Concepción de María
-        (12, 25)  # Navidad
+_COLUMNAS_BATCH = ('fechaVencimiento', 'fechaMercado', 'tf_precioVencimiento', 'tf_precioMercado',
+                   'cer_tasaReal', 'cer_precioMercado', 'indiceCER_Mercado', 'cer_fechaEmision', 'indiceCER_inicial')
+
+
+def _a_datetime64(fechas):
+    import pandas as pd
+
+    fechas = np.asarray(fechas)
+    if fechas.dtype.kind in 'OU':
+        primera = fechas.flat[0] if fechas.size else None
+        if isinstance(primera, str):
+            fechas = pd.to_datetime(fechas.ravel(), format="%d-%m-%Y").values.reshape(fechas.shape)
+        else:
+            fechas = pd.to_datetime(fechas.ravel()).values.reshape(fechas.shape)
+    return fechas.astype('datetime64[D]')
+
+
+def _anios_batch(fechaInicial, fechaFinal, convencion):
+    if day_count.soporta_convencion(convencion):
+        return day_count.year_frac(fechaInicial, fechaFinal, convencion)[0]
+    return np.array([calc_aniosSegunConvencion(fi.item(), ff.item(), convencion)
+                     for fi, ff in zip(fechaInicial.ravel(), fechaFinal.ravel())]).reshape(fechaInicial.shape)
+
+
+def calcular_breakeven_batch(data=None, dayCountConvention='ACT_365F', sensibilidades=False, serieCER=None,
+                             como='dataframe', **columnas):
+    """
+    Versión vectorizada de BreakevenInflationCalculator para curvas completas.
+
+    Recibe un DataFrame (data) con las columnas de _COLUMNAS_BATCH y/o arrays/escalares por keyword
+    con los mismos nombres que los argumentos del calculador (los escalares se broadcastean).
+    Devuelve un DataFrame con i, r_fija, indiceCER_final, breakevenInflationTEA y breakevenInflationTEM,
+    calculado con NumPy sin crear un objeto por fila.
+    Con sensibilidades=True agrega las columnas de SENSIBILIDADES_BATCH calculadas en la misma pasada.
+    Con serieCER (cer_store.SerieIndice), indiceCER_Mercado e indiceCER_inicial pueden omitirse y se buscan por fecha.
+    Con como='resultados' devuelve un ResultadosBreakeven (columnas NumPy, una fila = un ResultadoBreakeven) en vez del DataFrame.
+    """
+    import pandas as pd
+
+    index = None
+    valores = {}
+    if data is not None:
+        index = data.index if isinstance(data, pd.DataFrame) else None
+        for columna in _COLUMNAS_BATCH:
+            if columna in data:
+                valores[columna] = np.asarray(data[columna])
+    valores.update({k: np.asarray(v) for k, v in columnas.items() if k in _COLUMNAS_BATCH})
+    if serieCER is not None:
+        if 'indiceCER_Mercado' not in valores and 'fechaMercado' in valores:
+            valores['indiceCER_Mercado'] = serieCER.valores_cer(_a_datetime64(valores['fechaMercado']))
+        if 'indiceCER_inicial' not in valores and 'cer_fechaEmision' in valores:
+            valores['indiceCER_inicial'] = serieCER.valores_cer(_a_datetime64(valores['cer_fechaEmision']))
+    faltantes = [c for c in _COLUMNAS_BATCH if c not in valores]
+    if faltantes:
+        raise ValueError(f"Faltan columnas para el cálculo batch: {faltantes}")
+
+    fechaVencimiento = _a_datetime64(valores['fechaVencimiento'])
+    fechaMercado = _a_datetime64(valores['fechaMercado'])
+    cer_fechaEmision = _a_datetime64(valores['cer_fechaEmision'])
+    (fechaVencimiento, fechaMercado, cer_fechaEmision, tf_precioVencimiento, tf_precioMercado, cer_tasaReal,
+     cer_precioMercado, indiceCER_Mercado, indiceCER_inicial) = np.broadcast_arrays(
+        fechaVencimiento, fechaMercado, cer_fechaEmision,
+        *(valores[c].astype(np.float64) for c in ('tf_precioVencimiento', 'tf_precioMercado', 'cer_tasaReal',
+                                                  'cer_precioMercado', 'indiceCER_Mercado', 'indiceCER_inicial')))
+
+    resultados = breakeven_arrays(fechaVencimiento, fechaMercado, tf_precioVencimiento, tf_precioMercado, cer_tasaReal,
+                                  cer_precioMercado, indiceCER_Mercado, cer_fechaEmision, indiceCER_inicial,
+                                  dayCountConvention, sensibilidades=sensibilidades)
+    if como == 'resultados':
+        entradas = dict(zip(_COLUMNAS_BATCH, (fechaVencimiento, fechaMercado, tf_precioVencimiento, tf_precioMercado,
+                                              cer_tasaReal, cer_precioMercado, indiceCER_Mercado, cer_fechaEmision,
+                                              indiceCER_inicial)))
+        return ResultadosBreakeven({k: _columna(v) for k, v in {**entradas, **resultados}.items()},
+                                   resultados['breakevenInflationTEA'].size,
+                                   dayCountConvention, index)
+    return pd.DataFrame({k: v.ravel() for k, v in resultados.items()}, index=index)
+
+
+RESULTADOS_BATCH = ('i', 'r_fija', 'indiceCER_final', 'breakevenInflationTEA', 'breakevenInflationTEM')
+SENSIBILIDADES_BATCH = ('dBEI_dtf_precioMercado', 'dBEI_dcer_precioMercado', 'dBEI_dindiceCER_Mercado', 'dBEI_dcer_tasaReal')
+
+
+def _sensibilidades(breakevenInflationTEA, maturity_tf, maturity_cer, tf_precioMercado, cer_precioMercado,
+                    indiceCER_Mercado, cer_tasaReal):
+    # 1 + BEI = (CER_FINAL / CER_MERCADO) ** (1 / T)  =>  d(BEI)/dx = (1 + BEI) / T * d ln(CER_FINAL / CER_MERCADO) / dx
+    # con CER_FINAL = (tf_precioVencimiento / tf_precioMercado) * CER_INICIAL * cer_precioMercado / 100 / (1 + r) ** T_cer
+    factor = (1 + breakevenInflationTEA) / maturity_tf
+    return {
+        'dBEI_dtf_precioMercado': -factor / tf_precioMercado,
+        'dBEI_dcer_precioMercado': factor / cer_precioMercado,
+        'dBEI_dindiceCER_Mercado': -factor / indiceCER_Mercado,
+        'dBEI_dcer_tasaReal': -factor * maturity_cer / (1 + cer_tasaReal),
     }
-    AR_holidays = holidays.AR()
 
-    if type(fecha) == str:
-        fecha = dt.datetime.strptime(fecha, "%d-%m-%Y").date()
-    mes_dia = (fecha.month, fecha.day)
-
-    while dias_a_restar:
-        if fecha not in AR_holidays and mes_dia not in feriados_inamovibles and fecha.weekday() < 5:  # ES DIA HABIL
-            fecha -= pd.Timedelta(days=1)
-            mes_dia = (fecha.month, fecha.day)
-            dias_a_restar -= 1
-        else:  # SI NO ES DIA HABIL:
-            print(f'feriado detectado!!: {fecha}')
-            logging.warning(f'feriado detectado!!: {fecha}')
-            fecha -= timedelta(days=1)
-            mes_dia = (fecha.month, fecha.day)
-    print(f'Se restaron  {dias_a_restar} días hábiles: a la fecha: {fecha_inicial}, resultado: {fecha}')
-    logging.warning(f'Se restaron  {dias_a_restar_inicial} días hábiles: a la fecha: {fecha_inicial}, resultado: {fecha}')
-    return fecha.strftime(format)
 
-def sumarXDiasHabiles(fecha, diasASumar=1, format='%Y-%m-%d', returnDate=False):
-    fecha_inicial = fecha
-    diasASumarInicial = diasASumar
-    print(f'Sumando {diasASumar} días habíles: a la fecha: {fecha}')
-    feriados_inamovibles = {
-        (1, 1),  # Año Nuevo
-        (3, 24),  # Día Nacional de la Memoria por la Verdad y la Justicia
-        (4, 2),  # Día del Veterano y de los Caídos en la Guerra de Malvinas
-        (5, 1),  # Día del Trabajador
-        (5, 25),  # Día de la Revolución de Mayo
-        (6, 20),  # Paso a la Inmortalidad del General Manuel Belgrano
-        (7, 9),  # Día de la Independencia
-        (12, 8),  # Día de la Inmaculada Concepción de María
-        (12, 25)  # Navidad
+def breakeven_arrays(fechaVencimiento, fechaMercado, tf_precioVencimiento, tf_precioMercado, cer_tasaReal,
+                     cer_precioMercado, indiceCER_Mercado, cer_fechaEmision, indiceCER_inicial,
+                     dayCountConvention='ACT_365F', sensibilidades=False):
+    """
+    Núcleo vectorizado del cálculo breakeven: recibe fechas datetime64[D] y valores float ya broadcasteables
+    y devuelve un dict {nombre: array} con RESULTADOS_BATCH.
+    Con sensibilidades=True agrega las derivadas parciales analíticas de breakevenInflationTEA (SENSIBILIDADES_BATCH).
+    """
+    maturity_tf = _anios_batch(*np.broadcast_arrays(fechaMercado, fechaVencimiento), dayCountConvention)
+    maturity_cer = _anios_batch(*np.broadcast_arrays(cer_fechaEmision, fechaVencimiento), dayCountConvention)
+
+    i = tf_precioVencimiento / tf_precioMercado
+    r_fija = i ** (1 / maturity_tf) - 1
+    indiceCER_final = i * indiceCER_inicial * cer_precioMercado / 100 / ((1 + cer_tasaReal) ** maturity_cer)
+    breakevenInflationTEA = (indiceCER_final / indiceCER_Mercado) ** (1 / maturity_tf) - 1
+    breakevenInflationTEM = (1 + breakevenInflationTEA) ** (1 / 12) - 1
+
+    resultados = {
+        'i': np.broadcast_to(i, breakevenInflationTEA.shape),
+        'r_fija': np.broadcast_to(r_fija, breakevenInflationTEA.shape),
+        'indiceCER_final': indiceCER_final,
+        'breakevenInflationTEA': breakevenInflationTEA,
+        'breakevenInflationTEM': breakevenInflationTEM,
     }
-    AR_holidays = holidays.AR()
+    if sensibilidades:
+        derivadas = _sensibilidades(breakevenInflationTEA, maturity_tf, maturity_cer, tf_precioMercado,
+                                    cer_precioMercado, indiceCER_Mercado, cer_tasaReal)
+        resultados.update({k: np.broadcast_to(v, breakevenInflationTEA.shape) for k, v in derivadas.items()})
+    return resultados
+
+
+def _columna(valores):
+    # Los datos que son iguales en todas las filas (escalares broadcasteados) se guardan una sola vez, como array 0-d
+    valores = np.asarray(valores)
+    if valores.ndim and not any(valores.strides):
+        return np.asarray(valores[(0,) * valores.ndim])
+    return np.ravel(valores)
+
+
+class ResultadosBreakeven:
+    """
+    Resultados breakeven guardados por columnas (un array NumPy por dato de entrada y por resultado),
+    para tener cientos de miles de cálculos en memoria sin un objeto por fila.
+    resultados[k] devuelve un ResultadoBreakeven, que se lee igual que un BreakevenInflationCalculator.
+    """
+    __slots__ = ('columnas', 'n', 'dayCountConvention', 'index')
+
+    def __init__(self, columnas, n, dayCountConvention='ACT_365F', index=None):
+        self.columnas = columnas
+        self.n = n
+        self.dayCountConvention = dayCountConvention
+        self.index = index
 
-    if type(fecha) == str:
-        fecha = dt.datetime.strptime(fecha, "%d-%m-%Y").date()
-    mes_dia = (fecha.month, fecha.day)
-
-    while diasASumar:
-        fecha += pd.Timedelta(days=1)
-        mes_dia = (fecha.month, fecha.day)
-        if fecha not in AR_holidays and mes_dia not in feriados_inamovibles and fecha.weekday() < 5:  # ES DIA HABIL
-            diasASumar -= 1
-        else:  # NO ES DIA HABIL:
-            logging.warning(f'feriado detectado!!: {fecha}')
-
-    while fecha in AR_holidays or mes_dia in feriados_inamovibles or fecha.weekday() > 4: #NO ES DíA HABIL (para que el último día caiga en un día hábil)
-        fecha += pd.Timedelta(days=1)
-        mes_dia = (fecha.month, fecha.day)
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, k):
+        if not -len(self) <= k < len(self):
+            raise IndexError(k)
+        return ResultadoBreakeven(self, k % len(self))
+
+    def __iter__(self):
+        return (ResultadoBreakeven(self, k) for k in range(len(self)))
+
+    @property
+    def nbytes(self):
+        return sum(columna.nbytes for columna in self.columnas.values())
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame({k: np.broadcast_to(v, self.n) for k, v in self.columnas.items() if k not in _COLUMNAS_BATCH},
+                            index=self.index)
+
+
+class ResultadoBreakeven:
+    """Una fila de ResultadosBreakeven. Los datos derivados y los textos se calculan recién cuando se piden."""
+    __slots__ = ('_resultados', '_k')
+
+    def __init__(self, resultados, k):
+        self._resultados = resultados
+        self._k = k
+
+    def __getattr__(self, nombre):
+        if nombre.startswith('_') or nombre not in self._resultados.columnas:
+            raise AttributeError(nombre)
+        columna = self._resultados.columnas[nombre]
+        return (columna[self._k] if columna.ndim else columna).item()
+
+    @property
+    def dayCountConvention(self):
+        return self._resultados.dayCountConvention
+
+    @property
+    def maturity_tf(self):
+        return calc_aniosSegunConvencion(self.fechaMercado, self.fechaVencimiento, self.dayCountConvention)
+
+    @property
+    def dias_tf(self):
+        return calc_diasSegunConvencion(self.fechaMercado, self.fechaVencimiento, self.dayCountConvention)
+
+    @property
+    def maturity_cer(self):
+        return calc_aniosSegunConvencion(self.cer_fechaEmision, self.fechaVencimiento, self.dayCountConvention)
+
+    @property
+    def cer_precioVencimiento(self):
+        return 100 * self.indiceCER_final / self.indiceCER_inicial * ((1 + self.cer_tasaReal) ** self.maturity_cer)
+
+    @property
+    def IPCs(self):
+        return IPC_publication_months(self.fechaMercado, self.fechaVencimiento)
+
+    @property
+    def imprimirCalculos(self):
+        return _texto_calculos(self)
+
+    @property
+    def interpretacionResultado(self):
+        return _texto_interpretacion(self)
+
+
+def restar10DiasHabiles(fecha, dias_a_restar=10, format='%Y-%m-%d'):
+    # Se lee una vez: si otro hilo llama a activar() en el medio, no hay `inicio` para registrar
+    activa = instrumentacion.activa
+    if activa:
+        inicio = time.perf_counter()
+
+    resultado = get_calendario_AR().restarDiasHabiles(fecha, dias_a_restar)
+
+    if activa:
+        _registrar_dias_habiles('restar10DiasHabiles', inicio, fecha, resultado)
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug('Se restaron %s días hábiles a la fecha %s, resultado: %s', dias_a_restar, fecha, resultado)
+    return resultado.strftime(format)
+
+def sumarXDiasHabiles(fecha, diasASumar=1, format='%Y-%m-%d', returnDate=False):
+    activa = instrumentacion.activa
+    if activa:
+        inicio = time.perf_counter()
+
+    resultado = get_calendario_AR().sumarDiasHabiles(fecha, diasASumar)
+
+    if activa:
+        _registrar_dias_habiles('sumarXDiasHabiles', inicio, fecha, resultado)
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug('Se sumaron %s días hábiles a la fecha %s, resultado: %s', diasASumar, fecha, resultado)
     if not returnDate:
-        return fecha.strftime(format)
+        return resultado.strftime(format)
     else:
-        return fecha
+        return resultado
+
+# Tabla de etiquetas "Mesaño" desde enero de _ANIO_TABLA_MESES, indexada por anio * 12 + mes - 1
+_ANIO_TABLA_MESES = 1900
+_ANIOS_TABLA_MESES = 300
+
+
+@lru_cache(maxsize=8)
+def _nombres_meses(locale_tiempo):
+    # El locale es parte de la clave porque strftime("%B") depende de él
+    return tuple(dt.date(2000, mes, 1).strftime("%B") for mes in range(1, 13))
+
+
+@lru_cache(maxsize=8)
+def _tabla_mes_ano(locale_tiempo):
+    nombres = _nombres_meses(locale_tiempo)
+    return tuple(f"{nombres[k % 12]}{k // 12}".capitalize()
+                 for k in range(_ANIO_TABLA_MESES * 12, (_ANIO_TABLA_MESES + _ANIOS_TABLA_MESES) * 12))
 
-def generar_lista_mes_ano(mes_inicial, ano_inicial, mes_final, ano_final):
-    start_date = dt.datetime(ano_inicial, mes_inicial, 1)
-    end_date = dt.datetime(ano_final, mes_final, 1)
 
-    result = []
-    current_date = start_date
-    while current_date <= end_date:
-        result.append(current_date.strftime("%B%Y").capitalize())
-        current_date += relativedelta(months=1)
+@lru_cache(maxsize=4096)
+def _lista_mes_ano(k_inicial, k_final, locale_tiempo):
+    inicio = k_inicial - _ANIO_TABLA_MESES * 12
+    fin = k_final - _ANIO_TABLA_MESES * 12 + 1
+    if 0 <= inicio and fin <= _ANIOS_TABLA_MESES * 12:
+        return _tabla_mes_ano(locale_tiempo)[inicio:fin]
+    nombres = _nombres_meses(locale_tiempo)
+    return tuple(f"{nombres[k % 12]}{k // 12}".capitalize() for k in range(k_inicial, k_final + 1))
 
-    return result
+
+def generar_lista_mes_ano(mes_inicial, ano_inicial, mes_final, ano_final):
+    k_inicial = ano_inicial * 12 + mes_inicial - 1
+    k_final = ano_final * 12 + mes_final - 1
+    return list(_lista_mes_ano(k_inicial, k_final, locale.setlocale(locale.LC_TIME)))
 
 def mes_anterior(mes, año, cantidad=1):
-    fecha = dt.datetime(año, mes, 1) - relativedelta(months=cantidad)
-    return fecha.month, fecha.year
+    k = año * 12 + mes - 1 - cantidad
+    return k % 12 + 1, k // 12
 
 
-def IPC_publication_months(start_date, end_date):
-    feriados_inamovibles = {
-        (1, 1),  # Año Nuevo
-        (3, 24),  # Día Nacional de la Memoria por la Verdad y la Justicia
-        (4, 2),  # Día del Veterano y de los Caídos en la Guerra de Malvinas
-        (5, 1),  # Día del Trabajador
-        (5, 25),  # Día de la Revolución de Mayo
-        (6, 20),  # Paso a la Inmortalidad del General Manuel Belgrano
-        (7, 9),  # Día de la Independencia
-        (12, 8),  # Día de la Inmaculada Concepción de María
-        (12, 25)  # Navidad
-    }
-    AR_holidays = holidays.AR()
-
-    checkDay_inicial = 15
-    while True:
-        if dt.date(start_date.year, start_date.month, checkDay_inicial) not in AR_holidays and (start_date.month, checkDay_inicial) not in feriados_inamovibles and dt.date(start_date.year, start_date.month, checkDay_inicial).weekday() < 5:
-            if start_date.day > checkDay_inicial:
-                mes_i, year_i = mes_anterior(start_date.month, start_date.year, cantidad=1)
-            else:
-                mes_i, year_i = mes_anterior(start_date.month, start_date.year, cantidad=2)
-            break
-        else:
-            logging.warning('Es feriado')
-            checkDay_inicial -= 1
-
-    checkDay_final = 15
-    while True:
-        if dt.date(end_date.year, end_date.month, checkDay_final) not in AR_holidays and (end_date.month, checkDay_final) not in feriados_inamovibles and dt.date(end_date.year, end_date.month, checkDay_final).weekday() < 5:
-            if end_date.day > checkDay_final:
-                mes_f, year_f = mes_anterior(end_date.month, end_date.year, cantidad=1)
-            else:
-                mes_f, year_f = mes_anterior(end_date.month, end_date.year, cantidad=2)
-            break
-        else:
-            checkDay_final -= 1
+def _mes_IPC(fecha):
+    # Último IPC publicado a la fecha: el del mes anterior si ya pasó el día de publicación, si no el de hace dos meses
+    dia_publicacion = get_calendario_AR().diaPublicacionIPC(fecha.year, fecha.month)
+    if fecha.day > dia_publicacion:
+        return mes_anterior(fecha.month, fecha.year, cantidad=1)
+    return mes_anterior(fecha.month, fecha.year, cantidad=2)
+
+
+@lru_cache(maxsize=4096)
+def _IPC_publication_months(start_date, end_date, locale_tiempo):
+    mes_i, year_i = _mes_IPC(start_date)
+    mes_f, year_f = _mes_IPC(end_date)
+    return _lista_mes_ano(year_i * 12 + mes_i - 1, year_f * 12 + mes_f - 1, locale_tiempo)
 
-    return generar_lista_mes_ano(mes_inicial=mes_i, ano_inicial=year_i, mes_final=mes_f, ano_final=year_f)
+
+def IPC_publication_months(start_date, end_date):
+    activa = instrumentacion.activa
+    if activa:
+        inicio = time.perf_counter()
+        aciertos = _IPC_publication_months.cache_info().hits
+
+    start_date = _parsear_fecha(start_date)
+    end_date = _parsear_fecha(end_date)
+    meses = list(_IPC_publication_months(start_date, end_date, locale.setlocale(locale.LC_TIME)))
+
+    if activa:
+        instrumentacion.registrar('IPC_publication_months', time.perf_counter() - inicio, meses=len(meses),
+                                  aciertos_cache=_IPC_publication_months.cache_info().hits - aciertos)
+    return meses
 
 
 
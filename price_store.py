@@ -0,0 +1,611 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+TABLA = "user_data2"
+TABLA_TMP = "user_data2_tmp"  # copia de respaldo mientras se reemplaza la tabla del usuario
+COLUMNAS = ["ean", "price", "last_modification"]
+EANS_POR_DELETE = 200
+FILAS_POR_TANDA = 1000
+FILAS_POR_PAGINA = 1000  # PostgREST corta las respuestas en max-rows (1000 por defecto en Supabase)
+TTL_CACHE_PRECIOS = 60  # segundos
+TTL_RESINCRONIZACION = 30 * 60  # cada cuánto la sincronización incremental hace igual una carga completa (detecta borrados ajenos)
+MARGEN_SINCRONIZACION = pd.Timedelta(minutes=5)  # solapamiento contra relojes desfasados entre clientes
+FILAS_POR_CHUNK_ARCHIVO = 50_000  # filas que se leen de un archivo de importación por vez
+LARGOS_EAN = (8, 12, 13, 14)  # EAN-8, UPC-A, EAN-13, GTIN-14
+MUESTRA_RECHAZADAS = 100  # filas rechazadas que se devuelven como ejemplo al importar
+
+_cache_precios = {}  # user_id -> (momento_de_carga_completa, DataFrame, marca_last_modification)
+_cache_lock = threading.Lock()
+
+
+def ejecutar_con_retry(operacion, max_attempts: int = 2, sleep_time: float = 0.5):
+    """
+    Ejecuta operacion() (que debe terminar en .execute()) reintentando hasta max_attempts veces.
+    Levanta la última excepción si todos los intentos fallan.
+    """
+    attempt = 0
+    while True:
+        try:
+            resp = operacion()
+            if getattr(resp, "error", None):
+                raise Exception(resp.error)
+            return resp
+        except Exception:
+            attempt += 1
+            if attempt >= max_attempts:
+                raise
+            time.sleep(sleep_time)
+
+
+class ErrorEscrituraEnTandas(Exception):
+    """Alguna tanda no se pudo escribir después de todos los reintentos."""
+
+    def __init__(self, tandas_fallidas, filas_escritas):
+        self.tandas_fallidas = tandas_fallidas  # lista de (indice_tanda, excepción)
+        self.filas_escritas = filas_escritas
+        primera = tandas_fallidas[0][1]
+        super().__init__(f"{len(tandas_fallidas)} tanda(s) fallaron ({filas_escritas} filas escritas). Primer error: {primera}")
+
+
+def pausa_reintento(backoff: float, intento: int) -> float:
+    """Segundos a esperar antes del reintento número `intento` (1, 2, ...): backoff exponencial con jitter."""
+    return backoff * 2 ** (intento - 1) * (0.5 + random.random())
+
+
+def _escribir_tanda(admin_client, tabla, tanda, operacion, on_conflict, max_attempts, backoff):
+    # Un insert que falló pudo haberse commiteado igual (timeout, conexión cortada después del commit):
+    # reintentarlo chocaría con la restricción única o duplicaría filas. Sólo los upserts se reintentan acá;
+    # los inserts se reintentan como paso completo desde el llamador (borrar + insertar).
+    if operacion != "upsert":
+        max_attempts = 1
+    attempt = 0
+    while True:
+        try:
+            query = admin_client.table(tabla)
+            if operacion == "upsert":
+                resp = query.upsert(tanda, on_conflict=on_conflict).execute()
+            else:
+                resp = query.insert(tanda).execute()
+            if getattr(resp, "error", None):
+                raise Exception(resp.error)
+            return len(tanda)
+        except Exception:
+            attempt += 1
+            if attempt >= max_attempts:
+                raise
+            # backoff exponencial con jitter para no reintentar todas las tandas a la vez
+            time.sleep(pausa_reintento(backoff, attempt))
+
+
+def escribir_en_tandas(admin_client, tabla: str, records: list, operacion: str = "insert", on_conflict: str = None,
+                       chunk_size: int = FILAS_POR_TANDA, max_workers: int = 4, max_attempts: int = 3,
+                       backoff: float = 0.5, on_progress=None):
+    """
+    Escribe `records` en `tabla` partidos en tandas de chunk_size filas, con hasta max_workers requests
+    concurrentes. Con operacion="upsert" cada tanda se reintenta por separado (backoff exponencial), así una
+    falla no obliga a reenviar todo el payload. Los inserts no se reintentan por tanda (no son idempotentes):
+    si alguna falla, el llamador tiene que deshacer y repetir el paso completo (ver reemplazar_precios).
+
+    on_progress(filas_escritas, total) se llama desde el hilo que invoca esta función (no desde los workers),
+    por lo que se puede usar directamente con st.progress.
+    Devuelve la cantidad de filas escritas o levanta ErrorEscrituraEnTandas si alguna tanda falló.
+    """
+    if operacion not in ("insert", "upsert"):
+        raise ValueError(f"Operación no soportada: {operacion}")
+
+    total = len(records)
+    tandas = [records[i:i + chunk_size] for i in range(0, total, chunk_size)]
+    filas_escritas = 0
+    tandas_fallidas = []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tandas) or 1))) as pool:
+        futuros = {pool.submit(_escribir_tanda, admin_client, tabla, tanda, operacion, on_conflict, max_attempts, backoff): n
+                   for n, tanda in enumerate(tandas)}
+        for futuro in as_completed(futuros):
+            try:
+                filas_escritas += futuro.result()
+            except Exception as e:
+                tandas_fallidas.append((futuros[futuro], e))
+            if on_progress is not None:
+                on_progress(filas_escritas, total)
+
+    if tandas_fallidas:
+        raise ErrorEscrituraEnTandas(sorted(tandas_fallidas, key=lambda x: x[0]), filas_escritas)
+    return filas_escritas
+
+
+def normalizar_precios(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Deja el DataFrame del editor listo para comparar/guardar: EAN como texto sin espacios,
+    sin filas sin EAN y sin EANs duplicados (gana la última fila editada).
+    """
+    df = df.copy()
+    for columna in COLUMNAS:
+        if columna not in df.columns:
+            df[columna] = None
+    ean = df["ean"].astype("string").str.strip()
+    df["ean"] = ean.replace("", pd.NA)
+    df = df.dropna(subset=["ean"])
+    df["price"] = pd.to_numeric(df["price"], errors="coerce")
+    return df.drop_duplicates(subset=["ean"], keep="last").reset_index(drop=True)
+
+
+def diff_precios(original: pd.DataFrame, editado: pd.DataFrame, columnas=("price",)):
+    """
+    Compara el snapshot cargado contra el DataFrame editado usando 'ean' como clave.
+    Devuelve (filas_a_upsertear, eans_a_borrar): las filas nuevas o con cambios en `columnas`
+    (DataFrame normalizado) y la lista de EANs que ya no están.
+    """
+    original = normalizar_precios(original).set_index("ean")
+    editado = normalizar_precios(editado).set_index("ean")
+
+    eans_a_borrar = original.index.difference(editado.index)
+    nuevos = ~editado.index.isin(original.index)
+
+    cambiados = pd.Series(False, index=editado.index)
+    for columna in columnas:
+        antes = original[columna].reindex(editado.index)
+        despues = editado[columna]
+        cambiados |= (antes != despues) & ~(antes.isna() & despues.isna())
+
+    filas = editado[nuevos | cambiados.to_numpy()].reset_index()
+    return filas, eans_a_borrar.tolist()
+
+
+def registros_para_guardar(df: pd.DataFrame, user_id: str, sellar: bool = False) -> list:
+    """
+    Convierte filas de precios a records para PostgREST.
+    Con sellar=True todas las filas llevan last_modification = ahora (son filas que cambiaron);
+    si no, sólo se completan las que no tienen fecha.
+    """
+    df = df.copy()
+    if sellar:
+        df["last_modification"] = str(pd.Timestamp.now())
+    else:
+        df["last_modification"] = pd.to_datetime(df["last_modification"], errors="coerce").fillna(pd.Timestamp.now()).astype(str)
+    df["price"] = df["price"].astype(object).where(df["price"].notna(), None)
+    df["ean"] = df["ean"].astype(str)
+    df["user_id"] = user_id
+    return df[COLUMNAS + ["user_id"]].to_dict(orient="records")
+
+
+def tandas_de_eans(eans: list) -> list:
+    """Parte una lista de EANs en tandas de EANS_POR_DELETE (el filtro in_ viaja en la URL)."""
+    return [eans[i:i + EANS_POR_DELETE] for i in range(0, len(eans), EANS_POR_DELETE)]
+
+
+def borrar_eans(admin_client, user_id: str, eans: list):
+    """Un delete de las filas del usuario con esos EANs (una tanda de tandas_de_eans). Se puede repetir."""
+    return admin_client.table(TABLA).delete().eq("user_id", user_id).in_("ean", eans).execute()
+
+
+def guardar_diff_con_retry(admin_client, user_id: str, original: pd.DataFrame, editado: pd.DataFrame,
+                           max_attempts: int = 2, sleep_time: float = 0.5,
+                           chunk_size: int = FILAS_POR_TANDA, max_workers: int = 4, on_progress=None):
+    """
+    Guarda sólo las diferencias entre el snapshot cargado (original) y el DataFrame editado:
+    un upsert en tandas de las filas nuevas/modificadas y un delete por lista de EANs de las borradas.
+    Requiere una restricción única sobre (user_id, ean) en user_data2.
+    Devuelve (cantidad_upserts, cantidad_borrados). Levanta excepción si falla después de los reintentos.
+    """
+    filas, eans_a_borrar = diff_precios(original, editado)
+
+    try:
+        if len(filas):
+            records = registros_para_guardar(filas, user_id, sellar=True)
+            escribir_en_tandas(admin_client, TABLA, records, operacion="upsert", on_conflict="user_id,ean",
+                               chunk_size=chunk_size, max_workers=max_workers, max_attempts=max_attempts,
+                               backoff=sleep_time, on_progress=on_progress)
+        for tanda in tandas_de_eans(eans_a_borrar):
+            ejecutar_con_retry(lambda: borrar_eans(admin_client, user_id, tanda),
+                               max_attempts=max_attempts, sleep_time=sleep_time)
+    except Exception:
+        # Si falla a mitad de camino la tabla pudo cambiar, así que el cache ya no sirve
+        invalidar_cache_precios(user_id)
+        raise
+
+    # Los borrados no se ven en una sincronización incremental, así que se aplican al cache acá;
+    # las filas upserteadas llevan last_modification nuevo y las trae la próxima sincronización.
+    borrar_de_cache(user_id, eans_a_borrar)
+    return len(filas), len(eans_a_borrar)
+
+
+def limpiar_tmp(admin_client, user_id: str, max_attempts: int = 2, sleep_time: float = 0.5):
+    """Borra las filas del usuario en user_data2_tmp (un delete se puede repetir sin problema)."""
+    ejecutar_con_retry(lambda: admin_client.table(TABLA_TMP).delete().eq("user_id", user_id).execute(),
+                       max_attempts=max_attempts, sleep_time=sleep_time)
+
+
+def reemplazar_precios(admin_client, user_id: str, records: list, max_attempts: int = 2, sleep_time: float = 0.5,
+                       chunk_size: int = FILAS_POR_TANDA, max_workers: int = 4, limpiar: bool = True, on_progress=None):
+    """
+    Reemplaza todas las filas del usuario en user_data2 por `records`, dejando antes una copia en user_data2_tmp:
+    si algo falla después del delete, los datos siguen en la tabla temporal.
+    Cada paso se reintenta completo, así repetirlo nunca choca con lo que un intento anterior llegó a commitear:
+        copia:      borrar las filas del usuario en user_data2_tmp + insertar `records`
+        reemplazo:  borrar las filas del usuario en user_data2 + upsert de `records` sobre (user_id, ean)
+    Con limpiar=False la copia queda en user_data2_tmp y la limpia el llamador (ver limpiar_tmp).
+    on_progress(filas_escritas, total) cuenta las filas escritas en los dos pasos (total = 2 * len(records)).
+    Devuelve la cantidad de filas. Levanta la última excepción si un paso falla en todos los intentos.
+    """
+    records = [{**r, "user_id": user_id} for r in records]
+    total = 2 * len(records)
+    tandas = dict(chunk_size=chunk_size, max_workers=max_workers, max_attempts=max_attempts, backoff=sleep_time)
+
+    def progreso(ya_escritas):
+        if on_progress is None:
+            return None
+        return lambda filas_escritas, _: on_progress(ya_escritas + filas_escritas, total)
+
+    def copiar():
+        limpiar_tmp(admin_client, user_id, max_attempts=1)
+        escribir_en_tandas(admin_client, TABLA_TMP, records, on_progress=progreso(0), **tandas)
+
+    def reemplazar():
+        ejecutar_con_retry(lambda: admin_client.table(TABLA).delete().eq("user_id", user_id).execute(), max_attempts=1)
+        escribir_en_tandas(admin_client, TABLA, records, operacion="upsert", on_conflict="user_id,ean",
+                           on_progress=progreso(len(records)), **tandas)
+
+    try:
+        ejecutar_con_retry(copiar, max_attempts=max_attempts, sleep_time=sleep_time)
+    except Exception:
+        # user_data2 no se tocó: la copia a medias no sirve de respaldo
+        try:
+            limpiar_tmp(admin_client, user_id, max_attempts=max_attempts, sleep_time=sleep_time)
+        except Exception:
+            pass  # que se vea el error de la copia, no el de la limpieza
+        raise
+
+    try:
+        # Si falla en todos los intentos, la copia queda en user_data2_tmp para recuperar los datos
+        ejecutar_con_retry(reemplazar, max_attempts=max_attempts, sleep_time=sleep_time)
+    finally:
+        invalidar_cache_precios(user_id)
+
+    if limpiar:
+        try:
+            limpiar_tmp(admin_client, user_id, max_attempts=max_attempts, sleep_time=sleep_time)
+        except Exception:
+            pass  # los datos ya están reemplazados; la próxima copia borra igual lo que haya quedado
+    return len(records)
+
+
+def pagina_precios(admin_client, user_id: str, inicio: int, fin: int, contar: bool = False, desde: pd.Timestamp = None):
+    """Un select de las filas [inicio, fin] del usuario ordenadas por EAN (con count="exact" si contar=True)."""
+    columnas = ", ".join(COLUMNAS)
+    query = admin_client.table(TABLA)
+    query = query.select(columnas, count="exact") if contar else query.select(columnas)
+    query = query.eq("user_id", user_id)
+    if desde is not None:
+        query = query.gt("last_modification", desde.isoformat())
+    return query.order("ean").range(inicio, fin).execute()
+
+
+def dataframe_precios(data: list) -> pd.DataFrame:
+    """
+    Arma el DataFrame de precios por columnas, con dtypes fijos (EAN texto, precio float, fecha datetime).
+    Sin EANs repetidos (queda la última fila): las páginas por offset no son un snapshot, ver leer_precios_paginado.
+    """
+    df = pd.DataFrame({
+        "ean": pd.Series([r.get("ean") for r in data], dtype=object).astype("string"),
+        "price": pd.Series(pd.to_numeric([r.get("price") for r in data], errors="coerce"), dtype="float64"),
+        "last_modification": pd.to_datetime(pd.Series([r.get("last_modification") for r in data], dtype=object),
+                                            errors="coerce", format="mixed"),
+    }, columns=COLUMNAS)
+    if df["ean"].duplicated().any():
+        df = df.drop_duplicates(subset=["ean"], keep="last").reset_index(drop=True)
+    return df
+
+
+def leer_precios_paginado(admin_client, user_id: str, page_size: int = FILAS_POR_PAGINA, max_workers: int = 4,
+                          max_attempts: int = 2, sleep_time: float = 0.5, desde: pd.Timestamp = None) -> pd.DataFrame:
+    """
+    Trae todas las filas del usuario de user_data2 paginando con range(), así PostgREST no corta el resultado.
+    La primera página pide el total (count="exact") y el resto se piden en paralelo.
+    Con `desde` sólo trae las filas con last_modification posterior.
+
+    Las páginas son por offset sobre el orden por EAN y no comparten un snapshot: si otra sesión inserta o
+    borra filas mientras tanto, una fila en el borde de una página puede venir dos veces (se descarta la
+    repetida en dataframe_precios) o no venir (aparece en la próxima carga completa; ver TTL_RESINCRONIZACION).
+    """
+    primera = ejecutar_con_retry(lambda: pagina_precios(admin_client, user_id, 0, page_size - 1, contar=True, desde=desde),
+                                 max_attempts=max_attempts, sleep_time=sleep_time)
+    data = list(primera.data or [])
+    total = getattr(primera, "count", None)
+
+    if total is None:
+        # Sin conteo: se sigue pidiendo secuencialmente hasta que una página venga incompleta
+        inicio = page_size
+        ultima = data
+        while len(ultima) == page_size:
+            ultima = ejecutar_con_retry(lambda: pagina_precios(admin_client, user_id, inicio, inicio + page_size - 1, desde=desde),
+                                        max_attempts=max_attempts, sleep_time=sleep_time).data or []
+            data.extend(ultima)
+            inicio += page_size
+    elif total > len(data):
+        inicios = range(page_size, total, page_size)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(inicios)))) as pool:
+            paginas = pool.map(lambda i: ejecutar_con_retry(lambda: pagina_precios(admin_client, user_id, i, i + page_size - 1, desde=desde),
+                                                            max_attempts=max_attempts, sleep_time=sleep_time).data or [],
+                               inicios)
+            for pagina in paginas:
+                data.extend(pagina)
+
+    return dataframe_precios(data)
+
+
+def cargar_precios(admin_client, user_id: str, ttl: float = TTL_CACHE_PRECIOS, forzar: bool = False, **kwargs) -> pd.DataFrame:
+    """
+    Devuelve los precios del usuario desde un cache por proceso (compartido entre reruns y sesiones de Streamlit).
+    Si el cache no existe, venció (ttl) o forzar=True, se recarga con leer_precios_paginado.
+    Devuelve siempre una copia, así el llamador puede modificarla.
+    """
+    cacheado = None if forzar else precios_en_cache(user_id, ttl)
+    if cacheado is not None:
+        return cacheado
+    ahora = time.monotonic()
+    return guardar_en_cache(user_id, leer_precios_paginado(admin_client, user_id, **kwargs), ahora)
+
+
+def precios_en_cache(user_id: str, ttl: float = TTL_CACHE_PRECIOS):
+    """Copia de los precios cacheados del usuario, o None si no hay cache o tiene más de `ttl` segundos."""
+    with _cache_lock:
+        cacheado = _cache_precios.get(user_id)
+        if cacheado is not None and time.monotonic() - cacheado[0] < ttl:
+            return cacheado[1].copy()
+    return None
+
+
+def guardar_en_cache(user_id: str, df: pd.DataFrame, momento: float) -> pd.DataFrame:
+    """Cachea el resultado de una carga completa empezada en `momento` (time.monotonic()). Devuelve una copia."""
+    with _cache_lock:
+        _cache_precios[user_id] = (momento, df, _marca(df))
+    return df.copy()
+
+
+def _marca(df: pd.DataFrame):
+    marca = df["last_modification"].max() if len(df) else None
+    return None if pd.isna(marca) else marca
+
+
+def _merge_precios(df: pd.DataFrame, cambios: pd.DataFrame) -> pd.DataFrame:
+    """Actualiza en el lugar las filas de df cuyo EAN está en cambios y agrega al final las nuevas."""
+    if cambios.empty:
+        return df
+    posiciones = pd.Index(df["ean"]).get_indexer(cambios["ean"])
+    existentes = posiciones >= 0
+    if existentes.any():
+        filas = df.index[posiciones[existentes]]
+        for columna in ("price", "last_modification"):
+            df.loc[filas, columna] = cambios.loc[existentes, columna].array
+    if not existentes.all():
+        df = pd.concat([df, cambios.loc[~existentes]], ignore_index=True)
+    return df
+
+
+def borrar_de_cache(user_id: str, eans: list):
+    """Saca del cache del usuario los EANs borrados (una sincronización incremental no ve los borrados)."""
+    if not eans:
+        return
+    with _cache_lock:
+        cacheado = _cache_precios.get(user_id)
+        if cacheado is not None:
+            momento, df, marca = cacheado
+            _cache_precios[user_id] = (momento, df[~df["ean"].isin(eans)].reset_index(drop=True), marca)
+
+
+def sincronizar_precios(admin_client, user_id: str, resincronizar_cada: float = TTL_RESINCRONIZACION, **kwargs) -> pd.DataFrame:
+    """
+    Sincronización incremental: con el cache del usuario cargado, sólo pide las filas con last_modification
+    posterior a la marca (máximo last_modification visto, menos MARGEN_SINCRONIZACION) y las mezcla en el cache.
+    El costo depende de cuánto cambió y no del tamaño de la tabla.
+    Sin cache, o cada `resincronizar_cada` segundos (para ver borrados de otras sesiones), hace una carga completa.
+    """
+    df, desde = estado_sincronizacion(user_id, resincronizar_cada)
+    if df is None:
+        return cargar_precios(admin_client, user_id, forzar=True, **kwargs)
+    return mezclar_en_cache(user_id, df, leer_precios_paginado(admin_client, user_id, desde=desde, **kwargs))
+
+
+def estado_sincronizacion(user_id: str, resincronizar_cada: float = TTL_RESINCRONIZACION):
+    """
+    (df_cacheado, desde) para una sincronización incremental: los cambios a pedir son los de last_modification
+    posterior a `desde`. df_cacheado es None si toca una carga completa (sin cache o cada `resincronizar_cada`).
+    """
+    with _cache_lock:
+        cacheado = _cache_precios.get(user_id)
+    if cacheado is None or time.monotonic() - cacheado[0] >= resincronizar_cada:
+        return None, None
+    momento, df, marca = cacheado
+    return df, (marca - MARGEN_SINCRONIZACION if marca is not None else None)
+
+
+def mezclar_en_cache(user_id: str, df: pd.DataFrame, cambios: pd.DataFrame) -> pd.DataFrame:
+    """Mezcla los cambios leídos en el cache del usuario (o en una copia de `df` si se invalidó mientras tanto)."""
+    nueva_marca = _marca(cambios)
+    with _cache_lock:
+        actual = _cache_precios.get(user_id)
+        if actual is None:
+            # Se invalidó mientras se leía (p. ej. un guardado que falló): no se cachea el resultado
+            return _merge_precios(df.copy(), cambios)
+        momento, df, marca = actual
+        df = _merge_precios(df, cambios)
+        if nueva_marca is not None and (marca is None or nueva_marca > marca):
+            marca = nueva_marca
+        _cache_precios[user_id] = (momento, df, marca)
+        return df.copy()
+
+
+def invalidar_cache_precios(user_id: str = None):
+    """Descarta el cache de un usuario (o de todos si user_id es None). Llamar después de guardar."""
+    with _cache_lock:
+        if user_id is None:
+            _cache_precios.clear()
+        else:
+            _cache_precios.pop(user_id, None)
+
+
+# --- Importación / exportación de archivos ---
+
+def _formato_archivo(archivo, nombre=None):
+    nombre = nombre or getattr(archivo, "name", None) or (archivo if isinstance(archivo, (str, os.PathLike)) else "")
+    extension = os.path.splitext(str(nombre))[1].lower()
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    if extension in (".csv", ".txt", ""):
+        return "csv"
+    raise ValueError(f"Formato de archivo no soportado: {extension}")
+
+
+def leer_archivo_precios(archivo, nombre: str = None, chunksize: int = FILAS_POR_CHUNK_ARCHIVO,
+                         columna_ean: str = "ean", columna_precio: str = "price", **kwargs_read_csv):
+    """
+    Lee un CSV o Parquet de precios (ruta o archivo abierto, p. ej. el de st.file_uploader) de a `chunksize` filas.
+    Genera (chunk, total_filas): DataFrames con columnas ean y price sin validar; total_filas es None en CSV.
+    Los kwargs van a pd.read_csv (sep, decimal, thousands, encoding...). Parquet necesita pyarrow.
+    """
+    if _formato_archivo(archivo, nombre) == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Para importar Parquet hace falta instalar pyarrow") from e
+        parquet = pq.ParquetFile(archivo)
+        total = parquet.metadata.num_rows
+        for tanda in parquet.iter_batches(batch_size=chunksize, columns=[columna_ean, columna_precio]):
+            chunk = tanda.to_pandas()
+            yield chunk.rename(columns={columna_ean: "ean", columna_precio: "price"}), total
+        return
+
+    kwargs_read_csv.setdefault("encoding", "utf-8-sig")  # los CSV exportados desde Excel traen BOM
+    lector = pd.read_csv(archivo, chunksize=chunksize, usecols=[columna_ean, columna_precio],
+                         dtype={columna_ean: str}, **kwargs_read_csv)
+    with lector:
+        for chunk in lector:
+            yield chunk.rename(columns={columna_ean: "ean", columna_precio: "price"}), None
+
+
+def _digito_verificador_valido(eans: pd.Series) -> np.ndarray:
+    """Chequeo del dígito verificador GS1 (módulo 10) para EANs que ya son sólo dígitos, vectorizado por largo."""
+    validos = np.zeros(len(eans), dtype=bool)
+    largos = eans.str.len().to_numpy()
+    for largo in LARGOS_EAN:
+        mascara = largos == largo
+        if not mascara.any():
+            continue
+        digitos = (np.frombuffer("".join(eans[mascara]).encode("ascii"), dtype=np.uint8).reshape(-1, largo)
+                   - ord("0")).astype(np.int64)
+        # Desde la derecha (sin contar el verificador) los pesos alternan 3, 1, 3, ...
+        pesos = np.where(np.arange(largo - 1)[::-1] % 2 == 0, 3, 1)
+        suma = digitos[:, :-1] @ pesos
+        validos[mascara] = (10 - suma % 10) % 10 == digitos[:, -1]
+    return validos
+
+
+def validar_precios(chunk: pd.DataFrame, verificar_digito: bool = True):
+    """
+    Normaliza y valida un chunk de precios importados sin iterar filas.
+    EAN: texto sin espacios ni guiones, sólo dígitos ASCII (0-9), de largo LARGOS_EAN y (opcional) con dígito verificador válido.
+    Precio: numérico, finito y >= 0.
+    Devuelve (validas, rechazadas): validas con columnas ean y price (sin EANs repetidos, gana la última fila);
+    rechazadas con ean, price originales y la columna motivo.
+    """
+    ean = chunk["ean"]
+    no_entero = np.zeros(len(chunk), dtype=bool)
+    if ean.dtype.kind == "f":
+        # Parquet/CSV numérico: 7790001000012.0 -> "7790001000012" (los ceros a la izquierda ya se perdieron).
+        # Los valores con decimales (o fuera de rango) no se pueden pasar a Int64: se rechazan antes de convertir
+        valores = ean.to_numpy(dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            no_entero = ~np.isnan(valores) & ~((valores >= 0) & (valores < 10.0 ** max(LARGOS_EAN))
+                                               & (np.floor(valores) == valores))
+        ean = ean.mask(no_entero).astype("Int64")
+    ean = ean.astype("string").str.replace(r"[\s-]", "", regex=True)
+    precio = pd.to_numeric(chunk["price"], errors="coerce").astype("float64")
+
+    motivo = pd.Series(pd.NA, index=chunk.index, dtype="string")
+    # [0-9] y no \d: \d también acepta dígitos Unicode ("７７９…" de ancho completo) que no son un EAN válido
+    solo_digitos = ean.str.fullmatch(r"[0-9]+").fillna(False).to_numpy(dtype=bool)
+    largo_valido = ean.str.len().isin(LARGOS_EAN).to_numpy(dtype=bool)
+    motivo[~solo_digitos] = "EAN vacío o con caracteres no numéricos"
+    motivo[no_entero] = "EAN numérico con decimales o fuera de rango"
+    motivo[solo_digitos & ~largo_valido] = "EAN de largo inválido"
+    if verificar_digito:
+        candidatos = solo_digitos & largo_valido
+        verificador = np.zeros(len(chunk), dtype=bool)
+        verificador[candidatos] = _digito_verificador_valido(ean[candidatos])
+        motivo[candidatos & ~verificador] = "dígito verificador inválido"
+    precio_valido = np.isfinite(precio.to_numpy()) & (precio.to_numpy() >= 0)
+    motivo[motivo.isna().to_numpy() & ~precio_valido] = "precio vacío, no numérico o negativo"
+
+    rechazadas = motivo.notna().to_numpy()
+    validas = pd.DataFrame({"ean": ean[~rechazadas], "price": precio[~rechazadas]})
+    validas = validas.drop_duplicates(subset=["ean"], keep="last").reset_index(drop=True)
+    return validas, chunk.loc[rechazadas, ["ean", "price"]].assign(motivo=motivo[rechazadas])
+
+
+def importar_precios(admin_client, user_id: str, archivo, nombre: str = None,
+                     chunksize: int = FILAS_POR_CHUNK_ARCHIVO, verificar_digito: bool = True,
+                     chunk_size: int = FILAS_POR_TANDA, max_workers: int = 4, max_attempts: int = 3,
+                     backoff: float = 0.5, on_progress=None, **kwargs_lectura) -> dict:
+    """
+    Carga masiva de precios desde un CSV/Parquet sin pasar por el editor: lee el archivo de a chunks,
+    valida/normaliza cada uno (validar_precios) y lo upsertea en tandas sobre (user_id, ean).
+    Los EANs que no están en el archivo no se tocan. Las filas escritas llevan last_modification = ahora,
+    así la próxima sincronización incremental las trae.
+
+    on_progress(filas_leidas, total_filas) se llama después de cada chunk (total_filas es None en CSV).
+    Devuelve {"leidas", "escritas", "rechazadas", "muestra_rechazadas"} (DataFrame con hasta MUESTRA_RECHAZADAS filas).
+    Si falla a mitad de camino, los chunks anteriores quedan escritos y la excepción se propaga.
+    """
+    leidas = escritas = rechazadas = 0
+    muestras = []
+    try:
+        for chunk, total in leer_archivo_precios(archivo, nombre, chunksize=chunksize, **kwargs_lectura):
+            validas, malas = validar_precios(chunk, verificar_digito=verificar_digito)
+            leidas += len(chunk)
+            rechazadas += len(malas)
+            if len(malas) and sum(map(len, muestras)) < MUESTRA_RECHAZADAS:
+                muestras.append(malas.head(MUESTRA_RECHAZADAS - sum(map(len, muestras))))
+            if len(validas):
+                # Los chunks se escriben de a uno: si un EAN se repite en otro chunk, gana el del chunk posterior
+                escritas += escribir_en_tandas(admin_client, TABLA, registros_para_guardar(validas, user_id, sellar=True),
+                                               operacion="upsert", on_conflict="user_id,ean", chunk_size=chunk_size,
+                                               max_workers=max_workers, max_attempts=max_attempts, backoff=backoff)
+            if on_progress is not None:
+                on_progress(leidas, total)
+    except Exception:
+        invalidar_cache_precios(user_id)
+        raise
+
+    muestra = pd.concat(muestras, ignore_index=True) if muestras else pd.DataFrame(columns=["ean", "price", "motivo"])
+    return {"leidas": leidas, "escritas": escritas, "rechazadas": rechazadas, "muestra_rechazadas": muestra}
+
+
+def iterar_paginas_precios(admin_client, user_id: str, page_size: int = FILAS_POR_PAGINA,
+                           max_attempts: int = 2, sleep_time: float = 0.5):
+    """Genera las filas del usuario de a una página (DataFrame con COLUMNAS), pidiéndolas de a una."""
+    inicio = 0
+    while True:
+        data = ejecutar_con_retry(lambda: pagina_precios(admin_client, user_id, inicio, inicio + page_size - 1),
+                                  max_attempts=max_attempts, sleep_time=sleep_time).data or []
+        if data:
+            yield dataframe_precios(data)
+        if len(data) < page_size:
+            return
+        inicio += page_size
+
+
+def exportar_precios_csv(admin_client, user_id: str, **kwargs):
+    """
+    Genera el CSV de precios del usuario de a una página (primero el encabezado), sin armar la tabla completa.
+    Se puede escribir a un archivo temporal y pasárselo a st.download_button (que igual lo lee entero a memoria).
+    """
+    yield ",".join(COLUMNAS) + "\n"
+    for pagina in iterar_paginas_precios(admin_client, user_id, **kwargs):
+        yield pagina.to_csv(index=False, header=False)
@@ -1,80 +1,72 @@
 import streamlit as st
-from supabase import create_client, Client
+from supabase import Client
 import pandas as pd
 from datetime import datetime
 import time
+import tempfile
 import numpy as np
 
+from supabase_pool import get_cliente_compartido, nuevo_cliente, estadisticas_pool
+from price_store import importar_precios, exportar_precios_csv, FILAS_POR_TANDA
+from async_store import (correr, correr_con_progreso, iniciar_sesion, cargar_precios, sincronizar_precios, guardar_diff,
+                         reemplazar_tabla, latencias)
+
 # --- Load secrets ---
 PROJECT_URL = st.secrets["PROJECT_URL"]
 SUPABASE_KEY = st.secrets["SUPABASE_KEY"]               # anon key
 SERVICE_ROLE_KEY = st.secrets.get("SUPABASE_SERVICE_ROLE")  # optional
 
-def replace_table_with_retry(admin_client: Client, user_id: str, records: list, max_attempts: int = 2, sleep_time: float = 0.5):
+# "diff": sólo manda filas nuevas/modificadas/borradas (upsert + delete por EAN)
+# "replace": reemplaza toda la tabla del usuario vía user_data2_tmp
+MODO_GUARDADO = "diff"
+
+# True: "Restablecer" trae sólo las filas modificadas desde la última sincronización (por last_modification)
+SINCRONIZACION_INCREMENTAL = True
+
+def barra_de_progreso(texto: str):
+    """Devuelve un callback on_progress(hechas, total) que actualiza un st.progress."""
+    barra = st.progress(0.0, text=texto)
+
+    def on_progress(hechas, total):
+        barra.progress(hechas / total if total else 1.0, text=f"{texto} ({hechas}/{total})")
+
+    return on_progress
+
+
+def replace_table_with_retry(admin_client: Client, user_id: str, records: list, max_attempts: int = 2, sleep_time: float = 0.5,
+                             chunk_size: int = FILAS_POR_TANDA, max_workers: int = 4, on_progress=None):
     """
     Reemplaza los datos de 'user_data2' por los nuevos 'records' de forma segura usando una tabla temporal,
     con retry en caso de fallo en las inserciones o borrados.
+    Las escrituras se hacen en tandas de chunk_size filas con hasta max_workers requests en paralelo; la copia
+    y el reemplazo se reintentan como pasos completos (ver price_store.reemplazar_precios). La limpieza de
+    'user_data2_tmp' queda corriendo en segundo plano.
     """
     if not admin_client or not records:
         st.warning("No se pueden procesar los registros: admin_client no disponible o lista vacía.")
         return False
 
-    # --- Insertar en tabla temporal ---
-    attempt = 0
-    inserted_tmp = False
-    tmp_records = [{**r, "user_id": user_id} for r in records]  # Asegurarse de que user_id esté presente
-    while attempt < max_attempts and not inserted_tmp:
-        try:
-            resp_tmp = admin_client.table("user_data2_tmp").insert(tmp_records).execute()
-            if getattr(resp_tmp, "error", None):
-                raise Exception(resp_tmp.error)
-            inserted_tmp = True
-        except Exception as e_tmp:
-            attempt += 1
-            if attempt < max_attempts:
-                time.sleep(sleep_time)
-            else:
-                st.error(f"Error al insertar en tabla temporal después de {max_attempts} intentos: {e_tmp}")
-                return False
-
-    # --- Borrar tabla original y reemplazar con temporal ---
-    attempt_replace = 0
-    replaced = False
-    while attempt_replace < max_attempts and not replaced:
-        try:
-            # Borrar datos originales
-            admin_client.table("user_data2").delete().eq("user_id", user_id).execute()
-
-            # Leer datos de la tabla temporal
-            tmp_resp = admin_client.table("user_data2_tmp").select("*").eq("user_id", user_id).execute()
-            tmp_records_filled = tmp_resp.data or []
-
-            # Insertar en tabla original
-            if tmp_records_filled:
-                insert_resp = admin_client.table("user_data2").insert(tmp_records_filled).execute()
-                if getattr(insert_resp, "error", None):
-                    raise Exception(insert_resp.error)
-
-            # Borrar tabla temporal
-            admin_client.table("user_data2_tmp").delete().eq("user_id", user_id).execute()
-
-            replaced = True
-            st.toast("✅ Cambios guardados correctamente", icon="💾")
-            time.sleep(0.8)
-            return True
+    try:
+        correr_con_progreso(lambda avisar: reemplazar_tabla(admin_client, user_id, records, chunk_size=chunk_size,
+                                                            max_workers=max_workers, max_attempts=max_attempts,
+                                                            sleep_time=sleep_time, on_progress=avisar),
+                            on_progress or (lambda hechas, total: None))
+    except Exception as e:
+        st.error(f"Error reemplazando la tabla original después de {max_attempts} intentos: {e}")
+        return False
 
-        except Exception as e:
-            attempt_replace += 1
-            if attempt_replace < max_attempts:
-                time.sleep(sleep_time)
-            else:
-                st.error(f"Error reemplazando la tabla original después de {max_attempts} intentos: {e}")
-                return False
+    st.toast("✅ Cambios guardados correctamente", icon="💾")
+    time.sleep(0.8)
+    return True
 
 
 # --- Create clients ---
-supabase: Client = create_client(PROJECT_URL, SUPABASE_KEY)
-admin_client = create_client(PROJECT_URL, SERVICE_ROLE_KEY) if SERVICE_ROLE_KEY else None
+# Ambos comparten un pool HTTP con keep-alive por proceso, así los reruns no rehacen conexiones.
+# El cliente anon guarda la sesión de auth, por eso es uno por sesión de Streamlit; el de service role es único.
+if "supabase_client" not in st.session_state:
+    st.session_state["supabase_client"] = nuevo_cliente(PROJECT_URL, SUPABASE_KEY)
+supabase: Client = st.session_state["supabase_client"]
+admin_client = get_cliente_compartido(PROJECT_URL, SERVICE_ROLE_KEY) if SERVICE_ROLE_KEY else None
 
 # --- Streamlit UI ---
 st.set_page_config(page_title="Precios Argentinos",layout="centered") # page_icon="🔐"
@@ -94,7 +86,7 @@ with tab1:
             st.warning("Por favor ingresá email y contraseña.")
         else:
             try:
-                result = supabase.auth.sign_in_with_password({"email": email, "password": password})
+                result = correr(iniciar_sesion(supabase, email, password))
                 user = result.user
                 if user:
                     st.success(f"Bienvenido, {user.email} 👋")
@@ -142,7 +134,7 @@ with tab3:
         else:
             try:
                 # Verify login first
-                result = supabase.auth.sign_in_with_password({"email": email_del, "password": password_del})
+                result = correr(iniciar_sesion(supabase, email_del, password_del))
                 user = result.user
                 if not user:
                     st.error("Credenciales inválidas.")
@@ -170,13 +162,12 @@ if st.session_state.get("logged_in"):
     # --- Cargar datos si es la primera vez o si pidió refresh ---
     if "df" not in st.session_state or st.session_state.get("refresh", False):
         try:
-            response = admin_client.table("user_data2").select("ean, price, last_modification").eq("user_id", user_id).execute()
-            data = response.data or []
-            aux_df = pd.DataFrame(data)
-            if "last_modification" in aux_df.columns:
-                aux_df["last_modification"] = pd.to_datetime(aux_df["last_modification"], errors="coerce")
+            # Paginado y cacheado por user_id; en modo incremental sólo trae lo modificado desde la última marca
+            if SINCRONIZACION_INCREMENTAL:
+                aux_df = correr(sincronizar_precios(admin_client, user_id))
+            else:
+                aux_df = correr(cargar_precios(admin_client, user_id))
             if aux_df.empty:
-                aux_df = pd.DataFrame(columns=["ean", "price", "last_modification"])
                 st.toast(f"CUIDADO - Trayendo datos vacíos ")
                 
                 
@@ -206,29 +197,85 @@ if st.session_state.get("logged_in"):
     # --- Guardar cambios ---
     if st.button("💾 Guardar cambios"):
         try:
-            edited_df["ean"].replace("", np.nan, inplace=True)
-            edited_df["price"].replace({np.nan: None}, inplace=True)
-
-            edited_df.dropna(subset=["ean"], inplace=True)
+            if not admin_client:
+                st.warning("No se pueden guardar los datos: admin_client no disponible.")
 
-            edited_df["last_modification"] = edited_df["last_modification"].fillna(pd.Timestamp.now()).astype(str)
-            edited_df["user_id"] = user_id
- 
-            edited_df = edited_df.reset_index(drop=True)
-            records = edited_df.to_dict(orient="records")
+            # --- USANDO UPSERT + DELETE SÓLO DE LAS DIFERENCIAS ---
+            # (sólo las filas que cambiaron reciben last_modification nuevo)
+            elif MODO_GUARDADO == "diff":
+                try:
+                    # las tandas del upsert y del delete van a la vez, con reintentos por tanda; la barra avanza por tanda upserteada
+                    n_upserts, n_borrados = correr_con_progreso(
+                        lambda avisar: guardar_diff(admin_client, user_id, st.session_state["df"], edited_df, on_progress=avisar),
+                        barra_de_progreso("Guardando cambios"))
+                except Exception as e_diff:
+                    st.error(f"Error guardando los cambios después de reintentar: {e_diff}")
+                else:
+                    st.toast(f"✅ Cambios guardados correctamente ({n_upserts} actualizados, {n_borrados} borrados)", icon="💾")
+                    time.sleep(0.8)
+                    st.session_state["df"] = correr(sincronizar_precios(admin_client, user_id))
+                    st.rerun()
 
             # --- USANDO INSERT + DELETE SEGURO ---
-            if admin_client:
-                ok = replace_table_with_retry(admin_client, user_id, records)
+            else:
+                edited_df["ean"].replace("", np.nan, inplace=True)
+                edited_df["price"].replace({np.nan: None}, inplace=True)
+
+                edited_df.dropna(subset=["ean"], inplace=True)
+
+                edited_df["last_modification"] = edited_df["last_modification"].fillna(pd.Timestamp.now()).astype(str)
+                edited_df["user_id"] = user_id
+
+                edited_df = edited_df.reset_index(drop=True)
+                records = edited_df.to_dict(orient="records")
+                ok = replace_table_with_retry(admin_client, user_id, records, on_progress=barra_de_progreso("Guardando cambios"))
                 if ok:
                     st.session_state["df"] = edited_df.copy()
                     st.rerun()
-            else:
-                st.warning("No se pueden guardar los datos: admin_client no disponible.")
 
         except Exception as e:
             st.error(f"Error al guardar los cambios: {e}")
 
+    # --- Importar / exportar archivos (catálogos grandes, sin pasar por el editor) ---
+    with st.expander("📂 Importar / exportar precios"):
+        archivo = st.file_uploader("Archivo de precios (columnas ean y price)", type=["csv", "parquet"])
+        if archivo is not None and st.button("📥 Importar archivo"):
+            if not admin_client:
+                st.warning("No se pueden importar los datos: admin_client no disponible.")
+            else:
+                estado = st.empty()
+                try:
+                    resumen = importar_precios(admin_client, user_id, archivo, nombre=archivo.name,
+                                               on_progress=lambda leidas, total: estado.text(f"Importando... {leidas} filas leídas"))
+                except Exception as e_importar:
+                    st.error(f"Error importando el archivo: {e_importar}")
+                else:
+                    estado.empty()
+                    st.toast(f"✅ {resumen['escritas']} precios importados ({resumen['rechazadas']} filas rechazadas)", icon="📥")
+                    if resumen["rechazadas"]:
+                        st.warning(f"{resumen['rechazadas']} filas no se importaron. Ejemplos:")
+                        st.dataframe(resumen["muestra_rechazadas"])
+                    st.session_state["df"] = correr(sincronizar_precios(admin_client, user_id))
+
+        if st.button("📤 Preparar exportación CSV"):
+            # Las páginas se escriben a un archivo temporal a medida que llegan, así no se arma la tabla como
+            # DataFrame. Ojo: st.download_button lee el archivo entero y lo guarda en el media store de Streamlit
+            # (en memoria) hasta que termina la sesión, así que el CSV final sí queda una vez en memoria.
+            try:
+                with tempfile.TemporaryFile(mode="w+b") as tmp:
+                    for parte in exportar_precios_csv(admin_client, user_id):
+                        tmp.write(parte.encode("utf-8"))
+                    tmp.seek(0)
+                    st.download_button("⬇️ Descargar precios.csv", data=tmp, file_name="precios.csv", mime="text/csv")
+            except Exception as e_exportar:
+                st.error(f"Error exportando los precios: {e_exportar}")
+
+if st.secrets.get("MOSTRAR_ESTADISTICAS_POOL"):
+    with st.sidebar.expander("📊 Pool de conexiones"):
+        st.json(estadisticas_pool())
+    with st.sidebar.expander("⏱️ Latencia por operación"):
+        st.json(latencias.resumen())
+
 # --- Logout ---
 if st.button("Logout"):
     
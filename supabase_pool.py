@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import deque
+
+import httpx
+from supabase import Client, ClientOptions, create_client
+
+MAX_CONEXIONES = 20
+MAX_CONEXIONES_KEEPALIVE = 10
+KEEPALIVE_EXPIRY = 60  # segundos que una conexión ociosa queda abierta para reutilizarse
+TIMEOUT = 30
+
+
+class EstadisticasPool:
+    """Contadores del pool HTTP compartido: requests, conexiones nuevas/reutilizadas y latencias."""
+
+    def __init__(self, ventana: int = 1000):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errores = 0
+        self.conexiones_nuevas = 0
+        self._latencias = deque(maxlen=ventana)
+
+    def _trace(self, evento, info):
+        # httpcore avisa cada vez que abre un socket nuevo; el resto de los requests reusan una conexión
+        if evento == "connection.connect_tcp.complete":
+            with self._lock:
+                self.conexiones_nuevas += 1
+
+    def _on_request(self, request):
+        request.extensions["trace"] = self._trace
+        request.extensions["inicio"] = time.perf_counter()
+
+    def _on_response(self, response):
+        latencia = time.perf_counter() - response.request.extensions.get("inicio", time.perf_counter())
+        with self._lock:
+            self.requests += 1
+            if response.status_code >= 400:
+                self.errores += 1
+            self._latencias.append(latencia)
+
+    def resumen(self, transporte: httpx.HTTPTransport = None) -> dict:
+        with self._lock:
+            latencias = sorted(self._latencias)
+            resumen = {
+                "requests": self.requests,
+                "errores": self.errores,
+                "conexiones_nuevas": self.conexiones_nuevas,
+                "conexiones_reutilizadas": max(self.requests - self.conexiones_nuevas, 0),
+            }
+        if latencias:
+            resumen["latencia_media_ms"] = 1000 * sum(latencias) / len(latencias)
+            resumen["latencia_p50_ms"] = 1000 * latencias[len(latencias) // 2]
+            resumen["latencia_p95_ms"] = 1000 * latencias[min(int(len(latencias) * 0.95), len(latencias) - 1)]
+        if transporte is not None:
+            pool = getattr(transporte, "_pool", None)
+            conexiones = getattr(pool, "connections", None)
+            if conexiones is not None:
+                resumen["conexiones_abiertas"] = len(conexiones)
+        return resumen
+
+
+_lock = threading.Lock()
+_transporte = None
+_estadisticas = EstadisticasPool()
+_clientes = {}  # (url, key) -> Client compartido
+
+
+class _TransporteCompartido(httpx.BaseTransport):
+    """Vista del transporte del proceso para un httpx.Client: cerrar ese cliente no cierra el pool de los demás."""
+
+    def __init__(self, transporte: httpx.HTTPTransport):
+        self._transporte = transporte
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._transporte.handle_request(request)
+
+    def close(self):
+        pass
+
+
+def get_transporte() -> httpx.HTTPTransport:
+    """Pool de conexiones con keep-alive compartido por todo el proceso (sobrevive a los reruns de Streamlit)."""
+    global _transporte
+    if _transporte is None:
+        with _lock:
+            if _transporte is None:
+                _transporte = httpx.HTTPTransport(
+                    limits=httpx.Limits(max_connections=MAX_CONEXIONES,
+                                        max_keepalive_connections=MAX_CONEXIONES_KEEPALIVE,
+                                        keepalive_expiry=KEEPALIVE_EXPIRY),
+                )
+    return _transporte
+
+
+def nuevo_http_client() -> httpx.Client:
+    """
+    httpx.Client propio sobre el pool del proceso. Cada cliente de supabase necesita el suyo: postgrest-py
+    le escribe base_url y headers (apikey, Authorization) al cliente que recibe, así que compartir uno
+    mezclaría las credenciales del service role con las de las sesiones de usuario.
+    """
+    return httpx.Client(
+        transport=_TransporteCompartido(get_transporte()),
+        timeout=TIMEOUT,
+        event_hooks={"request": [_estadisticas._on_request], "response": [_estadisticas._on_response]},
+    )
+
+
+def _opciones() -> ClientOptions:
+    # Las versiones de supabase-py que aceptan httpx_client reutilizan nuestro pool; las anteriores usan el suyo
+    if "httpx_client" in getattr(ClientOptions, "__dataclass_fields__", {}):
+        return ClientOptions(httpx_client=nuevo_http_client())
+    return ClientOptions()
+
+
+def nuevo_cliente(url: str, key: str) -> Client:
+    """
+    Cliente nuevo con su propio httpx.Client sobre el pool HTTP compartido. Usarlo para clientes con estado
+    de sesión (auth de un usuario).
+    """
+    return create_client(url, key, options=_opciones())
+
+
+def get_cliente_compartido(url: str, key: str) -> Client:
+    """
+    Cliente único por (url, key) para todo el proceso. Sólo para clientes sin estado de usuario
+    (p. ej. el de service role): el login guarda la sesión dentro del cliente.
+    """
+    clave = (url, key)
+    cliente = _clientes.get(clave)
+    if cliente is None:
+        with _lock:
+            cliente = _clientes.get(clave)
+            if cliente is None:
+                cliente = _clientes[clave] = nuevo_cliente(url, key)
+    return cliente
+
+
+def estadisticas_pool() -> dict:
+    """Resumen de uso del pool: requests, conexiones nuevas/reutilizadas/abiertas y latencias (ms)."""
+    return _estadisticas.resumen(_transporte)
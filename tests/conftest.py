@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Los módulos viven en la raíz del repo y el cliente falso de Supabase en benchmarks/
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for ruta in (RAIZ, os.path.join(RAIZ, "benchmarks")):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
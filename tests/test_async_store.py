@@ -0,0 +1,127 @@
+"""async_store contra el Supabase falso en memoria: lecturas paginadas con gather y guardado por diferencias."""
+import threading
+
+import pandas as pd
+import pytest
+
+import async_store
+import price_store as ps
+from supabase_falso import ClienteFalso
+
+USUARIO = "usuario-1"
+
+
+def _filas(n, precio=1.0, desde=0, fecha="2024-01-01 00:00:00"):
+    return [{"user_id": USUARIO, "ean": f"779{i:010d}", "price": precio, "last_modification": fecha}
+            for i in range(desde, desde + n)]
+
+
+def _precios(cliente):
+    return {f["ean"]: f["price"] for f in cliente.filas(ps.TABLA) if f["user_id"] == USUARIO}
+
+
+class ClienteQueMideConcurrencia(ClienteFalso):
+    """Registra cuántos requests de cada operación estaban en vuelo a la vez."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._en_vuelo = {}
+        self.maximos = {}
+        self.solapados = 0  # veces que un upsert y un delete estuvieron en vuelo a la vez
+        self._lock_vuelo = threading.Lock()
+
+    def _ejecutar(self, consulta):
+        with self._lock_vuelo:
+            self._en_vuelo[consulta.operacion] = self._en_vuelo.get(consulta.operacion, 0) + 1
+            self.maximos[consulta.operacion] = max(self.maximos.get(consulta.operacion, 0),
+                                                   self._en_vuelo[consulta.operacion])
+            if self._en_vuelo.get("upsert") and self._en_vuelo.get("delete"):
+                self.solapados += 1
+        try:
+            return super()._ejecutar(consulta)
+        finally:
+            with self._lock_vuelo:
+                self._en_vuelo[consulta.operacion] -= 1
+
+
+@pytest.fixture(autouse=True)
+def cache_vacio():
+    ps.invalidar_cache_precios()
+    async_store.latencias.resetear()
+    yield
+    ps.invalidar_cache_precios()
+
+
+def test_cargar_precios_pide_las_paginas_en_paralelo():
+    cliente = ClienteQueMideConcurrencia(latencia=0.02)
+    cliente.cargar(ps.TABLA, _filas(4500))
+    df = async_store.correr(async_store.cargar_precios(cliente, USUARIO))
+    assert len(df) == 4500
+    assert cliente.requests == 5
+    assert cliente.maximos["select"] > 1
+    assert async_store.latencias.resumen()[f"{ps.TABLA}.select"]["llamadas"] == 5
+
+    # La segunda llamada sale del mismo cache que price_store.cargar_precios
+    assert len(ps.cargar_precios(cliente, USUARIO)) == 4500
+    assert cliente.requests == 5
+
+
+def test_leer_precios_reintenta_paginas_fallidas():
+    cliente = ClienteFalso(tasa_fallas=0.3, semilla=1)
+    cliente.cargar(ps.TABLA, _filas(5000))
+    df = async_store.correr(async_store.leer_precios(cliente, USUARIO, max_attempts=10, sleep_time=0))
+    assert cliente.fallas > 0
+    assert sorted(df["ean"]) == sorted(_precios(cliente))
+
+
+def test_sincronizar_precios_usa_el_cache_de_price_store():
+    cliente = ClienteFalso()
+    cliente.cargar(ps.TABLA, _filas(1, fecha="2024-06-01 00:00:00") + _filas(2999, desde=1))
+    ps.cargar_precios(cliente, USUARIO)
+    cliente.cargar(ps.TABLA, _filas(3, precio=9.0, fecha=str(pd.Timestamp.now())))
+    requests = cliente.requests
+    df = async_store.correr(async_store.sincronizar_precios(cliente, USUARIO))
+    assert cliente.requests - requests == 1
+    assert dict(zip(df["ean"], df["price"])) == _precios(cliente)
+
+
+def test_guardar_diff_upsert_y_delete_a_la_vez():
+    cliente = ClienteQueMideConcurrencia(latencia=0.02)
+    cliente.cargar(ps.TABLA, _filas(3000))
+    original = ps.cargar_precios(cliente, USUARIO)
+    editado = original.iloc[1000:].assign(price=2.0)  # 2000 cambiados, 1000 borrados
+    avisos = []
+    resultado = async_store.correr_con_progreso(
+        lambda avisar: async_store.guardar_diff(cliente, USUARIO, original, editado, on_progress=avisar, chunk_size=500),
+        lambda hechas, total: avisos.append((hechas, total)))
+    assert resultado == (2000, 1000)
+    assert set(_precios(cliente).values()) == {2.0} and len(_precios(cliente)) == 2000
+    assert cliente.solapados > 0
+    assert cliente.maximos["upsert"] > 1 and cliente.maximos["delete"] > 1
+    assert avisos[-1] == (2000, 2000) and len(avisos) == 4
+    # Los borrados se aplican al cache sin volver a leer
+    assert len(ps.precios_en_cache(USUARIO)) == 2000
+
+
+def test_guardar_diff_reintenta_tandas_despues_del_commit():
+    cliente = ClienteFalso(semilla=2)
+    cliente.cargar(ps.TABLA, _filas(3000))
+    original = ps.cargar_precios(cliente, USUARIO)
+    cliente.tasa_fallas_tardias = 0.3
+    editado = original.iloc[500:].assign(price=2.0)
+    assert async_store.correr(async_store.guardar_diff(cliente, USUARIO, original, editado, chunk_size=250,
+                                                       max_attempts=10, sleep_time=0)) == (2500, 500)
+    assert cliente.fallas > 0
+    assert set(_precios(cliente).values()) == {2.0} and len(_precios(cliente)) == 2500
+
+
+def test_guardar_diff_fallido_espera_todas_las_tandas_e_invalida_el_cache():
+    cliente = ClienteQueMideConcurrencia()
+    cliente.cargar(ps.TABLA, _filas(10))
+    original = ps.cargar_precios(cliente, USUARIO)
+    cliente.tasa_fallas = 1.0
+    with pytest.raises(ConnectionError):
+        async_store.correr(async_store.guardar_diff(cliente, USUARIO, original, original.iloc[5:].assign(price=2.0),
+                                                    max_attempts=2, sleep_time=0))
+    assert sum(cliente._en_vuelo.values()) == 0
+    assert ps.precios_en_cache(USUARIO) is None
@@ -0,0 +1,125 @@
+"""breakeven_cache: claves, desalojos en memoria y en disco, aciertos entre instancias y estadísticas."""
+import datetime as dt
+import sqlite3
+
+import pytest
+
+import breakeven_cache as bc
+
+ENTRADAS = dict(fechaVencimiento='31-10-2025', fechaMercado='27-02-2025', tf_precioVencimiento=132.82,
+                tf_precioMercado=110.6, dayCountConvention='ACT_365F', cer_tasaReal=0, cer_precioMercado=109.7,
+                indiceCER_Mercado=540.5638, cer_fechaEmision='31-10-2024', indiceCER_inicial=487.6705)
+
+
+class CalendarioFalso:
+    def __init__(self, huella):
+        self.huella = huella
+
+
+class SerieFalsa:
+    def __init__(self, version, nombre="CER"):
+        self.nombre = nombre
+        self.version = version
+
+
+def _resultados(n):
+    return {"breakevenInflationTEA": float(n)}
+
+
+def test_la_clave_cambia_con_la_huella_del_calendario():
+    clave = bc.CacheBreakeven(calendario=CalendarioFalso("a")).clave(**ENTRADAS)
+    assert clave == bc.CacheBreakeven(calendario=CalendarioFalso("a")).clave(**ENTRADAS)
+    assert clave != bc.CacheBreakeven(calendario=CalendarioFalso("b")).clave(**ENTRADAS)
+
+
+def test_la_clave_cambia_con_la_version_de_la_serie():
+    cache = bc.CacheBreakeven(calendario=CalendarioFalso("a"))
+    sin_indices = {k: v for k, v in ENTRADAS.items() if k not in ('indiceCER_Mercado', 'indiceCER_inicial')}
+    assert cache.clave(serieCER=SerieFalsa("v1"), **sin_indices) != cache.clave(serieCER=SerieFalsa("v2"), **sin_indices)
+    # Con los dos índices dados la serie no se usa, así que no entra en la clave
+    assert cache.clave(serieCER=SerieFalsa("v1"), **ENTRADAS) == cache.clave(serieCER=SerieFalsa("v2"), **ENTRADAS)
+
+
+def test_la_clave_normaliza_formatos_equivalentes():
+    cache = bc.CacheBreakeven(calendario=CalendarioFalso("a"))
+    otra_forma = dict(ENTRADAS, fechaMercado=dt.date(2025, 2, 27), cer_tasaReal=0.0)
+    assert cache.clave(**ENTRADAS) == cache.clave(**otra_forma)
+    with pytest.raises(TypeError):
+        cache.clave(**ENTRADAS, fecha_mercado='27-02-2025')
+
+
+def test_lru_en_memoria():
+    cache = bc.CacheBreakeven(max_memoria=3)
+    for n in range(3):
+        cache.guardar(f"c{n}", _resultados(n))
+    assert cache.obtener("c0") == _resultados(0)  # c0 pasa a ser la más reciente
+    cache.guardar("c3", _resultados(3))
+    assert cache.obtener("c1") is None
+    assert [cache.obtener(f"c{n}") for n in (0, 2, 3)] == [_resultados(n) for n in (0, 2, 3)]
+    assert cache.estadisticas()["desalojos_memoria"] == 1
+
+
+def test_desalojo_en_disco_baja_al_90_por_ciento(tmp_path):
+    with bc.CacheBreakeven(tmp_path / "cache.sqlite", max_memoria=1, max_disco=20) as cache:
+        for n in range(10):
+            cache.guardar(f"c{n}", _resultados(n))
+        cache.limpiar(disco=False)
+        assert cache.obtener("c0") == _resultados(0)  # acierto en disco: actualiza ultimo_uso
+        for n in range(10, 22):
+            cache.guardar(f"c{n}", _resultados(n))
+        estadisticas = cache.estadisticas()
+        assert estadisticas["entradas_disco"] == 18
+        assert estadisticas["desalojos_disco"] == 4
+        cache.limpiar(disco=False)
+        assert cache.obtener("c0") == _resultados(0)
+        assert [cache.obtener(f"c{n}") for n in range(1, 5)] == [None] * 4
+
+
+def test_acierto_en_disco_desde_otra_instancia(tmp_path):
+    ruta = tmp_path / "cache.sqlite"
+    with bc.CacheBreakeven(ruta) as primero:
+        calculado = primero.calcular(**ENTRADAS)
+    with bc.CacheBreakeven(ruta) as segundo:
+        guardado = segundo.calcular(**ENTRADAS)
+        estadisticas = segundo.estadisticas()
+    assert guardado.breakevenInflationTEA == calculado.breakevenInflationTEA
+    assert guardado.IPCs == calculado.IPCs
+    assert (estadisticas["hits_disco"], estadisticas["misses"], estadisticas["entradas_disco"]) == (1, 0, 1)
+
+
+def test_estadisticas(tmp_path):
+    with bc.CacheBreakeven(tmp_path / "cache.sqlite") as cache:
+        cache.calcular(**ENTRADAS)
+        cache.calcular(**ENTRADAS)
+        cache.calcular(**dict(ENTRADAS, tf_precioMercado=111.0))
+        estadisticas = cache.estadisticas()
+    assert estadisticas["misses"] == 2
+    assert estadisticas["hits_memoria"] == 1
+    assert estadisticas["hits_disco"] == 0
+    assert estadisticas["tasa_aciertos"] == pytest.approx(1 / 3)
+    assert estadisticas["entradas_memoria"] == estadisticas["entradas_disco"] == 2
+    assert estadisticas["errores_disco"] == 0
+
+
+def test_errores_de_sqlite_no_se_propagan(tmp_path):
+    ruta = tmp_path / "cache.sqlite"
+    cache = bc.CacheBreakeven(ruta)
+    with sqlite3.connect(ruta) as otra:
+        otra.execute("DROP TABLE resultados")
+    cache.limpiar()
+    assert cache.purgar_calendarios_viejos() == 0
+    assert cache.calcular(**ENTRADAS).breakevenInflationTEA > 0
+    estadisticas = cache.estadisticas()
+    assert estadisticas["entradas_disco"] is None
+    assert estadisticas["errores_disco"] >= 4
+    cache.cerrar()
+
+
+def test_cerrar_y_volver_a_usar(tmp_path):
+    cache = bc.CacheBreakeven(tmp_path / "cache.sqlite")
+    cache.guardar("c", _resultados(1))
+    cache.cerrar()
+    assert cache._conexiones == []
+    cache.limpiar(disco=False)
+    assert cache.obtener("c") == _resultados(1)  # abre una conexión nueva
+    cache.cerrar()
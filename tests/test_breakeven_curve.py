@@ -0,0 +1,52 @@
+"""breakeven_curve: interpolación, inflación forward y validación de fechas y anclas."""
+import datetime as dt
+
+import numpy as np
+import pytest
+
+import financial_utils as fu
+from breakeven_curve import DIAS_POR_ANIO, ImpliedCERCurve
+
+MERCADO = dt.date(2025, 2, 27)
+
+
+@pytest.fixture
+def curva():
+    curva = ImpliedCERCurve(MERCADO, 500.0)
+    curva.agregar_bono("A", dt.date(2025, 8, 29), 550.0)
+    curva.agregar_bono("B", dt.date(2026, 2, 27), 600.0)
+    return curva
+
+
+def test_forward_entre_nodos(curva):
+    dias = (dt.date(2026, 2, 27) - dt.date(2025, 8, 29)).days
+    esperado = (600.0 / 550.0) ** (DIAS_POR_ANIO / dias) - 1
+    assert curva.inflacion_forward_TEA(dt.date(2025, 8, 29), dt.date(2026, 2, 27)) == pytest.approx(esperado)
+    assert curva.inflacion_forward_TEM(dt.date(2025, 8, 29), dt.date(2026, 2, 27)) == pytest.approx(
+        (1 + esperado) ** (1 / 12) - 1)
+
+
+def test_forward_con_fechas_iguales_o_invertidas(curva):
+    for fechaInicial, fechaFinal in ((dt.date(2025, 6, 1), dt.date(2025, 6, 1)),
+                                     (dt.date(2025, 7, 1), dt.date(2025, 6, 1))):
+        with pytest.raises(ValueError):
+            curva.inflacion_forward_TEA(fechaInicial, fechaFinal)
+        with pytest.raises(ValueError):
+            curva.inflacion_forward_TEM(fechaInicial, fechaFinal)
+    iniciales = np.array(['2025-03-01', '2025-06-01'], dtype='datetime64[D]')
+    with pytest.raises(ValueError):
+        curva.inflacion_forward_TEA(iniciales, np.array(['2025-05-01', '2025-06-01'], dtype='datetime64[D]'))
+
+
+def test_desde_calculadores_rechaza_otro_ancla():
+    entradas = dict(fechaVencimiento='31-10-2025', fechaMercado='27-02-2025', tf_precioVencimiento=132.82,
+                    tf_precioMercado=110.6, cer_tasaReal=0, cer_precioMercado=109.7, indiceCER_Mercado=540.5638,
+                    cer_fechaEmision='31-10-2024', indiceCER_inicial=487.6705)
+    primero = fu.BreakevenInflationCalculator(**entradas)
+    segundo = fu.BreakevenInflationCalculator(**dict(entradas, fechaVencimiento='30-04-2026', tf_precioVencimiento=150.0))
+    curva = ImpliedCERCurve.desde_calculadores([primero, segundo])
+    assert curva.cer(fu._parsear_fecha('31-10-2025')) == pytest.approx(primero.indiceCER_final)
+
+    otro_ancla = fu.BreakevenInflationCalculator(**dict(entradas, fechaVencimiento='30-04-2026', indiceCER_Mercado=541.0))
+    with pytest.raises(ValueError):
+        ImpliedCERCurve.desde_calculadores([primero, otro_ancla])
@@ -0,0 +1,160 @@
+"""
+Calendario precalculado contra las implementaciones día por día que reemplazó (copiadas de la versión
+original de financial_utils, sin los print/logging), sobre fechas al azar y bordes de feriados.
+"""
+import datetime as dt
+import random
+import threading
+from datetime import timedelta
+
+import pytest
+from dateutil.relativedelta import relativedelta
+
+import financial_utils as fu
+from business_calendar import FERIADOS_INAMOVIBLES, BusinessDayCalendar, get_calendario_AR
+
+holidays = pytest.importorskip("holidays")
+AR_holidays = holidays.AR()
+
+
+def _es_habil(fecha):
+    return fecha not in AR_holidays and (fecha.month, fecha.day) not in FERIADOS_INAMOVIBLES and fecha.weekday() < 5
+
+
+def restar10DiasHabiles_original(fecha, dias_a_restar=10, format='%Y-%m-%d'):
+    if type(fecha) == str:
+        fecha = dt.datetime.strptime(fecha, "%d-%m-%Y").date()
+    while dias_a_restar:
+        if _es_habil(fecha):
+            fecha -= timedelta(days=1)
+            dias_a_restar -= 1
+        else:
+            fecha -= timedelta(days=1)
+    return fecha.strftime(format)
+
+
+def sumarXDiasHabiles_original(fecha, diasASumar=1, format='%Y-%m-%d', returnDate=False):
+    if type(fecha) == str:
+        fecha = dt.datetime.strptime(fecha, "%d-%m-%Y").date()
+    while diasASumar:
+        fecha += timedelta(days=1)
+        if _es_habil(fecha):
+            diasASumar -= 1
+    while not _es_habil(fecha):
+        fecha += timedelta(days=1)
+    return fecha if returnDate else fecha.strftime(format)
+
+
+def IPC_publication_months_original(start_date, end_date):
+    def mes_IPC(fecha):
+        dia = 15
+        while not _es_habil(dt.date(fecha.year, fecha.month, dia)):
+            dia -= 1
+        return dt.datetime(fecha.year, fecha.month, 1) - relativedelta(months=1 if fecha.day > dia else 2)
+
+    actual, final = mes_IPC(start_date), mes_IPC(end_date)
+    resultado = []
+    while actual <= final:
+        resultado.append(actual.strftime("%B%Y").capitalize())
+        actual += relativedelta(months=1)
+    return resultado
+
+
+def diasHabilesEntre_original(fechaInicial, fechaFinal):
+    signo = 1
+    if fechaFinal < fechaInicial:
+        fechaInicial, fechaFinal, signo = fechaFinal, fechaInicial, -1
+    return signo * sum(_es_habil(fechaInicial + timedelta(days=d)) for d in range(1, (fechaFinal - fechaInicial).days + 1))
+
+
+def _fechas(n, semilla=0, desde=dt.date(2010, 1, 1), dias=25 * 365):
+    azar = random.Random(semilla)
+    return [desde + timedelta(days=azar.randrange(dias)) for _ in range(n)]
+
+
+# Alrededor de feriados fijos, fines de semana largos y fin de año
+BORDES = [dt.date(2024, 12, 31), dt.date(2025, 1, 1), dt.date(2024, 3, 24), dt.date(2024, 3, 29), dt.date(2024, 4, 1),
+          dt.date(2023, 5, 25), dt.date(2025, 7, 9), dt.date(2025, 12, 8), dt.date(2024, 12, 25), dt.date(2025, 6, 15)]
+
+
+@pytest.mark.parametrize("fecha", BORDES + _fechas(300))
+def test_sumarXDiasHabiles_igual_al_recorrido(fecha):
+    for dias in (0, 1, 2, 5, 10, 23):
+        assert fu.sumarXDiasHabiles(fecha, dias) == sumarXDiasHabiles_original(fecha, dias), (fecha, dias)
+    assert (fu.sumarXDiasHabiles(fecha.strftime("%d-%m-%Y"), 3, returnDate=True)
+            == sumarXDiasHabiles_original(fecha, 3, returnDate=True))
+
+
+@pytest.mark.parametrize("fecha", BORDES + _fechas(300, semilla=1))
+def test_restar10DiasHabiles_igual_al_recorrido(fecha):
+    for dias in (0, 1, 3, 10, 15):
+        assert fu.restar10DiasHabiles(fecha, dias) == restar10DiasHabiles_original(fecha, dias), (fecha, dias)
+    assert fu.restar10DiasHabiles(fecha.strftime("%d-%m-%Y")) == restar10DiasHabiles_original(fecha)
+
+
+def test_IPC_publication_months_igual_al_recorrido():
+    inicios = BORDES + _fechas(200, semilla=2) + [dt.date(2025, m, d) for m in range(1, 13) for d in (13, 14, 15, 16)]
+    azar = random.Random(3)
+    for inicio in inicios:
+        final = inicio + timedelta(days=azar.randrange(1, 5 * 365))
+        assert fu.IPC_publication_months(inicio, final) == IPC_publication_months_original(inicio, final), (inicio, final)
+
+
+def test_diasHabilesEntre_igual_al_recorrido():
+    calendario = get_calendario_AR()
+    azar = random.Random(4)
+    for inicio in BORDES + _fechas(200, semilla=5):
+        final = inicio + timedelta(days=azar.randrange(-400, 400))
+        assert calendario.diasHabilesEntre(inicio, final) == diasHabilesEntre_original(inicio, final), (inicio, final)
+
+
+def test_extender_el_rango_desde_varios_hilos():
+    # Las consultas no toman el lock: mientras un hilo extiende el rango, los demás no pueden ver
+    # el rango nuevo con el array viejo (IndexError o un día hábil equivocado)
+    calendario = BusinessDayCalendar(2020, 2021)
+    fechas = _fechas(400, semilla=6, desde=dt.date(1960, 1, 1), dias=120 * 365)
+    esperado = {fecha: sumarXDiasHabiles_original(fecha, 7, returnDate=True) for fecha in fechas}
+    errores = []
+
+    def consultar(semilla):
+        azar = random.Random(semilla)
+        for fecha in azar.sample(fechas, len(fechas)):
+            try:
+                if calendario.sumarDiasHabiles(fecha, 7) != esperado[fecha]:
+                    errores.append(fecha)
+            except Exception as e:
+                errores.append(e)
+
+    hilos = [threading.Thread(target=consultar, args=(n,)) for n in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert errores == []
+    assert calendario.anio_inicial <= 1959 and calendario.anio_final >= 2080
+
+
+def test_feriadosEntre_cuenta_solo_feriados_de_semana():
+    calendario = get_calendario_AR()
+    azar = random.Random(7)
+    for inicio in BORDES + _fechas(200, semilla=8):
+        final = inicio + timedelta(days=azar.randrange(-60, 60))
+        desde, hasta = min(inicio, final), max(inicio, final)
+        esperado = sum(not _es_habil(desde + timedelta(days=d)) and (desde + timedelta(days=d)).weekday() < 5
+                       for d in range(1, (hasta - desde).days + 1))
+        assert calendario.feriadosEntre(inicio, final) == esperado, (inicio, final)
+
+
+def test_instrumentacion_cuenta_feriados_y_no_fines_de_semana():
+    fu.instrumentacion.resetear()
+    fu.instrumentacion.activar()
+    try:
+        # Del viernes 4/7/2025 al viernes 11/7/2025: un fin de semana y el 9 de julio (miércoles) en el camino
+        assert fu.sumarXDiasHabiles(dt.date(2025, 7, 4), 4) == "2025-07-11"
+        assert fu.restar10DiasHabiles(dt.date(2025, 7, 11), 1) == "2025-07-10"
+    finally:
+        fu.instrumentacion.desactivar()
+    contadores = fu.instrumentacion.exportar()
+    assert contadores["sumarXDiasHabiles"]["dias_recorridos"] == 7
+    assert contadores["sumarXDiasHabiles"]["feriados"] == 1
+    assert contadores["restar10DiasHabiles"]["feriados"] == 0
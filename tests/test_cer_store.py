@@ -0,0 +1,47 @@
+"""cer_store: versiones, permisos y lecturas de una serie guardada en disco."""
+import datetime as dt
+import os
+import stat
+
+import numpy as np
+
+import cer_store
+
+
+def _fechas(desde, n):
+    return np.arange(np.datetime64(desde), np.datetime64(desde) + n, dtype='datetime64[D]')
+
+
+def test_valores_y_anterior(tmp_path):
+    fechas = _fechas('2024-01-01', 10)[[0, 1, 5]]
+    serie = cer_store.guardar_serie(tmp_path / "cer", "CER", fechas, [1.0, 2.0, 3.0])
+    assert serie.valor(dt.date(2024, 1, 2)) == 2.0
+    assert np.isnan(serie.valor(dt.date(2024, 1, 4)))
+    assert serie.valor(dt.date(2024, 1, 4), anterior=True) == 2.0
+    np.testing.assert_array_equal(serie.valores(_fechas('2024-01-05', 3), anterior=True), [2.0, 3.0, 3.0])
+
+
+def test_version_cambia_con_el_rango_de_fechas(tmp_path):
+    # Los mismos valores corridos unos días son otra serie: la versión (clave de CacheBreakeven) tiene que cambiar
+    valores = np.linspace(100.0, 110.0, 30)
+    original = cer_store.guardar_serie(tmp_path / "a", "CER", _fechas('2024-01-01', 30), valores)
+    corrida = cer_store.guardar_serie(tmp_path / "b", "CER", _fechas('2024-01-04', 30), valores)
+    repetida = cer_store.guardar_serie(tmp_path / "c", "CER", _fechas('2024-01-01', 30), valores)
+    assert original.version != corrida.version
+    assert original.version == repetida.version
+
+
+def test_la_serie_es_legible_por_otros_usuarios(tmp_path):
+    ruta = tmp_path / "cer"
+    serie = cer_store.guardar_serie(ruta, "CER", _fechas('2024-01-01', 5), np.arange(5.0))
+    datos = os.path.join(ruta, serie.meta["datos"])
+    assert stat.S_IMODE(os.stat(datos).st_mode) == cer_store.MODO_DIRECTORIO
+    assert stat.S_IMODE(os.stat(ruta / "meta.json").st_mode) == cer_store.MODO_ARCHIVO
+
+
+def test_reescribir_conserva_solo_la_version_anterior(tmp_path):
+    ruta = tmp_path / "cer"
+    for i in range(4):
+        serie = cer_store.guardar_serie(ruta, "CER", _fechas('2024-01-01', 5), np.arange(5.0) + i)
+    assert serie.valor(dt.date(2024, 1, 1)) == 3.0
+    assert len([e for e in os.listdir(ruta) if e.startswith("v-")]) == 2
@@ -0,0 +1,83 @@
+"""day_count contra financepy.DayCount.year_frac como oráculo, para todas las convenciones soportadas."""
+import datetime as dt
+import random
+
+import numpy as np
+import pytest
+
+import day_count
+
+financepy_utils = pytest.importorskip("financepy.utils")
+
+# Fin de mes, 29 de febrero, 31 contra 30 y cruces de año bisiesto: los casos donde las convenciones difieren
+CASOS_BORDE = [
+    (dt.date(2024, 1, 31), dt.date(2024, 2, 29)),
+    (dt.date(2024, 2, 29), dt.date(2025, 2, 28)),
+    (dt.date(2024, 2, 29), dt.date(2028, 2, 29)),
+    (dt.date(2023, 2, 28), dt.date(2024, 2, 29)),
+    (dt.date(2024, 2, 28), dt.date(2024, 3, 1)),
+    (dt.date(2024, 1, 31), dt.date(2024, 3, 31)),
+    (dt.date(2024, 3, 31), dt.date(2024, 4, 30)),
+    (dt.date(2024, 4, 30), dt.date(2024, 5, 31)),
+    (dt.date(2024, 5, 31), dt.date(2024, 5, 31)),
+    (dt.date(2024, 7, 31), dt.date(2025, 1, 31)),
+    (dt.date(2023, 12, 31), dt.date(2024, 1, 1)),
+    (dt.date(2024, 12, 31), dt.date(2025, 12, 31)),
+    (dt.date(1999, 12, 31), dt.date(2000, 2, 29)),
+    (dt.date(2099, 12, 31), dt.date(2100, 3, 1)),
+    (dt.date(2020, 2, 29), dt.date(2030, 8, 31)),
+]
+
+
+def _pares_al_azar(n, semilla=0):
+    azar = random.Random(semilla)
+    base = dt.date(1995, 1, 1).toordinal()
+    pares = []
+    for _ in range(n):
+        inicio = base + azar.randrange(40 * 365)
+        pares.append((dt.date.fromordinal(inicio), dt.date.fromordinal(inicio + azar.randrange(15 * 365))))
+    return pares
+
+
+PARES = CASOS_BORDE + _pares_al_azar(500)
+
+
+def _oraculo(fechaInicial, fechaFinal, nombre):
+    dayCount = financepy_utils.DayCount(financepy_utils.DayCountTypes[nombre])
+    resultado = dayCount.year_frac(financepy_utils.Date.from_date(fechaInicial),
+                                   financepy_utils.Date.from_date(fechaFinal))
+    return resultado[0], resultado[1]
+
+
+@pytest.mark.parametrize("nombre", day_count.CONVENCIONES_SOPORTADAS)
+def test_year_frac_escalar_igual_a_financepy(nombre):
+    for fechaInicial, fechaFinal in PARES:
+        anios, dias = day_count.year_frac_escalar(fechaInicial, fechaFinal, nombre)
+        anios_fp, dias_fp = _oraculo(fechaInicial, fechaFinal, nombre)
+        assert dias == dias_fp, (nombre, fechaInicial, fechaFinal)
+        assert anios == pytest.approx(anios_fp, rel=1e-12, abs=1e-15), (nombre, fechaInicial, fechaFinal)
+
+
+@pytest.mark.parametrize("nombre", day_count.CONVENCIONES_SOPORTADAS)
+def test_year_frac_vectorizado_igual_a_financepy(nombre):
+    inicios = np.array([p[0] for p in PARES], dtype='datetime64[D]')
+    finales = np.array([p[1] for p in PARES], dtype='datetime64[D]')
+    anios, dias = day_count.year_frac(inicios, finales, nombre)
+    esperado = [_oraculo(fechaInicial, fechaFinal, nombre) for fechaInicial, fechaFinal in PARES]
+    np.testing.assert_array_equal(dias, [e[1] for e in esperado])
+    np.testing.assert_allclose(anios, [e[0] for e in esperado], rtol=1e-12, atol=1e-15)
+
+
+def test_acepta_el_miembro_de_DayCountTypes():
+    fechaInicial, fechaFinal = dt.date(2024, 2, 29), dt.date(2025, 3, 31)
+    for nombre in day_count.CONVENCIONES_SOPORTADAS:
+        assert (day_count.year_frac_escalar(fechaInicial, fechaFinal, financepy_utils.DayCountTypes[nombre])
+                == day_count.year_frac_escalar(fechaInicial, fechaFinal, nombre))
+
+
+def test_convencion_no_soportada():
+    assert not day_count.soporta_convencion('ACT_ACT_ICMA')
+    with pytest.raises(ValueError):
+        day_count.year_frac_escalar(dt.date(2024, 1, 1), dt.date(2025, 1, 1), 'ACT_ACT_ICMA')
+    with pytest.raises(ValueError):
+        day_count.year_frac(np.datetime64('2024-01-01'), np.datetime64('2025-01-01'), 'ACT_ACT_ICMA')
@@ -0,0 +1,222 @@
+"""price_store contra el Supabase falso en memoria (benchmarks/supabase_falso.py)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import price_store as ps
+from supabase_falso import ClienteFalso, ErrorFalso
+
+USUARIO = "usuario-1"
+
+
+def _filas(n, precio=1.0, user_id=USUARIO, desde=0, fecha="2024-01-01 00:00:00"):
+    return [{"user_id": user_id, "ean": f"779{i:010d}", "price": precio, "last_modification": fecha}
+            for i in range(desde, desde + n)]
+
+
+def _precios(cliente, user_id=USUARIO):
+    return {f["ean"]: f["price"] for f in cliente.filas(ps.TABLA) if f["user_id"] == user_id}
+
+
+@pytest.fixture(autouse=True)
+def cache_vacio():
+    ps.invalidar_cache_precios()
+    yield
+    ps.invalidar_cache_precios()
+
+
+# --- diff_precios ---
+
+def test_diff_precios_detecta_nuevos_cambiados_y_borrados():
+    original = pd.DataFrame({"ean": ["1", "2", "3"], "price": [10.0, 20.0, np.nan], "last_modification": pd.NaT})
+    editado = pd.DataFrame({"ean": [" 1 ", "3", "4", "", None], "price": [10.0, np.nan, 40.0, 5.0, 6.0]})
+    filas, eans_a_borrar = ps.diff_precios(original, editado)
+    assert eans_a_borrar == ["2"]
+    # "1" no cambió (sólo espacios en el EAN), "3" sigue sin precio; las filas sin EAN se descartan
+    assert filas["ean"].tolist() == ["4"]
+    assert filas["price"].tolist() == [40.0]
+
+
+def test_diff_precios_ean_repetido_gana_la_ultima_fila():
+    original = pd.DataFrame({"ean": ["1"], "price": [10.0]})
+    editado = pd.DataFrame({"ean": ["1", "1"], "price": [11.0, 12.0]})
+    filas, eans_a_borrar = ps.diff_precios(original, editado)
+    assert eans_a_borrar == []
+    assert filas[["ean", "price"]].values.tolist() == [["1", 12.0]]
+
+
+# --- escribir_en_tandas ---
+
+def test_escribir_en_tandas_parte_en_tandas_y_avisa_progreso():
+    cliente = ClienteFalso()
+    avisos = []
+    escritas = ps.escribir_en_tandas(cliente, ps.TABLA, _filas(2500), operacion="upsert", on_conflict="user_id,ean",
+                                     chunk_size=1000, on_progress=lambda hechas, total: avisos.append((hechas, total)))
+    assert escritas == 2500
+    assert cliente.requests == 3
+    assert len(_precios(cliente)) == 2500
+    # Las tandas terminan en cualquier orden, pero el acumulado sólo crece y termina en el total
+    assert len(avisos) == 3 and avisos[-1] == (2500, 2500)
+    assert [hechas for hechas, _ in avisos] == sorted(hechas for hechas, _ in avisos)
+
+
+def test_escribir_en_tandas_reintenta_upserts_fallidos():
+    cliente = ClienteFalso(tasa_fallas_tardias=0.3, semilla=3)
+    assert ps.escribir_en_tandas(cliente, ps.TABLA, _filas(5000), operacion="upsert", on_conflict="user_id,ean",
+                                 chunk_size=500, max_attempts=10, backoff=0) == 5000
+    assert cliente.fallas > 0
+    assert len(_precios(cliente)) == 5000
+
+
+def test_escribir_en_tandas_no_reintenta_inserts():
+    # Un insert que falló después del commit no se puede repetir: chocaría con la restricción única
+    cliente = ClienteFalso(tasa_fallas_tardias=1.0)
+    with pytest.raises(ps.ErrorEscrituraEnTandas) as error:
+        ps.escribir_en_tandas(cliente, ps.TABLA, _filas(10), chunk_size=5, max_attempts=5, backoff=0)
+    assert cliente.requests == 2
+    assert error.value.filas_escritas == 0
+    assert all(isinstance(e, ErrorFalso) and "duplicate" not in str(e) for _, e in error.value.tandas_fallidas)
+
+
+def test_escribir_en_tandas_junta_las_tandas_fallidas():
+    cliente = ClienteFalso(tasa_fallas=1.0)
+    with pytest.raises(ps.ErrorEscrituraEnTandas) as error:
+        ps.escribir_en_tandas(cliente, ps.TABLA, _filas(30), operacion="upsert", on_conflict="user_id,ean",
+                              chunk_size=10, max_attempts=2, backoff=0)
+    assert [n for n, _ in error.value.tandas_fallidas] == [0, 1, 2]
+    assert cliente.requests == 6
+
+
+# --- guardar_diff_con_retry + sincronizar_precios ---
+
+def test_guardar_diff_y_sincronizar():
+    cliente = ClienteFalso()
+    cliente.cargar(ps.TABLA, _filas(2500) + _filas(10, user_id="otro"))
+    original = ps.cargar_precios(cliente, USUARIO)
+    assert len(original) == 2500  # más que max_rows: se pagina
+
+    editado = original.copy()
+    editado.loc[:99, "price"] = 2.0
+    editado = pd.concat([editado.iloc[10:], pd.DataFrame({"ean": ["nuevo"], "price": [5.0]})], ignore_index=True)
+    assert ps.guardar_diff_con_retry(cliente, USUARIO, original, editado) == (91, 10)
+
+    precios = _precios(cliente)
+    assert len(precios) == 2491
+    assert precios["nuevo"] == 5.0
+    assert sum(p == 2.0 for p in precios.values()) == 90
+    assert len(_precios(cliente, "otro")) == 10
+
+    sincronizado = ps.sincronizar_precios(cliente, USUARIO)
+    assert dict(zip(sincronizado["ean"], sincronizado["price"])) == precios
+
+
+def test_sincronizar_precios_trae_solo_lo_modificado():
+    cliente = ClienteFalso()
+    # La marca es el last_modification más nuevo visto; sólo la fila 0 cae en el margen de MARGEN_SINCRONIZACION
+    cliente.cargar(ps.TABLA, _filas(1, fecha="2024-06-01 00:00:00") + _filas(2999, desde=1))
+    assert len(ps.sincronizar_precios(cliente, USUARIO)) == 3000  # sin cache: carga completa
+
+    ahora = str(pd.Timestamp.now())
+    cliente.cargar(ps.TABLA, _filas(5, precio=9.0, fecha=ahora) + _filas(2, precio=3.0, desde=5000, fecha=ahora))
+    requests = cliente.requests
+    df = ps.sincronizar_precios(cliente, USUARIO)
+    assert cliente.requests - requests == 1  # una sola página con los cambios (y la fila de la marca)
+    assert len(df) == 3002
+    assert dict(zip(df["ean"], df["price"])) == _precios(cliente)
+
+
+class ClienteQueInsertaAlPaginar(ClienteFalso):
+    """Otra sesión inserta una fila al principio del orden por EAN después de la primera página."""
+
+    insertada = False
+
+    def _ejecutar(self, consulta):
+        respuesta = super()._ejecutar(consulta)
+        if consulta.operacion == "select" and consulta.contar and not self.insertada:
+            self.insertada = True
+            self.cargar(ps.TABLA, [{"user_id": USUARIO, "ean": "0000000000000", "price": 5.0,
+                                    "last_modification": "2024-01-01 00:00:00"}])
+        return respuesta
+
+
+def test_paginas_desplazadas_no_repiten_eans():
+    # El borde de cada página se corre una fila: la última de cada página vuelve a venir en la siguiente
+    cliente = ClienteQueInsertaAlPaginar()
+    cliente.cargar(ps.TABLA, _filas(2500))
+    df = ps.cargar_precios(cliente, USUARIO)
+    assert df["ean"].is_unique
+    assert len(df) == 2500
+
+    cliente.cargar(ps.TABLA, _filas(1, precio=9.0, fecha=str(pd.Timestamp.now())))
+    df = ps.sincronizar_precios(cliente, USUARIO)
+    assert df["ean"].is_unique and df.loc[df["ean"] == _filas(1)[0]["ean"], "price"].tolist() == [9.0]
+
+
+def test_guardar_diff_fallido_invalida_el_cache():
+    cliente = ClienteFalso()
+    cliente.cargar(ps.TABLA, _filas(10))
+    original = ps.cargar_precios(cliente, USUARIO)
+    editado = original.assign(price=2.0)
+    cliente.tasa_fallas = 1.0
+    with pytest.raises(Exception):
+        ps.guardar_diff_con_retry(cliente, USUARIO, original, editado, sleep_time=0)
+    assert USUARIO not in ps._cache_precios
+
+
+# --- reemplazar_precios ---
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_reemplazar_precios_con_fallas_despues_del_commit(semilla):
+    cliente = ClienteFalso(tasa_fallas_tardias=0.2, semilla=semilla)
+    cliente.cargar(ps.TABLA, _filas(2500))
+    records = [{k: v for k, v in f.items() if k != "user_id"} for f in _filas(3000, precio=2.0)]
+    try:
+        assert ps.reemplazar_precios(cliente, USUARIO, records, max_attempts=4, sleep_time=0) == 3000
+    except Exception as e:
+        # Sólo puede fallar la copia a user_data2_tmp, antes de tocar user_data2
+        assert "duplicate" not in str(e)
+        assert set(_precios(cliente).values()) == {1.0} and len(_precios(cliente)) == 2500
+    else:
+        assert set(_precios(cliente).values()) == {2.0} and len(_precios(cliente)) == 3000
+
+
+# --- validar_precios ---
+
+def test_validar_precios():
+    chunk = pd.DataFrame({
+        "ean": ["7790070410115", " 7790070410115", "779-0070-410115", "96385074", "7790070410116",
+                "12345", "abc", None, "4006381333931"],
+        "price": [1.0, 2.0, 3.0, "4,5", 5.0, 6.0, 7.0, 8.0, -1.0],
+    })
+    validas, rechazadas = ps.validar_precios(chunk)
+    assert validas.values.tolist() == [["7790070410115", 3.0]]
+    assert rechazadas["motivo"].tolist() == [
+        "precio vacío, no numérico o negativo",
+        "dígito verificador inválido",
+        "EAN de largo inválido",
+        "EAN vacío o con caracteres no numéricos",
+        "EAN vacío o con caracteres no numéricos",
+        "precio vacío, no numérico o negativo",
+    ]
+    _, sin_verificar = ps.validar_precios(chunk, verificar_digito=False)
+    assert "dígito verificador inválido" not in sin_verificar["motivo"].tolist()
+
+
+@pytest.mark.parametrize("verificar_digito", [True, False])
+def test_validar_precios_rechaza_digitos_no_ascii(verificar_digito):
+    # Dígitos de ancho completo y arábigo-índicos: \d los acepta, pero no son un EAN
+    chunk = pd.DataFrame({"ean": ["７７９００７０４１０１１５", "٧٧٩٠٠٧٠٤١٠١١٥", "7790070410115"], "price": [1.0, 2.0, 3.0]})
+    validas, rechazadas = ps.validar_precios(chunk, verificar_digito=verificar_digito)
+    assert validas["ean"].tolist() == ["7790070410115"]
+    assert rechazadas["motivo"].tolist() == ["EAN vacío o con caracteres no numéricos"] * 2
+
+
+def test_validar_precios_ean_numerico():
+    # Parquet/CSV con EAN numérico: los enteros se convierten, los no enteros se rechazan sin abortar
+    chunk = pd.DataFrame({"ean": [7790070410115.0, 1.5, np.nan, -96385074.0, np.inf], "price": [1.0] * 5})
+    validas, rechazadas = ps.validar_precios(chunk)
+    assert validas["ean"].tolist() == ["7790070410115"]
+    assert rechazadas["motivo"].tolist() == ["EAN numérico con decimales o fuera de rango",
+                                             "EAN vacío o con caracteres no numéricos",
+                                             "EAN numérico con decimales o fuera de rango",
+                                             "EAN numérico con decimales o fuera de rango"]